@@ -2,14 +2,20 @@
 Dependencias compartidas para los endpoints de la API.
 Incluye autenticación y obtención del usuario actual.
 """
-from typing import Optional
+import hashlib
+import time
+from typing import AsyncIterator, Callable, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import token_cache, user_cache
+from app.core.config import settings
+from app.core.pagination import Cursor, decode_cursor
 from app.core.security import decode_access_token
-from app.db.session import get_db
+from app.core.metrics import DB_READ_SESSIONS
+from app.db.session import DBTimeouts, current_db_timeouts, get_db, read_replicas, recent_writers
 from app.models.user import User
 from app.repositories.user_repo import UserRepository
 
@@ -17,6 +23,11 @@ from app.repositories.user_repo import UserRepository
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
+def user_snapshot(user: User) -> dict:
+    """Copia los valores de las columnas del usuario para guardarlos en caché"""
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
@@ -31,21 +42,32 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    # Decodificar el token
-    payload = decode_access_token(token)
+    # Decodificar el token (o reutilizar el payload ya validado)
+    token_key = hashlib.sha256(token.encode()).hexdigest()
+    payload = token_cache.get(token_key)
     if payload is None:
-        raise credentials_exception
+        payload = decode_access_token(token)
+        if payload is None:
+            raise credentials_exception
+        # La entrada nunca sobrevive a la expiración del token
+        token_cache.set(token_key, payload, ttl=payload.get("exp", 0) - time.time())
     
     user_id: Optional[str] = payload.get("sub")
     if user_id is None:
         raise credentials_exception
     
-    # Obtener el usuario de la base de datos
-    user_repo = UserRepository(db)
-    user = await user_repo.get_by_id(int(user_id))
-    
-    if user is None:
-        raise credentials_exception
+    # Obtener el usuario de la caché o de la base de datos
+    snapshot = user_cache.get(int(user_id))
+    if snapshot is not None:
+        user = User(**snapshot)
+    else:
+        user_repo = UserRepository(db)
+        user = await user_repo.get_by_id(int(user_id))
+        
+        if user is None:
+            raise credentials_exception
+        
+        user_cache.set(user.id, user_snapshot(user))
     
     if not user.is_active:
         raise HTTPException(
@@ -53,9 +75,30 @@ async def get_current_user(
             detail="Usuario inactivo"
         )
     
+    # Los commits de esta sesión abren la ventana de read-your-writes del usuario
+    db.info["user_id"] = user.id
     return user
 
 
+async def get_read_db(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> AsyncIterator[AsyncSession]:
+    """
+    Dependency para endpoints de solo lectura: sesión contra una réplica.
+    Usa el primario si no hay réplicas configuradas o si el usuario ha
+    escrito recientemente (DB_READ_YOUR_WRITES_SECONDS).
+    """
+    if not read_replicas.enabled or recent_writers.get(current_user.id):
+        DB_READ_SESSIONS.labels("primary").inc()
+        yield db
+        return
+    
+    DB_READ_SESSIONS.labels("replica").inc()
+    async with read_replicas.session() as session:
+        yield session
+
+
 async def get_current_active_superuser(
     current_user: User = Depends(get_current_user),
 ) -> User:
@@ -68,3 +111,67 @@ async def get_current_active_superuser(
             detail="No tienes permisos suficientes"
         )
     return current_user
+
+
+def get_cursor(
+    cursor: Optional[str] = Query(
+        None, description="Cursor opaco devuelto en el header X-Next-Cursor"
+    ),
+) -> Optional[Cursor]:
+    """
+    Dependency que decodifica el cursor de paginación keyset.
+    Devuelve None si no se envió cursor.
+    """
+    if cursor is None:
+        return None
+    try:
+        return decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación inválido"
+        )
+
+
+def get_sync_token(
+    since: Optional[str] = Query(
+        None, description="Token next_token de la sincronización anterior (vacío = completa)"
+    ),
+) -> Optional[Cursor]:
+    """
+    Dependency que decodifica el token de sincronización incremental.
+    Devuelve None si no se envió (sincronización completa).
+    """
+    if since is None:
+        return None
+    try:
+        return decode_cursor(since)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Token de sincronización inválido"
+        )
+
+
+def db_timeouts(
+    statement_timeout_ms: Optional[int] = None,
+    lock_timeout_ms: Optional[int] = None,
+) -> Callable[[], AsyncIterator[None]]:
+    """
+    Crea una dependency que cambia los timeouts de base de datos de un router
+    o endpoint (los no indicados mantienen el valor de Settings).
+    Uso: APIRouter(dependencies=[Depends(db_timeouts(statement_timeout_ms=1000))])
+    """
+    timeouts = DBTimeouts(
+        settings.DB_STATEMENT_TIMEOUT_MS if statement_timeout_ms is None else statement_timeout_ms,
+        settings.DB_LOCK_TIMEOUT_MS if lock_timeout_ms is None else lock_timeout_ms,
+    )
+    
+    async def apply_db_timeouts() -> AsyncIterator[None]:
+        token = current_db_timeouts.set(timeouts)
+        try:
+            yield
+        finally:
+            current_db_timeouts.reset(token)
+    
+    return apply_db_timeouts
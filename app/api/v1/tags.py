@@ -2,12 +2,15 @@
 Endpoints de etiquetas.
 Incluye operaciones CRUD para gestionar etiquetas.
 """
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_cursor, get_read_db
+from app.core.etag import etag_headers, etag_matches, make_etag, not_modified
+from app.core.pagination import NEXT_CURSOR_HEADER, Cursor, check_cursor_value, next_cursor
+from app.core.serialization import orm_response
 from app.db.session import get_db
 from app.models.tag import Tag
 from app.models.user import User
@@ -19,17 +22,43 @@ router = APIRouter()
 
 @router.get("/", response_model=List[TagResponse])
 async def get_tags(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    after: Optional[Cursor] = Depends(get_cursor),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Obtiene todas las etiquetas disponibles.
+    Admite paginación keyset con `cursor` (ver header X-Next-Cursor) y
+    peticiones condicionales con If-None-Match (304).
     """
+    if after is not None and after.key != "created_at":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El cursor no corresponde al orden solicitado"
+        )
+    if after is not None:
+        try:
+            after = check_cursor_value(after)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de paginación inválido"
+            )
+    
     tag_repo = TagRepository(db)
-    tags = await tag_repo.get_all(skip, limit)
-    return tags
+    etag = make_etag(request.url.query, *await tag_repo.get_state())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    tags = await tag_repo.get_all(skip, limit, after)
+    headers = etag_headers(etag)
+    cursor = next_cursor(tags, limit)
+    if cursor:
+        headers[NEXT_CURSOR_HEADER] = cursor
+    return orm_response(TagResponse, tags, headers=headers)
 
 
 @router.post("/", response_model=TagResponse, status_code=status.HTTP_201_CREATED)
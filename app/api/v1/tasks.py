@@ -2,33 +2,146 @@
 Endpoints de tareas.
 Incluye operaciones CRUD para gestionar tareas.
 """
-from typing import List
+import asyncio
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user
+from app.api.deps import db_timeouts, get_current_user, get_cursor, get_read_db, get_sync_token
+from app.core.config import settings
+from app.core.etag import etag_headers, etag_matches, not_modified
+from app.core.metrics import EVENTS_SENT
+from app.core.pagination import NEXT_CURSOR_HEADER, Cursor, next_cursor
+from app.core.serialization import orm_response
+from app.core.sse import HEARTBEAT, SSE_HEADERS, sse_event
+from app.db.notifications import change_listener
 from app.db.session import get_db
 from app.models.user import User
-from app.schemas.task import TaskCreate, TaskResponse, TaskUpdate
+from app.schemas.task import (
+    TaskBulkRequest,
+    TaskBulkResponse,
+    TaskChanges,
+    TaskCreate,
+    TaskFileFormat,
+    TaskFilter,
+    TaskImportResult,
+    TaskResponse,
+    TaskUpdate,
+)
+from app.services.import_service import TaskImportService
 from app.services.task_service import TaskService
 
 router = APIRouter()
 
+# Las operaciones masivas pueden tardar legítimamente más que el resto
+bulk_timeouts = Depends(db_timeouts(statement_timeout_ms=settings.DB_BULK_STATEMENT_TIMEOUT_MS))
+
 
 @router.get("/", response_model=List[TaskResponse])
 async def get_tasks(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    filters: TaskFilter = Depends(),
+    after: Optional[Cursor] = Depends(get_cursor),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Obtiene las tareas del usuario actual con filtros, orden y paginación.
+    Con `cursor` se usa paginación keyset; el cursor de la siguiente
+    página se devuelve en el header X-Next-Cursor.
+    Admite peticiones condicionales con If-None-Match (304).
+    """
+    task_service = TaskService(db)
+    # El ETag se calcula antes de leer las filas: si cambian entretanto, el
+    # cliente recibe datos más nuevos que su ETag y solo pierde un 304
+    etag = await task_service.get_tasks_etag(current_user.id, request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    
+    tasks = await task_service.get_user_tasks(current_user.id, skip, limit, filters, after)
+    headers = etag_headers(etag)
+    cursor = next_cursor(tasks, limit, filters.sort.value)
+    if cursor:
+        headers[NEXT_CURSOR_HEADER] = cursor
+    return orm_response(TaskResponse, tasks, headers=headers)
+
+
+@router.get("/search", response_model=List[TaskResponse])
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200, description="Palabras a buscar (admite \"frase\", OR y -palabra)"),
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[Cursor] = Depends(get_cursor),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Búsqueda de texto completo en el título y la descripción de las tareas del
+    usuario actual, de más a menos relevante. El cursor de la siguiente
+    página se devuelve en el header X-Next-Cursor.
+    """
+    task_service = TaskService(db)
+    tasks = await task_service.search_tasks(current_user.id, q, limit, after)
+    headers = {}
+    cursor = next_cursor(tasks, limit, "-rank")
+    if cursor:
+        headers[NEXT_CURSOR_HEADER] = cursor
+    return orm_response(TaskResponse, tasks, headers=headers)
+
+
+@router.get("/changes", response_model=TaskChanges)
+async def get_task_changes(
+    since: Optional[Cursor] = Depends(get_sync_token),
+    limit: int = Query(500, ge=1, le=1000),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
-    Obtiene todas las tareas del usuario actual con paginación.
+    Sincronización incremental: tareas creadas o modificadas e IDs de tareas
+    borradas desde el token `since`. Sin token devuelve todas las tareas.
+    Si `has_more` es true se pide de inmediato la siguiente página con
+    `next_token`; si no, se guarda para la próxima sincronización.
     """
     task_service = TaskService(db)
-    tasks = await task_service.get_user_tasks(current_user.id, skip, limit)
-    return tasks
+    changes = await task_service.get_changes(current_user.id, since, limit)
+    return orm_response(TaskChanges, changes)
+
+
+@router.get("/events")
+async def task_events(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Stream de eventos (Server-Sent Events) con los cambios de las tareas del
+    usuario y de las etiquetas: `event: task` o `event: tag` con la operación
+    y los IDs afectados. Tras conectar (y ante `event: resync`) el cliente
+    sincroniza con /changes; los eventos solo indican que hay algo nuevo.
+    """
+    # La sesión de la autenticación no se vuelve a usar: se libera su conexión
+    # para que el stream abierto no ocupe una del pool
+    await db.close()
+    await change_listener.start()
+    owner_id = current_user.id
+    
+    async def content():
+        async with change_listener.subscribe(owner_id) as queue:
+            yield HEARTBEAT
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), settings.EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                if event is None:
+                    return
+                EVENTS_SENT.labels(event["type"]).inc()
+                yield sse_event(event["type"], {key: value for key, value in event.items() if key != "type"})
+    
+    return StreamingResponse(content(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
@@ -45,25 +158,87 @@ async def create_task(
     return task
 
 
+@router.post("/bulk", response_model=TaskBulkResponse, dependencies=[bulk_timeouts])
+async def bulk_tasks(
+    bulk_data: TaskBulkRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Crea, actualiza y elimina varias tareas en una sola transacción.
+    Devuelve el resultado (estado y tarea) de cada elemento del lote.
+    """
+    task_service = TaskService(db)
+    return await task_service.bulk_tasks(bulk_data, current_user.id)
+
+
+@router.get("/export", dependencies=[bulk_timeouts])
+async def export_tasks(
+    format: TaskFileFormat = Query(TaskFileFormat.ndjson),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Exporta todas las tareas del usuario actual en NDJSON o CSV.
+    La respuesta se genera en streaming desde un cursor del servidor.
+    """
+    owner_id = current_user.id
+    
+    async def content():
+        # Sesión propia: la exportación sigue leyendo después de que
+        # FastAPI libere las dependencias del endpoint
+        async with AsyncSession(db.bind, expire_on_commit=False) as export_db:
+            async for chunk in TaskService(export_db).export_tasks(owner_id, format):
+                yield chunk
+    
+    media_type = "application/x-ndjson" if format == TaskFileFormat.ndjson else "text/csv"
+    return StreamingResponse(
+        content(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format.value}"'},
+    )
+
+
+@router.post("/import", response_model=TaskImportResult, dependencies=[bulk_timeouts])
+async def import_tasks(
+    request: Request,
+    format: TaskFileFormat = Query(TaskFileFormat.ndjson),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Importa tareas masivamente desde el cuerpo de la petición (CSV o NDJSON).
+    El archivo se procesa en streaming y se carga por lotes con COPY.
+    """
+    import_service = TaskImportService(db)
+    return await import_service.import_tasks(current_user.id, request.stream(), format)
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: int,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Obtiene una tarea específica por su ID.
+    Admite peticiones condicionales con If-None-Match (304).
     """
     task_service = TaskService(db)
-    task = await task_service.get_task_by_id(task_id, current_user.id)
+    etag = await task_service.get_task_etag(task_id, current_user.id)
+    if etag is not None and etag_matches(request, etag):
+        return not_modified(etag)
     
+    # Sin ETag la tarea no existe o no pertenece al usuario: no hace falta leerla
+    task = await task_service.get_task_by_id(task_id, current_user.id) if etag is not None else None
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tarea no encontrada"
         )
     
-    return task
+    return orm_response(TaskResponse, task, headers=etag_headers(etag))
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
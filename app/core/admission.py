@@ -0,0 +1,86 @@
+"""
+Control de admisión: limita las peticiones concurrentes de cada worker.
+Cuando el límite se supera la petición se rechaza al instante (503) en lugar
+de esperar en la cola del pool de conexiones hasta agotar el timeout.
+
+El límite puede ser fijo (static) o adaptativo (aimd): crece de forma aditiva
+mientras las esperas por una conexión del pool son cortas y se reduce de forma
+multiplicativa cuando superan el objetivo.
+"""
+import time
+
+from app.core.config import settings
+from app.core.metrics import ADMISSION_IN_FLIGHT, ADMISSION_LIMIT
+
+
+class ConcurrencyLimiter:
+    """Límite de peticiones en curso, fijo o ajustado por AIMD"""
+
+    def __init__(
+        self,
+        mode: str,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        pool_wait_target: float,
+        backoff: float = 0.9,
+        decrease_cooldown: float = 0.1,
+    ):
+        self.mode = mode
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.pool_wait_target = pool_wait_target
+        self.backoff = backoff
+        self.decrease_cooldown = decrease_cooldown
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        ADMISSION_LIMIT.set(self.limit)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("static", "aimd")
+
+    def try_acquire(self) -> bool:
+        """Reserva un hueco; devuelve False si se alcanzó el límite"""
+        if self.in_flight >= int(self.limit):
+            return False
+        self.in_flight += 1
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+        return True
+
+    def release(self, pool_wait: float, overloaded: bool = False) -> None:
+        """
+        Libera el hueco y, en modo aimd, ajusta el límite según la espera por
+        conexión de la petición (o si falló por saturación del pool).
+        """
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.set(self.in_flight)
+        if self.mode != "aimd":
+            return
+
+        if overloaded or pool_wait > self.pool_wait_target:
+            # Una sola reducción por ráfaga: las peticiones que ya esperaban
+            # terminan casi a la vez y no deben colapsar el límite
+            now = time.monotonic()
+            if now - self._last_decrease >= self.decrease_cooldown:
+                self._last_decrease = now
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+        else:
+            # +1 por cada "ventana" de `limit` peticiones sanas
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        ADMISSION_LIMIT.set(self.limit)
+
+    def stats(self) -> dict:
+        """Estado del limitador para /health"""
+        return {"mode": self.mode, "limit": int(self.limit), "in_flight": self.in_flight}
+
+
+# Limitador por proceso (cada worker tiene el suyo)
+limiter = ConcurrencyLimiter(
+    mode=settings.ADMISSION_CONTROL,
+    initial_limit=settings.ADMISSION_INITIAL_LIMIT,
+    min_limit=settings.ADMISSION_MIN_LIMIT,
+    max_limit=settings.ADMISSION_MAX_LIMIT,
+    pool_wait_target=settings.ADMISSION_POOL_WAIT_TARGET_MS / 1000,
+)
@@ -0,0 +1,96 @@
+"""
+Caché en memoria con expiración (TTL) y desalojo LRU.
+Se usa para evitar decodificar el JWT y consultar el usuario en cada petición.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """
+    Caché acotada por tamaño y tiempo de vida.
+    Cuando se llena se descarta la entrada usada hace más tiempo.
+    Lleva contadores de aciertos, fallos y desalojos para monitorización.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """La caché se desactiva con TTL o tamaño 0"""
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Devuelve el valor cacheado o None si no existe o expiró"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Guarda un valor; `ttl` permite acortar la vida de la entrada"""
+        if not self.enabled:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+
+        self._data[key] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Elimina una entrada si existe"""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Vacía la caché y reinicia los contadores"""
+        self._data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de uso de la caché"""
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Cachés de autenticación por proceso (cada worker mantiene las suyas).
+# token_cache: hash del JWT -> payload decodificado
+# user_cache: id de usuario -> snapshot de sus columnas
+token_cache = TTLCache(settings.AUTH_CACHE_MAX_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+user_cache = TTLCache(settings.AUTH_CACHE_MAX_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Descarta el snapshot cacheado de un usuario tras modificarlo o eliminarlo"""
+    user_cache.invalidate(user_id)
+
+
+def auth_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Contadores de las cachés de autenticación"""
+    return {"token": token_cache.stats(), "user": user_cache.stats()}
@@ -0,0 +1,125 @@
+"""
+Compresión de respuestas HTTP.
+Negocia la codificación con Accept-Encoding y ofrece compresores incrementales
+de gzip, brotli y zstd (estos dos solo si su paquete está instalado) que se
+pueden vaciar tras cada fragmento de una respuesta en streaming.
+"""
+import zlib
+from typing import Callable, Dict, Iterable, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard es opcional
+    zstandard = None
+
+# Prefijos y sufijos de content type que merece la pena comprimir
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+)
+COMPRESSIBLE_SUFFIXES = ("+json", "+xml")
+
+
+class GzipEncoder:
+    """Compresor gzip incremental (zlib con cabecera gzip)"""
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Emite lo pendiente sin cerrar el stream (el cliente puede descomprimirlo ya)"""
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    """Compresor brotli incremental"""
+
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    """Compresor zstd incremental"""
+
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+# Niveles por defecto: buena relación entre CPU y tamaño para JSON
+DEFAULT_LEVELS = {"zstd": 3, "br": 4, "gzip": 6}
+
+# Codificaciones disponibles en orden de preferencia del servidor
+ENCODERS: Dict[str, Callable[[int], object]] = {}
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+ENCODERS["gzip"] = GzipEncoder
+
+
+def is_compressible(content_type: str) -> bool:
+    """Indica si el content type es texto (JSON, NDJSON, CSV, HTML...)"""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith(COMPRESSIBLE_TYPES) or media_type.endswith(COMPRESSIBLE_SUFFIXES)
+
+
+def negotiate(accept_encoding: str, available: Iterable[str]) -> Optional[str]:
+    """
+    Elige la codificación para un header Accept-Encoding.
+    Gana el mayor q del cliente; a igualdad, el orden de `available`.
+    "*" cubre las codificaciones no mencionadas y q=0 las excluye.
+    Devuelve None si no se debe comprimir.
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for name in available:
+        q = weights.get(name, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
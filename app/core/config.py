@@ -2,6 +2,8 @@
 Configuración de la aplicación usando Pydantic BaseSettings.
 Lee las variables de entorno del archivo .env
 """
+from typing import List
+
 from pydantic import BaseSettings
 
 
@@ -15,13 +17,71 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: int = 5432
     
+    # Database pool (por worker: el total es workers x (size + overflow))
+    DB_POOL_SIZE: int = 5  # Conexiones que se mantienen abiertas
+    DB_MAX_OVERFLOW: int = 10  # Conexiones extra temporales en picos
+    DB_POOL_TIMEOUT_SECONDS: float = 30  # Espera máxima por una conexión libre
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Reabre conexiones más antiguas (-1 desactiva)
+    DB_POOL_PRE_PING: bool = True  # Verifica cada conexión al sacarla del pool (un round trip extra)
+    DB_POOL_WARMUP: bool = True  # Abre DB_POOL_SIZE conexiones al arrancar
+    
+    # Database timeouts (ms, 0 = sin límite). Se pueden cambiar por router o endpoint con db_timeouts()
+    DB_STATEMENT_TIMEOUT_MS: int = 5000  # Tiempo máximo de cada sentencia SQL
+    DB_LOCK_TIMEOUT_MS: int = 2000  # Espera máxima por un bloqueo
+    DB_BULK_STATEMENT_TIMEOUT_MS: int = 300000  # Exportación, importación y operaciones masivas
+    
+    # Read replicas: URLs asyncpg separadas por comas (vacío = todo va al primario)
+    DB_READ_REPLICA_URLS: str = ""
+    DB_READ_YOUR_WRITES_SECONDS: float = 5  # Tras escribir, las lecturas del usuario van al primario
+    
+    # Admission control (por worker): rechaza con 503 al superar el límite de concurrencia
+    ADMISSION_CONTROL: str = "aimd"  # "aimd" (adaptativo), "static" o "off"
+    ADMISSION_INITIAL_LIMIT: int = 100  # Límite fijo en modo static; inicial en aimd
+    ADMISSION_MIN_LIMIT: int = 10
+    ADMISSION_MAX_LIMIT: int = 1000
+    ADMISSION_POOL_WAIT_TARGET_MS: float = 50  # Espera por conexión a partir de la cual se reduce el límite
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Password hashing
+    PASSWORD_HASH_WORKERS: int = 4  # Hilos máximos para Argon2 (hash/verificación concurrentes)
+    
+    # Auth cache (por worker). Los cambios de usuario se propagan al resto de workers por
+    # NOTIFY; si su conexión LISTEN se pierde, revocar un usuario tarda hasta el TTL
+    AUTH_CACHE_TTL_SECONDS: int = 30  # 0 desactiva la caché
+    AUTH_CACHE_MAX_SIZE: int = 10000
+    
+    # Slow query log (una línea JSON por consulta en un archivo rotativo)
+    SLOW_QUERY_THRESHOLD_MS: float = 500  # 0 desactiva el registro
+    SLOW_QUERY_EXPLAIN: bool = True  # Captura EXPLAIN (ANALYZE, BUFFERS) de las SELECT lentas
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: int = 300  # Un plan por sentencia como máximo en este intervalo
+    SLOW_QUERY_EXPLAIN_TIMEOUT_SECONDS: int = 30
+    SLOW_QUERY_LOG_FILE: str = "logs/slow_queries.log"
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10_000_000
+    SLOW_QUERY_LOG_BACKUPS: int = 5
+    
+    # Compresión de respuestas (zstd y br solo si están instalados zstandard y brotli)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE_BYTES: int = 1024  # Respuestas más pequeñas se envían sin comprimir
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1-9
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11
+    COMPRESSION_ZSTD_LEVEL: int = 3  # 1-22
+    
+    # Stream de cambios (SSE) alimentado por LISTEN/NOTIFY, una conexión por worker
+    EVENTS_HEARTBEAT_SECONDS: float = 15  # Comentario SSE periódico para mantener viva la conexión
+    EVENTS_QUEUE_SIZE: int = 100  # Eventos pendientes por stream antes de pedir resincronizar
+    
     # Application
     DEBUG: bool = False
+    METRICS_ENABLED: bool = True  # Métricas por ruta en /metrics (middleware)
+    TASK_BULK_MAX_ITEMS: int = 1000  # Operaciones máximas por petición a /tasks/bulk
+    TASK_IMPORT_BATCH_SIZE: int = 5000  # Filas validadas y cargadas con COPY por lote
+    TASK_SYNC_OVERLAP_SECONDS: int = 30  # Margen que se repite en cada sync para no perder transacciones lentas
+    TASK_SYNC_TOMBSTONE_RETENTION_DAYS: int = 30  # Tokens más antiguos exigen sincronización completa (410)
     API_V1_PREFIX: str = "/api/v1"
     PROJECT_NAME: str = "TaskFlow API"
     
@@ -33,6 +93,11 @@ class Settings(BaseSettings):
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
     
+    @property
+    def read_replica_urls(self) -> List[str]:
+        """URLs de las réplicas de lectura configuradas"""
+        return [url.strip() for url in self.DB_READ_REPLICA_URLS.split(",") if url.strip()]
+    
     @property
     def sync_database_url(self) -> str:
         """URL de conexión síncrona para Alembic"""
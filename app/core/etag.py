@@ -0,0 +1,43 @@
+"""
+Validadores HTTP (ETag) para GET condicionales.
+Los ETag se calculan a partir de un resumen barato del estado de los datos
+(ej: número de filas y última modificación) para responder 304 Not Modified
+sin cargar ni serializar las filas.
+"""
+import hashlib
+from typing import Dict
+
+from fastapi import Request, Response, status
+
+# Las respuestas dependen del usuario: solo cachés privadas y siempre revalidando
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: object) -> str:
+    """
+    ETag débil a partir de los valores que identifican la versión de la respuesta.
+    Es débil porque el mismo contenido puede enviarse comprimido o no.
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Comparación débil del ETag con el header If-None-Match de la petición"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    """Headers de validación de una respuesta 200 o 304"""
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    """Respuesta 304 sin cuerpo"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
@@ -0,0 +1,122 @@
+"""
+Métricas de la aplicación en formato Prometheus.
+Con varios workers (uvicorn --workers N) cada proceso escribe sus valores en
+PROMETHEUS_MULTIPROC_DIR y /metrics los agrega al responder.
+"""
+import os
+from typing import Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Peticiones HTTP (route es la plantilla de la ruta, ej: /api/v1/tasks/{task_id})
+REQUESTS = Counter(
+    "taskflow_http_requests_total",
+    "Peticiones HTTP atendidas",
+    ["method", "route", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "taskflow_http_request_duration_seconds",
+    "Duración de las peticiones HTTP hasta enviar el último byte",
+    ["method", "route"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "taskflow_http_requests_in_progress",
+    "Peticiones HTTP en curso",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+# Base de datos por petición
+REQUEST_DB_QUERIES = Histogram(
+    "taskflow_http_request_db_queries",
+    "Sentencias SQL ejecutadas por petición",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+REQUEST_DB_DURATION = Histogram(
+    "taskflow_http_request_db_duration_seconds",
+    "Tiempo total en base de datos por petición",
+    ["method", "route"],
+)
+
+# Pool de conexiones del engine (suma de todos los workers vivos)
+DB_POOL_SIZE = Gauge(
+    "taskflow_db_pool_size", "Tamaño configurado del pool", multiprocess_mode="livesum"
+)
+DB_POOL_MAX = Gauge(
+    "taskflow_db_pool_max", "Conexiones máximas del pool (tamaño + overflow)", multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "taskflow_db_pool_checked_out", "Conexiones del pool en uso", multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_IN = Gauge(
+    "taskflow_db_pool_checked_in", "Conexiones del pool libres", multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "taskflow_db_pool_overflow", "Conexiones abiertas por encima del tamaño del pool", multiprocess_mode="livesum"
+)
+
+DB_POOL_WAIT = Histogram(
+    "taskflow_db_pool_wait_seconds",
+    "Tiempo para obtener una conexión del pool (espera, conexión y pre-ping)",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+# Sesiones de los endpoints de solo lectura por destino (primary o replica)
+DB_READ_SESSIONS = Counter(
+    "taskflow_db_read_sessions_total",
+    "Sesiones de lectura servidas por el primario o por una réplica",
+    ["target"],
+)
+
+# Control de admisión (suma de todos los workers vivos)
+ADMISSION_LIMIT = Gauge(
+    "taskflow_admission_limit", "Límite actual de peticiones concurrentes", multiprocess_mode="livesum"
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "taskflow_admission_in_flight", "Peticiones admitidas en curso", multiprocess_mode="livesum"
+)
+ADMISSION_REJECTED = Counter(
+    "taskflow_admission_rejected_total",
+    "Peticiones rechazadas con 503 por superar el límite de concurrencia",
+    ["method"],
+)
+
+
+# Streams de eventos (SSE) abiertos
+EVENT_SUBSCRIBERS = Gauge(
+    "taskflow_event_subscribers", "Streams de eventos abiertos", multiprocess_mode="livesum"
+)
+EVENTS_SENT = Counter(
+    "taskflow_events_sent_total", "Eventos enviados por los streams SSE", ["type"]
+)
+
+
+def multiprocess_enabled() -> bool:
+    """El modo multiproceso se activa definiendo PROMETHEUS_MULTIPROC_DIR"""
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Genera la exposición de texto de todas las métricas y su content type"""
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Descarta los gauges "live" de este worker al apagarse"""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,268 @@
+"""
+Middlewares ASGI de la aplicación.
+Se implementan como ASGI puro para no añadir una tarea por petición y para
+medir las respuestas en streaming hasta el último byte.
+"""
+import time
+from typing import Dict, Iterable, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.admission import ConcurrencyLimiter
+from app.core.compression import DEFAULT_LEVELS, ENCODERS, is_compressible, negotiate
+from app.core.metrics import (
+    ADMISSION_REJECTED,
+    REQUEST_DB_DURATION,
+    REQUEST_DB_QUERIES,
+    REQUEST_DURATION,
+    REQUESTS,
+    REQUESTS_IN_PROGRESS,
+)
+from app.core.request_context import current_scope
+from app.db.session import observe_pool, track_queries
+
+# Headers de depuración con el uso de base de datos de la petición
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Query-Time"
+
+# Ruta que agrupa las peticiones que no corresponden a ningún endpoint
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Plantilla de la ruta que atendió la petición (ej: /api/v1/tasks/{task_id}).
+    Se usa como etiqueta en lugar del path para acotar la cardinalidad.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class RequestContextMiddleware:
+    """Publica el scope de la petición en curso (ver app.core.request_context)"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
+
+
+class MetricsMiddleware:
+    """Registra peticiones, latencias y uso de base de datos por ruta"""
+
+    def __init__(self, app: ASGIApp, exclude_paths=("/metrics",)):
+        self.app = app
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500  # Si la aplicación falla antes de responder
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            with track_queries() as stats:
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+
+            route = route_template(scope)
+            REQUESTS.labels(method, route, str(status_code)).inc()
+            REQUEST_DURATION.labels(method, route).observe(duration)
+            REQUEST_DB_QUERIES.labels(method, route).observe(stats.count)
+            REQUEST_DB_DURATION.labels(method, route).observe(stats.duration)
+            observe_pool()
+
+
+class QueryCountHeaderMiddleware:
+    """
+    Añade a cada respuesta las sentencias SQL ejecutadas y su tiempo total
+    (X-DB-Query-Count, X-DB-Query-Time en ms). Pensado para modo debug.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers[QUERY_COUNT_HEADER] = str(stats.count)
+                    headers[QUERY_TIME_HEADER] = f"{stats.duration * 1000:.2f}"
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+
+class AdmissionControlMiddleware:
+    """
+    Rechaza con 503 y Retry-After las peticiones que superan el límite de
+    concurrencia del worker, antes de que ocupen una conexión del pool.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: ConcurrencyLimiter,
+        retry_after: int = 1,
+        exclude_paths=("/health", "/metrics"),
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.retry_after = retry_after
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        if not self.limiter.try_acquire():
+            ADMISSION_REJECTED.labels(scope["method"]).inc()
+            response = JSONResponse(
+                {"detail": "Servidor saturado, inténtalo de nuevo más tarde"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                self.limiter.release(stats.pool_wait, overloaded=status_code == 503)
+
+
+class CompressionMiddleware:
+    """
+    Comprime las respuestas de texto con la codificación negociada (zstd, br
+    o gzip). Las respuestas de menos de `minimum_size` bytes se envían sin
+    comprimir. En las respuestas en streaming se acumulan fragmentos hasta
+    superar el umbral y después cada fragmento se comprime y se vacía al
+    momento, de modo que el cliente no espera al final del stream.
+    
+    Toda respuesta de un tipo comprimible lleva `Vary: Accept-Encoding`, se
+    comprima o no, para que ninguna caché sirva una variante a un cliente que
+    pidió otra.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        levels: Optional[Dict[str, int]] = None,
+        encodings: Optional[Iterable[str]] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+        self.encodings = [name for name in (encodings or ENCODERS) if name in ENCODERS]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        start_message: Optional[Message] = None
+        pending: List[bytes] = []
+        pending_size = 0
+        encoder = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, pending_size, encoder, passthrough
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if is_compressible(headers.get("content-type", "")):
+                    headers.add_vary_header("Accept-Encoding")
+                if encoding is not None and self._should_compress(message):
+                    start_message = message  # Se envía al decidir si se comprime
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                pending.append(body)
+                pending_size += len(body)
+                if more_body and pending_size < self.minimum_size:
+                    return
+                body = b"".join(pending)
+                if pending_size < self.minimum_size:
+                    # Respuesta completa por debajo del umbral: sin comprimir
+                    passthrough = True
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body, "more_body": False})
+                    return
+
+                encoder = ENCODERS[encoding](self.levels[encoding])
+                headers = MutableHeaders(scope=start_message)
+                headers["Content-Encoding"] = encoding
+                del headers["Content-Length"]
+                if not more_body:
+                    body = encoder.compress(body) + encoder.finish()
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body, "more_body": False})
+                    return
+                await send(start_message)
+
+            data = encoder.compress(body) + (encoder.flush() if more_body else encoder.finish())
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _should_compress(message: Message) -> bool:
+        """Solo respuestas con cuerpo de texto que no estén ya codificadas"""
+        if message["status"] in (204, 206, 304) or message["status"] < 200:
+            return False
+        headers = Headers(raw=message.get("headers", []))
+        return (
+            "content-encoding" not in headers
+            and "no-transform" not in headers.get("cache-control", "").lower()
+            and is_compressible(headers.get("content-type", ""))
+        )
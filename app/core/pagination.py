@@ -0,0 +1,97 @@
+"""
+Utilidades para paginación por cursor (keyset).
+Codifica y decodifica cursores opacos a partir de la clave de orden (campo, id).
+"""
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Any, NamedTuple, Optional, Sequence
+
+# Header donde se devuelve el cursor de la página siguiente
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Cursor(NamedTuple):
+    """
+    Posición dentro de un listado ordenado.
+    `key` es el orden usado (ej: "created_at" o "-priority"), `value` el valor
+    de ese campo en el último registro e `id` su ID como desempate.
+    """
+    key: str
+    value: Any
+    id: int
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """
+    Convierte una fecha con zona horaria a UTC sin tzinfo, como se guardan las
+    columnas `timestamp without time zone`. Las fechas sin zona no se tocan.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def check_cursor_value(cursor: Cursor) -> Cursor:
+    """
+    Comprueba que el valor del cursor tenga el tipo del campo de orden (fecha
+    en los campos *_at, entero en el resto) y normaliza las fechas a UTC sin
+    zona. Un cursor manipulado daría un error de PostgreSQL en lugar de un 400.
+
+    Raises:
+        ValueError: Si el valor no corresponde al campo de orden
+    """
+    if cursor.key.lstrip("-").endswith("_at"):
+        if not isinstance(cursor.value, datetime):
+            raise ValueError("Cursor inválido")
+        return cursor._replace(value=to_naive_utc(cursor.value))
+    if not isinstance(cursor.value, int) or isinstance(cursor.value, bool):
+        raise ValueError("Cursor inválido")
+    return cursor
+
+
+def encode_cursor(key: str, value: Any, item_id: int) -> str:
+    """
+    Codifica la clave de orden de un registro como cursor opaco.
+    Los valores de tipo fecha se serializan en ISO 8601.
+
+    Args:
+        key: Orden del listado (nombre del campo, con "-" si es descendente)
+        value: Valor del campo de orden en el último registro de la página
+        item_id: ID del último registro de la página
+
+    Returns:
+        Cursor codificado en base64 apto para URLs
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([key, value, item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Decodifica un cursor generado por encode_cursor.
+
+    Raises:
+        ValueError: Si el cursor está malformado
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, value, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        return Cursor(str(key), value, int(item_id))
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Cursor inválido") from exc
+
+
+def next_cursor(items: Sequence, limit: int, key: str = "created_at") -> Optional[str]:
+    """
+    Devuelve el cursor de la página siguiente o None si no hay más resultados.
+    Una página incompleta indica que se llegó al final.
+    """
+    if len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(key, getattr(last, key.lstrip("-")), last.id)
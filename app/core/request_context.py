@@ -0,0 +1,21 @@
+"""
+Contexto de la petición HTTP en curso.
+Permite a capas sin acceso a Request (ej: eventos del engine) saber qué ruta
+se está atendiendo.
+"""
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.types import Scope
+
+# Scope ASGI de la petición en curso (lo fija RequestContextMiddleware)
+current_scope: ContextVar[Optional[Scope]] = ContextVar("current_scope", default=None)
+
+
+def current_route() -> Optional[str]:
+    """Método y plantilla de ruta de la petición en curso (ej: GET /api/v1/tasks/)"""
+    scope = current_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
@@ -2,11 +2,14 @@
 Funciones de seguridad para autenticación y autorización.
 Incluye hashing de contraseñas y creación/verificación de tokens JWT.
 """
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 
 from jose import JWTError, jwt
 from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 
 from app.core.config import settings
 
@@ -14,10 +17,17 @@ from app.core.config import settings
 # Argon2 es el algoritmo recomendado actualmente y no tiene limitaciones de longitud
 hasher = PasswordHasher()
 
+# Pool acotado donde se ejecuta Argon2 fuera del event loop.
+# argon2-cffi libera el GIL, así que los hilos trabajan en paralelo.
+_hash_executor: Optional[ThreadPoolExecutor] = None
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica que una contraseña en texto plano coincida con el hash"""
-    return hasher.verify(hashed_password, plain_password)
+    try:
+        return hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
 
 
 def get_password_hash(password: str) -> str:
@@ -28,6 +38,37 @@ def get_password_hash(password: str) -> str:
     return hasher.hash(password)
 
 
+def _get_hash_executor() -> ThreadPoolExecutor:
+    """Crea de forma perezosa el pool de hilos para Argon2"""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="argon2",
+        )
+    return _hash_executor
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Versión asíncrona de verify_password.
+    Ejecuta la verificación en el pool de Argon2 para no bloquear el event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_hash_executor(), verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Versión asíncrona de get_password_hash.
+    Ejecuta el hash en el pool de Argon2 para no bloquear el event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Crea un token JWT con los datos proporcionados.
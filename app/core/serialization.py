@@ -0,0 +1,64 @@
+"""
+Serialización rápida de respuestas.
+Construye los dicts de los schemas de respuesta directamente desde los objetos
+ORM (sin validar con Pydantic ni pasar por jsonable_encoder) y los codifica
+con orjson. El JSON resultante es idéntico byte a byte al de response_model.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional, Tuple, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON
+
+# (campo, schema anidado o None, es lista)
+FieldPlan = Tuple[str, Optional[Type[BaseModel]], bool]
+
+
+@lru_cache(maxsize=None)
+def _field_plan(schema: Type[BaseModel]) -> Tuple[FieldPlan, ...]:
+    """
+    Campos del schema en orden de declaración (el mismo que usa Pydantic al
+    serializar). Solo admite schemas sin alias ni validadores que transformen
+    los valores, como TaskResponse y TagResponse.
+    """
+    plan = []
+    for name, field in schema.__fields__.items():
+        nested = field.type_ if isinstance(field.type_, type) and issubclass(field.type_, BaseModel) else None
+        if field.alias != name or (nested is not None and field.shape not in (SHAPE_SINGLETON, SHAPE_LIST)):
+            raise TypeError(f"{schema.__name__}.{name} no admite serialización directa")
+        plan.append((name, nested, field.shape == SHAPE_LIST))
+    return tuple(plan)
+
+
+def orm_to_dict(schema: Type[BaseModel], obj: Any) -> Dict[str, Any]:
+    """
+    Dict equivalente a schema.from_orm(obj).dict() leyendo los atributos del
+    objeto ORM o de la fila. Los objetos anidados también pueden ser dicts
+    (ej: agregados con json_agg) con los valores ya listos para JSON.
+    """
+    data = {}
+    for name, nested, many in _field_plan(schema):
+        value = obj[name] if isinstance(obj, Mapping) else getattr(obj, name)
+        if nested is not None and value is not None:
+            value = [orm_to_dict(nested, item) for item in value] if many else orm_to_dict(nested, value)
+        data[name] = value
+    return data
+
+
+def orm_response(
+    schema: Type[BaseModel],
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> ORJSONResponse:
+    """
+    Respuesta JSON de un objeto ORM (o fila) o de una lista de ellos con la forma de `schema`.
+    Se devuelve directamente desde el endpoint: los headers de la Response
+    inyectada en el endpoint no se aplican, hay que pasarlos aquí.
+    """
+    if isinstance(content, list):
+        payload: Any = [orm_to_dict(schema, item) for item in content]
+    else:
+        payload = orm_to_dict(schema, content)
+    return ORJSONResponse(payload, status_code=status_code, headers=headers)
@@ -0,0 +1,21 @@
+"""
+Utilidades para Server-Sent Events (text/event-stream).
+Formatea los mensajes del stream y define los headers que evitan que
+proxies y middlewares (ej: la compresión) retengan los eventos.
+"""
+import json
+from typing import Any, Dict
+
+# no-transform: ni la compresión ni los proxies deben acumular el stream
+SSE_HEADERS = {
+    "Cache-Control": "no-cache, no-transform",
+    "X-Accel-Buffering": "no",  # nginx
+}
+
+# Comentario SSE: lo ignoran los clientes pero mantiene viva la conexión
+HEARTBEAT = ": ping\n\n"
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Mensaje SSE con nombre de evento y datos en JSON de una sola línea"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
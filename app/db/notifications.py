@@ -0,0 +1,203 @@
+"""
+Notificaciones de cambios con LISTEN/NOTIFY de PostgreSQL.
+Los repositorios emiten un NOTIFY dentro de la transacción de cada escritura
+(PostgreSQL solo lo entrega si se confirma) y cada worker mantiene una única
+conexión a la escucha que reparte los eventos entre sus suscriptores, en
+lugar de ocupar una conexión del pool por cada stream abierto. La misma
+conexión recibe las invalidaciones de la caché de autenticación.
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+import asyncpg
+from sqlalchemy import func, select
+
+from app.core.cache import invalidate_user, user_cache
+from app.core.config import settings
+from app.core.metrics import EVENT_SUBSCRIBERS
+
+logger = logging.getLogger(__name__)
+
+# Canal de NOTIFY con los cambios de tareas y etiquetas
+CHANNEL = "taskflow_changes"
+
+# Canal con los IDs de usuarios modificados o eliminados (caché de autenticación)
+USERS_CHANNEL = "taskflow_users"
+
+# Espera máxima entre reintentos al reconectar la escucha
+RECONNECT_MAX_DELAY_SECONDS = 30
+
+# El payload de NOTIFY admite hasta 8000 bytes: los IDs se envían por trozos
+MAX_IDS_PER_NOTIFY = 500
+
+# Evento que pide al cliente resincronizar (se perdieron eventos por ir lento)
+RESYNC = {"type": "resync"}
+
+
+def notify_changes(kind: str, changes: Dict[str, List[int]], owner_id: Optional[int] = None):
+    """
+    Sentencia con los pg_notify de unos cambios, para ejecutarla en la misma
+    transacción que la escritura. Sin `owner_id` los eventos llegan a todos
+    los suscriptores (las etiquetas son compartidas).
+
+    Args:
+        kind: "task" o "tag"
+        changes: IDs afectados por operación ("created", "updated", "deleted"
+            o "imported"); una lista vacía envía el evento sin IDs
+        owner_id: Usuario al que pertenecen los cambios
+    """
+    payloads = [
+        json.dumps(
+            {"type": kind, "op": op, "ids": ids[i:i + MAX_IDS_PER_NOTIFY], "owner_id": owner_id},
+            separators=(",", ":"),
+        )
+        for op, ids in changes.items()
+        for i in range(0, max(len(ids), 1), MAX_IDS_PER_NOTIFY)
+    ]
+    return select(*(func.pg_notify(CHANNEL, payload) for payload in payloads))
+
+
+def notify_user_changed(user_id: int):
+    """
+    Sentencia que avisa a todos los workers de que descarten el usuario de su
+    caché de autenticación, para ejecutarla en la transacción que lo modifica.
+    """
+    return select(func.pg_notify(USERS_CHANNEL, str(user_id)))
+
+
+class ChangeListener:
+    """
+    Conexión LISTEN compartida por todos los streams del worker.
+    Se abre con el primer suscriptor y reparte cada evento en colas acotadas:
+    a un suscriptor lento se le descartan los pendientes y se le envía RESYNC.
+    Si la conexión se pierde se cierran los streams (el cliente reconecta).
+    
+    Con `persistent` (ver start) la escucha se mantiene aunque no haya
+    streams y se reconecta sola, para recibir siempre las invalidaciones de
+    usuarios. Mientras está caída, un usuario desactivado o eliminado sigue
+    autenticándose en este worker hasta AUTH_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self, dsn: str, channel: str = CHANNEL, queue_size: int = 100):
+        self.dsn = dsn
+        self.channel = channel
+        self.queue_size = queue_size
+        self._connection: Optional[asyncpg.Connection] = None
+        self._lock = asyncio.Lock()
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._persistent = False
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    async def start(self, persistent: bool = False) -> None:
+        """
+        Abre la conexión a la escucha si no lo está ya.
+        Con `persistent` se reconecta automáticamente si se pierde (arranque del worker).
+        """
+        self._persistent = self._persistent or persistent
+        async with self._lock:
+            if self._connection is not None and not self._connection.is_closed():
+                return
+            connection = await asyncpg.connect(self.dsn)
+            connection.add_termination_listener(self._on_termination)
+            await connection.add_listener(self.channel, self._on_notify)
+            await connection.add_listener(USERS_CHANNEL, self._on_user_notify)
+            self._connection = connection
+
+    @asynccontextmanager
+    async def subscribe(self, owner_id: int) -> AsyncIterator["asyncio.Queue[Optional[Dict[str, Any]]]"]:
+        """
+        Cola con los eventos del usuario y los de etiquetas.
+        None indica que el stream debe terminar.
+        """
+        await self.start()
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers[owner_id].add(queue)
+        EVENT_SUBSCRIBERS.inc()
+        try:
+            yield queue
+        finally:
+            EVENT_SUBSCRIBERS.dec()
+            queues = self._subscribers.get(owner_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[owner_id]
+
+    async def close(self) -> None:
+        """Termina los streams abiertos y cierra la conexión (apagado del worker)"""
+        self._persistent = False
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        self._close_streams()
+        connection, self._connection = self._connection, None
+        if connection is not None and not connection.is_closed():
+            await connection.close()
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        """Reparte un NOTIFY entre los suscriptores de su usuario (o todos)"""
+        event = json.loads(payload)
+        owner_id = event.pop("owner_id", None)
+        if owner_id is None:
+            queues = [queue for queues in self._subscribers.values() for queue in queues]
+        else:
+            queues = list(self._subscribers.get(owner_id, ()))
+        for queue in queues:
+            self._put(queue, event)
+
+    def _on_user_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        """Descarta de la caché de este worker un usuario modificado en cualquier worker"""
+        invalidate_user(int(payload))
+
+    def _on_termination(self, connection) -> None:
+        """Conexión perdida: sin ella no llegan eventos, los streams se cierran"""
+        if connection is not self._connection:
+            return  # Cierre ordenado desde close()
+        logger.warning("Se perdió la conexión LISTEN del canal %s", self.channel)
+        self._connection = None
+        self._close_streams()
+        # Pudo perderse alguna invalidación mientras tanto
+        user_cache.clear()
+        if self._persistent:
+            self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        """Reintenta abrir la escucha con espera exponencial hasta conseguirlo"""
+        delay = 1.0
+        while self._persistent and self._connection is None:
+            await asyncio.sleep(delay)
+            try:
+                await self.start()
+            except (OSError, asyncpg.PostgresError) as exc:
+                logger.warning("No se pudo reabrir la conexión LISTEN: %s", exc)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY_SECONDS)
+        # Lo invalidado entre la caída y la reconexión tampoco se recibió
+        user_cache.clear()
+        self._reconnect_task = None
+
+    def _close_streams(self) -> None:
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._put(queue, None)
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, event: Optional[Dict[str, Any]]) -> None:
+        """Encola sin bloquear; si la cola está llena se vacía y se pide resincronizar"""
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC if event is not None else None)
+
+
+# Escucha del worker contra el primario (las réplicas no reciben NOTIFY)
+change_listener = ChangeListener(settings.sync_database_url, queue_size=settings.EVENTS_QUEUE_SIZE)
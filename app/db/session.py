@@ -2,18 +2,70 @@
 Configuración de la sesión asíncrona de SQLAlchemy.
 Crea el engine async y el session maker.
 """
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, NamedTuple, Optional
 
-from app.core.config import settings
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-# Motor asíncrono de SQLAlchemy con asyncpg
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.DEBUG,  # Log de queries SQL en modo debug
-    future=True,
-    pool_pre_ping=True,  # Verifica conexiones antes de usarlas
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import (
+    DB_POOL_CHECKED_IN,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_MAX,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_POOL_WAIT,
 )
+from app.db.slow_query import log_slow_query
+
+logger = logging.getLogger(__name__)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Pool que mide cuánto tarda cada checkout (espera por una conexión libre, conexión y pre-ping)"""
+    
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            _record_pool_wait(time.perf_counter() - start)
+
+
+def create_engine_for(url: str) -> AsyncEngine:
+    """Crea un engine async con la configuración de pool y timeouts de Settings"""
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG,  # Log de queries SQL en modo debug
+        future=True,
+        poolclass=TimedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        # Timeouts por defecto de cada conexión (sin coste por petición)
+        connect_args={
+            "server_settings": {
+                "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+                "lock_timeout": str(settings.DB_LOCK_TIMEOUT_MS),
+            }
+        },
+    )
+
+
+# Motor asíncrono de SQLAlchemy con asyncpg (primario)
+engine = create_engine_for(settings.database_url)
 
 # Session maker asíncrono
 AsyncSessionLocal = sessionmaker(
@@ -25,6 +77,207 @@ AsyncSessionLocal = sessionmaker(
 )
 
 
+
+class ReadReplicas:
+    """
+    Engines de las réplicas de lectura. Cada sesión de lectura se abre contra
+    la siguiente réplica (round robin); sin réplicas se usa el primario.
+    """
+
+    def __init__(self, engines: List[AsyncEngine]):
+        self.engines = engines
+        self._counter = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def session(self) -> AsyncSession:
+        """Sesión de solo lectura contra la siguiente réplica"""
+        replica = self.engines[next(self._counter) % len(self.engines)]
+        return AsyncSession(replica, expire_on_commit=False, autoflush=False)
+
+    async def dispose(self) -> None:
+        for replica in self.engines:
+            await replica.dispose()
+
+
+read_replicas = ReadReplicas([create_engine_for(url) for url in settings.read_replica_urls])
+
+# Usuarios que han escrito hace menos de DB_READ_YOUR_WRITES_SECONDS (por worker).
+# Sus lecturas van al primario para que vean sus cambios aunque la réplica tenga retraso.
+recent_writers = TTLCache(settings.AUTH_CACHE_MAX_SIZE, settings.DB_READ_YOUR_WRITES_SECONDS)
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_recent_writer(session):
+    """Abre la ventana de read-your-writes del usuario de la sesión (ver deps.get_current_user)"""
+    user_id = session.info.get("user_id")
+    if user_id is not None:
+        recent_writers.set(user_id, True)
+
+
+class QueryStats:
+    """
+    Sentencias SQL ejecutadas y tiempo acumulado en un bloque (ej: una petición).
+    Los contadores anidados también suman en el contador que los contiene.
+    """
+
+    __slots__ = ("count", "duration", "pool_wait", "parent")
+
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.count = 0
+        self.duration = 0.0
+        self.pool_wait = 0.0
+        self.parent = parent
+
+
+# Contador activo en el contexto actual (petición o bloque de test)
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Cuenta las sentencias SQL ejecutadas dentro del bloque"""
+    stats = QueryStats(parent=current_query_stats.get())
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+
+def _record_pool_wait(elapsed: float) -> None:
+    """Suma la espera por conexión a los contadores activos y al histograma"""
+    DB_POOL_WAIT.observe(elapsed)
+    stats = current_query_stats.get()
+    while stats is not None:
+        stats.pool_wait += elapsed
+        stats = stats.parent
+
+
+class DBTimeouts(NamedTuple):
+    """Timeouts de PostgreSQL en milisegundos (0 = sin límite)"""
+    statement_timeout_ms: int
+    lock_timeout_ms: int
+
+
+DEFAULT_DB_TIMEOUTS = DBTimeouts(settings.DB_STATEMENT_TIMEOUT_MS, settings.DB_LOCK_TIMEOUT_MS)
+BULK_DB_TIMEOUTS = DBTimeouts(settings.DB_BULK_STATEMENT_TIMEOUT_MS, settings.DB_LOCK_TIMEOUT_MS)
+
+# Timeouts de la ruta en curso si difieren de los de la conexión (ver deps.db_timeouts)
+current_db_timeouts: ContextVar[Optional[DBTimeouts]] = ContextVar("current_db_timeouts", default=None)
+
+
+def set_db_timeouts(timeouts: DBTimeouts):
+    """
+    Sentencia que fija los timeouts hasta el final de la transacción en curso
+    con SET LOCAL (set_config con is_local).
+    """
+    return text(
+        "SELECT set_config('statement_timeout', :statement_timeout, true), "
+        "set_config('lock_timeout', :lock_timeout, true)"
+    ).bindparams(
+        statement_timeout=str(timeouts.statement_timeout_ms),
+        lock_timeout=str(timeouts.lock_timeout_ms),
+    )
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_db_timeouts(session, transaction, connection):
+    """
+    Aplica a cada transacción los timeouts de la ruta con SET LOCAL
+    (set_config con is_local), que se deshacen al terminar la transacción.
+    Solo cuesta una sentencia cuando la ruta cambia los valores por defecto.
+    """
+    timeouts = current_db_timeouts.get()
+    if timeouts is None or timeouts == DEFAULT_DB_TIMEOUTS or connection.dialect.name != "postgresql":
+        return
+    connection.execute(set_db_timeouts(timeouts))
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """
+    Anota el inicio de la sentencia en su contexto de ejecución, que se descarta
+    con ella aunque falle y no llegue a after_cursor_execute. Las sentencias
+    internas del dialecto no tienen contexto: su inicio va a la conexión y lo
+    sobrescribe la siguiente, sin acumularse.
+    """
+    if context is not None:
+        context.query_start = time.perf_counter()
+    else:
+        conn.info["query_start"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """Suma la sentencia a los contadores activos y registra las consultas lentas"""
+    start = context.query_start if context is not None else conn.info.pop("query_start")
+    elapsed = time.perf_counter() - start
+    stats = current_query_stats.get()
+    while stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+        stats = stats.parent
+    
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold and elapsed * 1000 >= threshold:
+        log_slow_query(conn, statement, parameters, elapsed, executemany)
+
+
+def pool_status() -> Dict[str, float]:
+    """Estado del pool de este worker y su ocupación (en uso / máximo)"""
+    pool = engine.sync_engine.pool
+    size = pool.size()
+    capacity = size + settings.DB_MAX_OVERFLOW
+    checked_out = pool.checkedout()
+    return {
+        "size": size,
+        "max": capacity,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "utilization": round(checked_out / capacity, 3) if capacity else 0.0,
+    }
+
+
+def observe_pool() -> None:
+    """
+    Actualiza los gauges del pool con su estado actual.
+    Se llama al terminar cada petición y al servir /metrics, así cada worker
+    publica su propio estado y el modo multiproceso los suma.
+    """
+    status = pool_status()
+    DB_POOL_SIZE.set(status["size"])
+    DB_POOL_MAX.set(status["max"])
+    DB_POOL_CHECKED_OUT.set(status["checked_out"])
+    DB_POOL_CHECKED_IN.set(status["checked_in"])
+    DB_POOL_OVERFLOW.set(status["overflow"])
+
+
+async def warm_up_pool() -> None:
+    """
+    Abre DB_POOL_SIZE conexiones en paralelo al arrancar el worker para que
+    las primeras peticiones no paguen el coste de conectar.
+    Si la base de datos no responde el arranque continúa y se conectará bajo demanda.
+    """
+    async def open_connection():
+        connection = await engine.connect()
+        await connection.exec_driver_sql("SELECT 1")
+        return connection
+    
+    results = await asyncio.gather(
+        *(open_connection() for _ in range(settings.DB_POOL_SIZE)), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.warning("No se pudo precalentar el pool de conexiones: %s", result)
+        else:
+            await result.close()
+    observe_pool()
+
+
 async def get_db() -> AsyncSession:
     """
     Dependency para obtener una sesión de base de datos.
@@ -0,0 +1,152 @@
+"""
+Registro de consultas lentas.
+Las sentencias que superan SLOW_QUERY_THRESHOLD_MS se escriben en un archivo
+rotativo (una línea JSON por consulta) con los parámetros ocultos, la ruta
+que las ejecutó y, para las SELECT, su plan EXPLAIN (ANALYZE, BUFFERS)
+capturado en segundo plano con una conexión aparte.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, List, Optional, Set
+
+import asyncpg
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.core.request_context import current_route
+
+logger = logging.getLogger("taskflow.slow_query")
+logger.propagate = False
+
+# Última captura de plan por sentencia, para no repetir EXPLAIN de la misma consulta
+_explained_at: Dict[str, float] = {}
+_explain_running = False
+# Tareas de EXPLAIN en curso (referencia fuerte para que no se recolecten)
+pending_explains: Set[asyncio.Task] = set()
+
+
+def _get_logger() -> logging.Logger:
+    """Configura el archivo rotativo en el primer uso (o si cambió la ruta)"""
+    path = os.path.abspath(settings.SLOW_QUERY_LOG_FILE)
+    handler = logger.handlers[0] if logger.handlers else None
+    if handler is None or getattr(handler, "baseFilename", None) != path:
+        if handler is not None:
+            logger.removeHandler(handler)
+            handler.close()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+            backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+            encoding="utf-8",
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return logger
+
+
+def redact_parameters(parameters: Any, executemany: bool) -> Any:
+    """Sustituye los valores de los parámetros por su tipo (y longitud en textos)"""
+    if executemany:
+        return f"<{len(parameters)} filas>"
+    if isinstance(parameters, dict):
+        parameters = list(parameters.values())
+    redacted: List[Optional[str]] = []
+    for value in parameters or ():
+        if value is None:
+            redacted.append(None)
+        elif isinstance(value, (str, bytes, list, tuple)):
+            redacted.append(f"{type(value).__name__}({len(value)})")
+        else:
+            redacted.append(type(value).__name__)
+    return redacted
+
+
+def _can_explain(statement: str, executemany: bool) -> bool:
+    """
+    Solo se analizan SELECT de una fila de parámetros: EXPLAIN ANALYZE ejecuta
+    la sentencia, así que nunca se aplica a escrituras ni a SELECT ... FOR UPDATE.
+    """
+    text = statement.lstrip().upper()
+    return (
+        not executemany
+        and text.startswith("SELECT")
+        and " FOR UPDATE" not in text
+        and " FOR SHARE" not in text
+    )
+
+
+def log_slow_query(
+    conn: Connection,
+    statement: str,
+    parameters: Any,
+    duration: float,
+    executemany: bool,
+) -> None:
+    """
+    Registra una consulta lenta. Si corresponde capturar su plan, el registro
+    se escribe cuando termina el EXPLAIN, sin bloquear la petición.
+    """
+    global _explain_running
+    record = {
+        "time": datetime.utcnow().isoformat(timespec="milliseconds"),
+        "duration_ms": round(duration * 1000, 2),
+        "route": current_route(),
+        "statement": statement,
+        "parameters": redact_parameters(parameters, executemany),
+    }
+
+    loop = None
+    if settings.SLOW_QUERY_EXPLAIN and conn.dialect.name == "postgresql" and _can_explain(statement, executemany):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            pass  # Engine síncrono (scripts, Alembic): solo se registra la sentencia
+
+    now = time.monotonic()
+    last = _explained_at.get(statement)
+    recent = last is not None and now - last < settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS
+    if loop is None or recent or _explain_running:
+        _get_logger().info(json.dumps(record, default=str, ensure_ascii=False))
+        return
+
+    if len(_explained_at) > 1000:
+        _explained_at.clear()
+    _explained_at[statement] = now
+    _explain_running = True
+    url = conn.engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    task = loop.create_task(_explain_and_log(url, statement, list(parameters or ()), record))
+    pending_explains.add(task)
+    task.add_done_callback(pending_explains.discard)
+
+
+async def _explain_and_log(url: str, statement: str, parameters: List[Any], record: dict) -> None:
+    """Obtiene el plan en una conexión aparte (sin eventos ni pool) y escribe el registro"""
+    global _explain_running
+    try:
+        connection = await asyncpg.connect(url)
+        try:
+            transaction = connection.transaction()
+            await transaction.start()
+            try:
+                rows = await connection.fetch(
+                    f"EXPLAIN (ANALYZE, BUFFERS) {statement}",
+                    *parameters,
+                    timeout=settings.SLOW_QUERY_EXPLAIN_TIMEOUT_SECONDS,
+                )
+            finally:
+                await transaction.rollback()
+        finally:
+            await connection.close()
+        record["plan"] = "\n".join(row[0] for row in rows)
+    except Exception as exc:  # El plan es opcional: el registro se escribe igual
+        record["plan_error"] = f"{type(exc).__name__}: {exc}"
+    finally:
+        _explain_running = False
+    _get_logger().info(json.dumps(record, default=str, ensure_ascii=False))
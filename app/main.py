@@ -2,11 +2,54 @@
 Aplicación principal de FastAPI.
 Configura la aplicación, middlewares y routers.
 """
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+
+import asyncpg
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
 from app.api.v1 import api_router
+from app.core.admission import limiter
+from app.core.cache import auth_cache_stats, user_cache
 from app.core.config import settings
+from app.core.metrics import mark_process_dead, render_metrics
+from app.core.middleware import (
+    QUERY_COUNT_HEADER,
+    QUERY_TIME_HEADER,
+    AdmissionControlMiddleware,
+    CompressionMiddleware,
+    MetricsMiddleware,
+    QueryCountHeaderMiddleware,
+    RequestContextMiddleware,
+)
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.db.notifications import change_listener
+from app.db.session import engine, observe_pool, pool_status, read_replicas, warm_up_pool
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Arranque y apagado de cada worker"""
+    if settings.DB_POOL_WARMUP:
+        await warm_up_pool()
+    if user_cache.enabled:
+        # Invalidaciones de la caché de autenticación hechas en otros workers
+        try:
+            await change_listener.start(persistent=True)
+        except (OSError, asyncpg.PostgresError) as exc:
+            logger.warning("No se pudo abrir la conexión LISTEN: %s", exc)
+    yield
+    await change_listener.close()
+    await engine.dispose()
+    await read_replicas.dispose()
+    mark_process_dead()
+
 
 # Crear instancia de FastAPI
 app = FastAPI(
@@ -15,6 +58,7 @@ app = FastAPI(
     description="API REST para gestión de tareas con autenticación JWT",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Configurar CORS
@@ -24,12 +68,78 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, QUERY_COUNT_HEADER, QUERY_TIME_HEADER, "ETag"],
 )
 
+# Compresión negociada de las respuestas de texto (incluido el streaming)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE_BYTES,
+        levels={
+            "gzip": settings.COMPRESSION_GZIP_LEVEL,
+            "br": settings.COMPRESSION_BROTLI_QUALITY,
+            "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+        },
+    )
+
+# Sentencias SQL por petición en headers de respuesta (solo en debug)
+if settings.DEBUG:
+    app.add_middleware(QueryCountHeaderMiddleware)
+
+# Ruta en curso accesible desde el registro de consultas lentas
+app.add_middleware(RequestContextMiddleware)
+
+# Rechazo rápido (503) al superar el límite de concurrencia
+if limiter.enabled:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        limiter=limiter,
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+        # Los streams SSE siguen abiertos indefinidamente sin usar el pool
+        exclude_paths=("/health", "/metrics", f"{settings.API_V1_PREFIX}/tasks/events"),
+    )
+
+# Métricas por ruta (el último middleware añadido es el más externo)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Incluir routers de la API
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
 
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    """Sin conexiones libres en el pool: 503 en lugar de un error interno"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Servidor saturado, inténtalo de nuevo más tarde"},
+        headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+    )
+
+
+@app.exception_handler(DBAPIError)
+async def db_timeout_handler(request: Request, exc: DBAPIError):
+    """
+    Consultas canceladas por los timeouts de la ruta: 504 si se agotó
+    statement_timeout y 503 si no se obtuvo un bloqueo a tiempo.
+    El resto de errores de base de datos siguen siendo errores internos.
+    """
+    sqlstate = getattr(exc.orig, "sqlstate", None)
+    if sqlstate == "57014":  # query_canceled
+        return JSONResponse(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            content={"detail": "La consulta superó el tiempo máximo permitido"},
+        )
+    if sqlstate == "55P03":  # lock_not_available
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": "Recurso bloqueado, inténtalo de nuevo más tarde"},
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+        )
+    raise exc
+
+
 @app.get("/")
 async def root():
     """Endpoint raíz de la API"""
@@ -43,7 +153,20 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Endpoint para verificar el estado de la API"""
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "auth_cache": auth_cache_stats(),
+        "db_pool": pool_status(),
+        "admission": limiter.stats(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas en formato Prometheus (agregadas entre workers si aplica)"""
+    observe_pool()
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@
 Modelo de Etiqueta (Tag) para SQLAlchemy.
 Define la tabla 'tags' con sus campos y relaciones.
 """
-from sqlalchemy import Column, String
+from sqlalchemy import Column, Index, String
 from sqlalchemy.orm import relationship
 
 from app.db.base import BaseModel
@@ -19,5 +19,9 @@ class Tag(BaseModel):
     # Relación muchos-a-muchos con tareas
     tasks = relationship("Task", secondary=task_tags, back_populates="tags")
     
+    __table_args__ = (
+        Index("ix_tags_created_at_id", "created_at", "id"),
+    )
+    
     def __repr__(self):
         return f"<Tag(id={self.id}, name={self.name})>"
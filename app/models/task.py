@@ -2,8 +2,9 @@
 Modelo de Tarea para SQLAlchemy.
 Define la tabla 'tasks' con sus campos y relaciones.
 """
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Table, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, Computed, DateTime, ForeignKey, Index, Integer, String, Table, Text, false
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from app.db.base import Base, BaseModel
 
@@ -16,6 +17,28 @@ task_tags = Table(
 )
 
 
+# Registro de tareas borradas (tombstones) para la sincronización incremental.
+# Los IDs de tarea no se reutilizan, así que cada tarea se borra una sola vez.
+task_deletions = Table(
+    "task_deletions",
+    Base.metadata,
+    Column("task_id", Integer, primary_key=True, autoincrement=False),
+    Column("owner_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("deleted_at", DateTime, nullable=False),
+    Index("ix_task_deletions_owner_id_deleted_at_task_id", "owner_id", "deleted_at", "task_id"),
+)
+
+
+# Configuración de texto de la búsqueda (stemming en español)
+SEARCH_CONFIG = "spanish"
+
+# tsvector de búsqueda: el título pesa más (A) que la descripción (B)
+SEARCH_VECTOR_SQL = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, title), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(description, '')), 'B')"
+)
+
+
 class Task(BaseModel):
     """Modelo de tarea del sistema"""
     __tablename__ = "tasks"
@@ -25,6 +48,9 @@ class Task(BaseModel):
     is_completed = Column(Boolean, default=False, nullable=False)
     priority = Column(Integer, default=0, nullable=False)  # 0=baja, 1=media, 2=alta
     
+    # Calculada por PostgreSQL al escribir; solo la usa la búsqueda (no se carga por defecto)
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
+    
     # Foreign key al usuario propietario
     owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
@@ -32,5 +58,24 @@ class Task(BaseModel):
     owner = relationship("User", back_populates="tasks")
     tags = relationship("Tag", secondary=task_tags, back_populates="tasks")
     
+    __table_args__ = (
+        # Índices compuestos para el listado filtrado y paginado de un usuario
+        Index("ix_tasks_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        Index("ix_tasks_owner_id_updated_at_id", "owner_id", "updated_at", "id"),
+        Index("ix_tasks_owner_id_priority_id", "owner_id", "priority", "id"),
+        Index(
+            "ix_tasks_owner_id_is_completed_created_at_id",
+            "owner_id", "is_completed", "created_at", "id",
+        ),
+        # Índice parcial: tareas pendientes de un usuario ordenadas por prioridad
+        Index(
+            "ix_tasks_owner_id_open_priority_id",
+            "owner_id", "priority", "id",
+            postgresql_where=is_completed == false(),
+        ),
+        # Búsqueda de texto completo en título y descripción
+        Index("ix_tasks_search_vector", "search_vector", postgresql_using="gin"),
+    )
+    
     def __repr__(self):
         return f"<Task(id={self.id}, title={self.title}, completed={self.is_completed})>"
@@ -2,12 +2,18 @@
 Repositorio para operaciones de base de datos relacionadas con etiquetas.
 Abstrae las queries de SQLAlchemy.
 """
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import Cursor
+from app.db.notifications import notify_changes
 from app.models.tag import Tag
+from app.models.task import Task, task_tags
 
 
 class TagRepository:
@@ -16,6 +22,22 @@ class TagRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
     
+    @staticmethod
+    def state_subquery():
+        """
+        Número de etiquetas y su última modificación: cambia con cualquier
+        alta, edición o borrado (sirve como validador para ETag)
+        """
+        return select(
+            func.count(Tag.id).label("tags"),
+            func.max(Tag.updated_at).label("tags_updated_at"),
+        ).subquery()
+    
+    async def get_state(self) -> Row:
+        """Estado de las etiquetas para calcular el ETag del listado"""
+        result = await self.db.execute(select(self.state_subquery()))
+        return result.one()
+    
     async def get_by_id(self, tag_id: int) -> Optional[Tag]:
         """Obtiene una etiqueta por su ID"""
         result = await self.db.execute(select(Tag).where(Tag.id == tag_id))
@@ -26,11 +48,22 @@ class TagRepository:
         result = await self.db.execute(select(Tag).where(Tag.name == name))
         return result.scalar_one_or_none()
     
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[Tag]:
-        """Obtiene todas las etiquetas con paginación"""
-        result = await self.db.execute(
-            select(Tag).offset(skip).limit(limit)
-        )
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Cursor] = None,
+    ) -> List[Tag]:
+        """
+        Obtiene las etiquetas ordenadas por (created_at, id).
+        Si se indica `after` se usa paginación keyset y se ignora `skip`.
+        """
+        query = select(Tag).order_by(Tag.created_at, Tag.id).limit(limit)
+        if after is not None:
+            query = query.where(tuple_(Tag.created_at, Tag.id) > tuple_(after.value, after.id))
+        else:
+            query = query.offset(skip)
+        result = await self.db.execute(query)
         return result.scalars().all()
     
     async def get_by_ids(self, tag_ids: List[int]) -> List[Tag]:
@@ -40,20 +73,79 @@ class TagRepository:
         )
         return result.scalars().all()
     
+    async def get_by_task(self, task_id: int) -> List[Tag]:
+        """Obtiene las etiquetas asociadas a una tarea"""
+        result = await self.db.execute(
+            select(Tag)
+            .join(task_tags, task_tags.c.tag_id == Tag.id)
+            .where(task_tags.c.task_id == task_id)
+        )
+        return result.scalars().all()
+    
+    async def get_by_tasks(self, task_ids: List[int]) -> Dict[int, List[Tag]]:
+        """Obtiene las etiquetas de varias tareas agrupadas por ID de tarea"""
+        tags_by_task: Dict[int, List[Tag]] = {task_id: [] for task_id in task_ids}
+        if not task_ids:
+            return tags_by_task
+        result = await self.db.execute(
+            select(task_tags.c.task_id, Tag)
+            .join(task_tags, task_tags.c.tag_id == Tag.id)
+            .where(task_tags.c.task_id.in_(task_ids))
+        )
+        for task_id, tag in result.all():
+            tags_by_task[task_id].append(tag)
+        return tags_by_task
+    
+    async def get_or_create_by_names(self, names: List[str]) -> Dict[str, int]:
+        """
+        Resuelve nombres de etiquetas a IDs creando las que no existan.
+        Usa un INSERT multi-fila con ON CONFLICT y una consulta de lectura.
+        """
+        if not names:
+            return {}
+        created = await self.db.execute(
+            insert(Tag.__table__)
+            .values([{"name": name} for name in names])
+            .on_conflict_do_nothing(index_elements=["name"])
+            .returning(Tag.id)
+        )
+        created_ids = created.scalars().all()
+        if created_ids:
+            await self.db.execute(notify_changes("tag", {"created": created_ids}))
+        result = await self.db.execute(select(Tag.name, Tag.id).where(Tag.name.in_(names)))
+        return dict(result.all())
+    
     async def create(self, tag: Tag) -> Tag:
         """Crea una nueva etiqueta"""
         self.db.add(tag)
+        await self.db.flush()
+        await self.db.execute(notify_changes("tag", {"created": [tag.id]}))
         await self.db.commit()
         await self.db.refresh(tag)
         return tag
     
+    async def _touch_tasks(self, tag_id: int) -> None:
+        """
+        Marca como modificadas las tareas con la etiqueta: su respuesta incluye
+        los tags, así que la sincronización incremental debe volver a enviarlas.
+        """
+        await self.db.execute(
+            update(Task.__table__)
+            .where(Task.id.in_(select(task_tags.c.task_id).where(task_tags.c.tag_id == tag_id)))
+            .values(updated_at=datetime.utcnow())
+        )
+    
     async def update(self, tag: Tag) -> Tag:
         """Actualiza una etiqueta existente"""
+        await self._touch_tasks(tag.id)
+        await self.db.execute(notify_changes("tag", {"updated": [tag.id]}))
         await self.db.commit()
         await self.db.refresh(tag)
         return tag
     
     async def delete(self, tag: Tag) -> None:
         """Elimina una etiqueta"""
+        await self._touch_tasks(tag.id)
         await self.db.delete(tag)
+        await self.db.execute(notify_changes("tag", {"deleted": [tag.id]}))
         await self.db.commit()
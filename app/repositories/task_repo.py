@@ -2,13 +2,49 @@
 Repositorio para operaciones de base de datos relacionadas con tareas.
 Abstrae las queries de SQLAlchemy.
 """
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set
 
-from sqlalchemy import select
+from sqlalchemy import Text, case, delete, func, insert, literal_column, select, true, tuple_, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.engine import Row, RowMapping
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.task import Task
+from app.core.config import settings
+from app.core.pagination import Cursor
+from app.db.notifications import notify_changes
+from app.db.session import BULK_DB_TIMEOUTS, set_db_timeouts
+from app.models.tag import Tag
+from app.models.task import SEARCH_CONFIG, Task, task_deletions, task_tags
+from app.repositories.tag_repo import TagRepository
+from app.schemas.task import TaskFilter
+
+tasks_table = Task.__table__
+tags_table = Tag.__table__
+
+# Columnas que se leen de una tarea: todas menos el tsvector, que solo usa la búsqueda
+TASK_COLUMNS = tuple(column for column in tasks_table.c if column is not tasks_table.c.search_vector)
+
+# Columnas exportadas, en el mismo orden que TaskResponse
+EXPORT_COLUMNS = (
+    "id", "title", "description", "priority", "is_completed",
+    "owner_id", "created_at", "updated_at",
+)
+
+
+def _isoformat(column):
+    """
+    Formatea un timestamp en SQL igual que datetime.isoformat() de Python
+    (PostgreSQL omite los ceros finales de los microsegundos en JSON).
+    """
+    return case(
+        (
+            func.date_trunc("second", column) == column,
+            func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS'),
+        ),
+        else_=func.to_char(column, 'YYYY-MM-DD"T"HH24:MI:SS.US'),
+    )
 
 
 class TaskRepository:
@@ -26,33 +62,494 @@ class TaskRepository:
         )
         return result.scalar_one_or_none()
     
-    async def get_all_by_owner(self, owner_id: int, skip: int = 0, limit: int = 100) -> List[Task]:
-        """Obtiene todas las tareas de un usuario con paginación"""
+    async def get_list_state(self, owner_id: int) -> Row:
+        """
+        Número de tareas del usuario y su última modificación, junto con el
+        estado de las etiquetas (sus cambios también se ven en el listado).
+        Una sola consulta resuelta con el índice (owner_id, updated_at, id).
+        """
+        tasks_state = (
+            select(
+                func.count(tasks_table.c.id).label("tasks"),
+                func.max(tasks_table.c.updated_at).label("tasks_updated_at"),
+            )
+            .where(tasks_table.c.owner_id == owner_id)
+            .subquery()
+        )
+        tags_state = TagRepository.state_subquery()
         result = await self.db.execute(
-            select(Task)
-            .options(selectinload(Task.tags))
-            .where(Task.owner_id == owner_id)
-            .offset(skip)
-            .limit(limit)
+            select(tasks_state, tags_state).select_from(tasks_state.join(tags_state, true()))
+        )
+        return result.one()
+    
+    async def get_state(self, task_id: int, owner_id: int) -> Optional[Row]:
+        """
+        Última modificación de una tarea junto con el estado de las etiquetas.
+        Devuelve None si la tarea no existe o no pertenece al usuario.
+        """
+        tags_state = TagRepository.state_subquery()
+        result = await self.db.execute(
+            select(tasks_table.c.updated_at, tags_state)
+            .select_from(tasks_table.join(tags_state, true()))
+            .where(tasks_table.c.id == task_id, tasks_table.c.owner_id == owner_id)
+        )
+        return result.one_or_none()
+    
+    async def get_row_by_id(self, task_id: int, owner_id: int) -> Optional[Row]:
+        """Obtiene una tarea con sus tags agregados en JSON en una sola consulta (solo lectura)"""
+        result = await self.db.execute(
+            select(*TASK_COLUMNS, self._tags_json().label("tags"))
+            .where(tasks_table.c.id == task_id, tasks_table.c.owner_id == owner_id)
+        )
+        return result.one_or_none()
+    
+    async def get_all_by_owner(
+        self,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[TaskFilter] = None,
+        after: Optional[Cursor] = None,
+    ) -> List[Task]:
+        """
+        Obtiene las tareas de un usuario filtradas y ordenadas por (campo, id).
+        Si se indica `after` se usa paginación keyset y se ignora `skip`.
+        """
+        query = select(Task).options(selectinload(Task.tags))
+        result = await self.db.execute(
+            self._page_by_owner(query, owner_id, skip, limit, filters, after)
         )
         return result.scalars().all()
     
-    async def create(self, task: Task) -> Task:
-        """Crea una nueva tarea"""
-        self.db.add(task)
+    async def get_rows_by_owner(
+        self,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[TaskFilter] = None,
+        after: Optional[Cursor] = None,
+    ) -> List[Row]:
+        """
+        Variante de solo lectura de get_all_by_owner: una única consulta con
+        los tags de cada tarea agregados en JSON y filas ligeras en lugar de
+        objetos ORM (sin identity map). Cada tag llega como dict con las
+        fechas ya en ISO 8601.
+        """
+        query = select(*TASK_COLUMNS, self._tags_json().label("tags"))
+        result = await self.db.execute(
+            self._page_by_owner(query, owner_id, skip, limit, filters, after)
+        )
+        return result.all()
+    
+    async def search_rows(
+        self, owner_id: int, text: str, limit: int, after: Optional[Cursor] = None
+    ) -> List[Row]:
+        """
+        Busca tareas del usuario por palabras del título y la descripción
+        (sintaxis de websearch_to_tsquery: "frase", OR, -palabra) con el índice
+        GIN sobre search_vector. Ordena por relevancia y luego por ID, ambos
+        descendentes; con `after` continúa tras esa posición (rank, id).
+        Cada fila incluye sus tags en JSON y su relevancia en `rank`.
+        """
+        vector = tasks_table.c.search_vector
+        tsquery = func.websearch_to_tsquery(literal_column(f"'{SEARCH_CONFIG}'::regconfig"), text)
+        rank = func.ts_rank(vector, tsquery)
+        query = (
+            select(*TASK_COLUMNS, self._tags_json().label("tags"), rank.label("rank"))
+            .where(tasks_table.c.owner_id == owner_id, vector.op("@@")(tsquery))
+            .order_by(rank.desc(), tasks_table.c.id.desc())
+            .limit(limit)
+        )
+        if after is not None:
+            query = query.where(tuple_(rank, tasks_table.c.id) < tuple_(after.value, after.id))
+        result = await self.db.execute(query)
+        return result.all()
+    
+    async def get_changed_rows(
+        self, owner_id: int, since: Optional[Cursor], limit: int
+    ) -> List[Row]:
+        """
+        Tareas creadas o modificadas después de la posición (updated_at, id),
+        en ese orden y con sus tags agregados en JSON. Usa el índice
+        (owner_id, updated_at, id): el coste depende de los cambios, no de la cuenta.
+        """
+        query = (
+            select(*TASK_COLUMNS, self._tags_json().label("tags"))
+            .where(tasks_table.c.owner_id == owner_id)
+            .order_by(tasks_table.c.updated_at, tasks_table.c.id)
+            .limit(limit)
+        )
+        if since is not None:
+            query = query.where(
+                tuple_(tasks_table.c.updated_at, tasks_table.c.id) > tuple_(since.value, since.id)
+            )
+        result = await self.db.execute(query)
+        return result.all()
+    
+    async def get_deletions(self, owner_id: int, since: Cursor, limit: int) -> List[Row]:
+        """Tareas borradas después de la posición (deleted_at, task_id), en ese orden"""
+        result = await self.db.execute(
+            select(task_deletions.c.deleted_at, task_deletions.c.task_id)
+            .where(
+                task_deletions.c.owner_id == owner_id,
+                tuple_(task_deletions.c.deleted_at, task_deletions.c.task_id)
+                > tuple_(since.value, since.id),
+            )
+            .order_by(task_deletions.c.deleted_at, task_deletions.c.task_id)
+            .limit(limit)
+        )
+        return result.all()
+    
+    @classmethod
+    def _page_by_owner(
+        cls,
+        query,
+        owner_id: int,
+        skip: int,
+        limit: int,
+        filters: Optional[TaskFilter],
+        after: Optional[Cursor],
+    ):
+        """Aplica a la consulta los filtros, el orden y la paginación del listado"""
+        filters = filters or TaskFilter()
+        sort_column = getattr(Task, filters.sort.value.lstrip("-"))
+        descending = filters.sort.value.startswith("-")
+        
+        query = query.where(Task.owner_id == owner_id, *cls._filter_conditions(filters)).limit(limit)
+        if descending:
+            query = query.order_by(sort_column.desc(), Task.id.desc())
+        else:
+            query = query.order_by(sort_column, Task.id)
+        
+        if after is not None:
+            # Usa los índices (owner_id, <campo>, id) en lugar de OFFSET
+            position = tuple_(sort_column, Task.id)
+            last = tuple_(after.value, after.id)
+            query = query.where(position < last if descending else position > last)
+        else:
+            query = query.offset(skip)
+        return query
+    
+    @staticmethod
+    def _filter_conditions(filters: TaskFilter) -> List:
+        """Traduce los filtros del listado a condiciones SQL"""
+        conditions = []
+        if filters.is_completed is not None:
+            conditions.append(Task.is_completed == filters.is_completed)
+        if filters.priority_min is not None:
+            conditions.append(Task.priority >= filters.priority_min)
+        if filters.priority_max is not None:
+            conditions.append(Task.priority <= filters.priority_max)
+        if filters.created_after is not None:
+            conditions.append(Task.created_at >= filters.created_after)
+        if filters.created_before is not None:
+            conditions.append(Task.created_at < filters.created_before)
+        if filters.updated_after is not None:
+            conditions.append(Task.updated_at >= filters.updated_after)
+        if filters.updated_before is not None:
+            conditions.append(Task.updated_at < filters.updated_before)
+        return conditions
+    
+    async def create(self, values: Dict[str, Any], tag_ids: List[int]) -> RowMapping:
+        """
+        Crea una nueva tarea con INSERT ... RETURNING y asocia sus tags.
+        Devuelve las columnas de la tarea sin volver a consultarla.
+        """
+        result = await self.db.execute(
+            insert(tasks_table).values(**values).returning(*TASK_COLUMNS)
+        )
+        row = result.mappings().one()
+        await self._link_tags(row["id"], tag_ids)
+        await self.db.execute(notify_changes("task", {"created": [row["id"]]}, values["owner_id"]))
+        await self.db.commit()
+        return row
+    
+    async def update(
+        self,
+        task_id: int,
+        owner_id: int,
+        values: Dict[str, Any],
+        tag_ids: Optional[List[int]] = None,
+    ) -> Optional[RowMapping]:
+        """
+        Actualiza una tarea con UPDATE ... RETURNING en una sola consulta.
+        Si `tag_ids` no es None reemplaza los tags de la tarea.
+        Devuelve None si la tarea no existe o no pertenece al usuario.
+        """
+        if tag_ids is not None:
+            # Cambiar los tags también cuenta como modificación de la tarea
+            values = {**values, "updated_at": datetime.utcnow()}
+        
+        result = await self.db.execute(
+            update(tasks_table)
+            .where(tasks_table.c.id == task_id, tasks_table.c.owner_id == owner_id)
+            .values(**values)
+            .returning(*TASK_COLUMNS)
+        )
+        row = result.mappings().one_or_none()
+        if row is None:
+            return None
+        
+        if tag_ids is not None:
+            await self.db.execute(delete(task_tags).where(task_tags.c.task_id == task_id))
+            await self._link_tags(task_id, tag_ids)
+        await self.db.execute(notify_changes("task", {"updated": [task_id]}, owner_id))
+        await self.db.commit()
+        return row
+    
+    async def get_owned_ids(self, owner_id: int, task_ids: List[int]) -> Set[int]:
+        """Devuelve, en una sola consulta, cuáles de los IDs pertenecen al usuario"""
+        if not task_ids:
+            return set()
+        result = await self.db.execute(
+            select(tasks_table.c.id)
+            .where(tasks_table.c.id.in_(task_ids), tasks_table.c.owner_id == owner_id)
+        )
+        return set(result.scalars().all())
+    
+    async def get_rows_by_ids(self, task_ids: List[int]) -> List[RowMapping]:
+        """Obtiene las columnas de varias tareas sin cargar objetos ORM"""
+        if not task_ids:
+            return []
+        result = await self.db.execute(
+            select(*TASK_COLUMNS).where(tasks_table.c.id.in_(task_ids))
+        )
+        return result.mappings().all()
+    
+    async def bulk_write(
+        self,
+        owner_id: int,
+        creates: List[Dict[str, Any]],
+        create_tag_ids: List[List[int]],
+        updates: List[Dict[str, Any]],
+        update_tag_ids: Dict[int, List[int]],
+        delete_ids: List[int],
+    ) -> List[RowMapping]:
+        """
+        Aplica creaciones, actualizaciones y borrados en una única transacción
+        usando sentencias multi-fila. Las actualizaciones deben incluir "id" y
+        referirse a tareas ya validadas como propias.
+        
+        Returns:
+            Filas de las tareas creadas, en el mismo orden que `creates`
+        """
+        created: List[RowMapping] = []
+        if creates:
+            result = await self.db.execute(
+                insert(tasks_table).returning(*TASK_COLUMNS, sort_by_parameter_order=True),
+                creates,
+            )
+            created = result.mappings().all()
+        
+        links = [
+            {"task_id": row["id"], "tag_id": tag_id}
+            for row, tag_ids in zip(created, create_tag_ids)
+            for tag_id in tag_ids
+        ]
+        
+        if updates:
+            # UPDATE por clave primaria agrupado por conjunto de columnas
+            now = datetime.utcnow()
+            await self.db.execute(
+                update(Task), [{**values, "updated_at": now} for values in updates]
+            )
+        
+        if update_tag_ids:
+            await self.db.execute(
+                delete(task_tags).where(task_tags.c.task_id.in_(list(update_tag_ids)))
+            )
+            links.extend(
+                {"task_id": task_id, "tag_id": tag_id}
+                for task_id, tag_ids in update_tag_ids.items()
+                for tag_id in tag_ids
+            )
+        
+        if links:
+            await self.db.execute(insert(task_tags), links)
+        
+        if delete_ids:
+            # Las asociaciones en task_tags se borran en cascada
+            result = await self.db.execute(
+                delete(tasks_table)
+                .where(tasks_table.c.id.in_(delete_ids), tasks_table.c.owner_id == owner_id)
+                .returning(tasks_table.c.id)
+            )
+            deleted_ids = result.scalars().all()
+            await self._record_deletions(owner_id, deleted_ids)
+        else:
+            deleted_ids = []
+        
+        changes = {
+            "created": [row["id"] for row in created],
+            "updated": [values["id"] for values in updates],
+            "deleted": deleted_ids,
+        }
+        changes = {op: ids for op, ids in changes.items() if ids}
+        if changes:
+            await self.db.execute(notify_changes("task", changes, owner_id))
         await self.db.commit()
-        await self.db.refresh(task)
-        # Re-fetch to ensure tags are loaded (avoid MissingGreenlet)
-        return await self.get_by_id(task.id, task.owner_id)
+        return created
+    
+    async def stream_export_json(
+        self, owner_id: int, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[str]]:
+        """
+        Recorre las tareas de un usuario con un cursor del servidor.
+        Cada tarea se serializa a JSON en PostgreSQL, con sus tags agregados
+        en una subconsulta; se devuelven lotes de `batch_size` líneas.
+        """
+        tags_json = self._tags_json()
+        fields = []
+        for name in EXPORT_COLUMNS:
+            column = tasks_table.c[name]
+            fields.extend([name, _isoformat(column) if name.endswith("_at") else column])
+        line = func.json_build_object(*fields, "tags", tags_json).cast(Text)
+        
+        async for batch in self._stream_by_owner(select(line), owner_id, batch_size):
+            yield [row[0] for row in batch]
+    
+    async def stream_export_rows(
+        self, owner_id: int, batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Recorre las tareas de un usuario con un cursor del servidor.
+        Cada fila incluye las columnas exportadas y los nombres de sus tags.
+        """
+        tag_names = self._task_tags_subquery(
+            func.coalesce(
+                func.string_agg(tags_table.c.name, literal_column("'|'")),
+                literal_column("''"),
+            )
+        )
+        query = select(*(tasks_table.c[name] for name in EXPORT_COLUMNS), tag_names.label("tags"))
+        async for batch in self._stream_by_owner(query, owner_id, batch_size):
+            yield batch
     
-    async def update(self, task: Task) -> Task:
-        """Actualiza una tarea existente"""
+    @classmethod
+    def _tags_json(cls):
+        """Subconsulta con los tags de cada tarea como array JSON, ordenados por ID"""
+        tag_objects = func.json_build_object(
+            "id", tags_table.c.id,
+            "name", tags_table.c.name,
+            "color", tags_table.c.color,
+            "created_at", _isoformat(tags_table.c.created_at),
+            "updated_at", _isoformat(tags_table.c.updated_at),
+        )
+        return cls._task_tags_subquery(
+            func.coalesce(
+                func.json_agg(aggregate_order_by(tag_objects, tags_table.c.id)),
+                literal_column("'[]'::json"),
+            )
+        )
+    
+    @staticmethod
+    def _task_tags_subquery(aggregate):
+        """Subconsulta correlacionada que agrega los tags de cada tarea"""
+        return (
+            select(aggregate)
+            .select_from(task_tags.join(tags_table, task_tags.c.tag_id == tags_table.c.id))
+            .where(task_tags.c.task_id == tasks_table.c.id)
+            .scalar_subquery()
+        )
+    
+    async def _stream_by_owner(self, query, owner_id: int, batch_size: int) -> AsyncIterator[Sequence[Row]]:
+        """Ejecuta la consulta con cursor del servidor y la entrega por lotes"""
+        result = await self.db.stream(
+            query
+            .where(tasks_table.c.owner_id == owner_id)
+            .order_by(tasks_table.c.created_at, tasks_table.c.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for batch in result.partitions():
+            yield batch
+    
+    async def copy_import_batch(
+        self,
+        owner_id: int,
+        rows: List[Dict[str, Any]],
+        tag_ids: List[List[int]],
+    ) -> None:
+        """
+        Carga un lote de tareas con COPY (asyncpg copy_records_to_table).
+        Los IDs se reservan antes de la secuencia para poder cargar también
+        task_tags con COPY. El lote se confirma al terminar y usa el timeout
+        masivo aunque quien llama no pase por db_timeouts (import_tasks.py).
+        """
+        await self.db.execute(set_db_timeouts(BULK_DB_TIMEOUTS))
+        ids = await self._reserve_ids(len(rows))
+        now = datetime.utcnow()
+        task_records = [
+            (
+                task_id, row["title"], row["description"], row["priority"],
+                row["is_completed"], owner_id, now, now,
+            )
+            for task_id, row in zip(ids, rows)
+        ]
+        link_records = [
+            (task_id, tag_id)
+            for task_id, row_tag_ids in zip(ids, tag_ids)
+            for tag_id in row_tag_ids
+        ]
+        
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver = raw_connection.driver_connection
+        await driver.copy_records_to_table(
+            "tasks",
+            records=task_records,
+            columns=[
+                "id", "title", "description", "priority",
+                "is_completed", "owner_id", "created_at", "updated_at",
+            ],
+        )
+        if link_records:
+            await driver.copy_records_to_table(
+                "task_tags", records=link_records, columns=["task_id", "tag_id"]
+            )
+        # Un evento por lote sin enumerar los IDs: el cliente sincroniza con /changes
+        await self.db.execute(notify_changes("task", {"imported": []}, owner_id))
         await self.db.commit()
-        await self.db.refresh(task)
-        # Re-fetch to ensure tags are loaded
-        return await self.get_by_id(task.id, task.owner_id)
+    
+    async def _reserve_ids(self, count: int) -> List[int]:
+        """Obtiene `count` IDs de la secuencia de tasks en una sola consulta"""
+        result = await self.db.execute(
+            select(func.nextval(func.pg_get_serial_sequence("tasks", "id")))
+            .select_from(func.generate_series(1, count))
+        )
+        return result.scalars().all()
+    
+    async def _link_tags(self, task_id: int, tag_ids: List[int]) -> None:
+        """Inserta las asociaciones tarea-tag en un único INSERT multi-fila"""
+        if tag_ids:
+            await self.db.execute(
+                insert(task_tags).values(
+                    [{"task_id": task_id, "tag_id": tag_id} for tag_id in tag_ids]
+                )
+            )
+    
+    async def _record_deletions(self, owner_id: int, task_ids: List[int]) -> None:
+        """
+        Registra los borrados para la sincronización incremental en la misma
+        transacción y purga los del usuario que superan la retención.
+        """
+        if not task_ids:
+            return
+        now = datetime.utcnow()
+        await self.db.execute(
+            insert(task_deletions),
+            [{"task_id": task_id, "owner_id": owner_id, "deleted_at": now} for task_id in task_ids],
+        )
+        await self.db.execute(
+            delete(task_deletions).where(
+                task_deletions.c.owner_id == owner_id,
+                task_deletions.c.deleted_at
+                < now - timedelta(days=settings.TASK_SYNC_TOMBSTONE_RETENTION_DAYS),
+            )
+        )
     
     async def delete(self, task: Task) -> None:
-        """Elimina una tarea"""
+        """Elimina una tarea dejando constancia del borrado"""
         await self.db.delete(task)
+        await self._record_deletions(task.owner_id, [task.id])
+        await self.db.execute(notify_changes("task", {"deleted": [task.id]}, task.owner_id))
         await self.db.commit()
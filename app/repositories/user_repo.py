@@ -7,6 +7,7 @@ from typing import Optional
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.db.notifications import notify_user_changed
 from app.models.user import User
 
 
@@ -39,12 +40,14 @@ class UserRepository:
         return user
     
     async def update(self, user: User) -> User:
-        """Actualiza un usuario existente"""
+        """Actualiza un usuario existente (y lo invalida en la caché de todos los workers)"""
+        await self.db.execute(notify_user_changed(user.id))
         await self.db.commit()
         await self.db.refresh(user)
         return user
     
     async def delete(self, user: User) -> None:
-        """Elimina un usuario"""
+        """Elimina un usuario (y lo invalida en la caché de todos los workers)"""
         await self.db.delete(user)
+        await self.db.execute(notify_user_changed(user.id))
         await self.db.commit()
@@ -3,10 +3,13 @@ Schemas de Pydantic para validación de datos de Tarea.
 Define los modelos de entrada y salida de la API.
 """
 from datetime import datetime
+from enum import Enum
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, root_validator, validator
 
+from app.core.config import settings
+from app.core.pagination import to_naive_utc
 from app.schemas.tag import TagResponse
 
 
@@ -18,14 +21,19 @@ class TaskBase(BaseModel):
     is_completed: bool = False
 
 
+# Longitud máxima del título (columna tasks.title VARCHAR)
+TITLE_MAX_LENGTH = 255
+
+
 class TaskCreate(TaskBase):
     """Schema para crear una nueva tarea"""
+    title: str = Field(..., max_length=TITLE_MAX_LENGTH)
     tag_ids: Optional[List[int]] = []
 
 
 class TaskUpdate(BaseModel):
     """Schema para actualizar una tarea (todos los campos opcionales)"""
-    title: Optional[str] = None
+    title: Optional[str] = Field(None, max_length=TITLE_MAX_LENGTH)
     description: Optional[str] = None
     priority: Optional[int] = None
     is_completed: Optional[bool] = None
@@ -49,3 +57,99 @@ class TaskResponse(TaskInDB):
     
     class Config:
         orm_mode = True
+
+
+class TaskChanges(BaseModel):
+    """Schema de respuesta de la sincronización incremental de tareas"""
+    changed: List[TaskResponse] = []
+    deleted: List[int] = []
+    next_token: str
+    has_more: bool = False
+
+
+class TaskSort(str, Enum):
+    """Órdenes admitidos en el listado de tareas ("-" indica descendente)"""
+    created_at = "created_at"
+    created_at_desc = "-created_at"
+    updated_at = "updated_at"
+    updated_at_desc = "-updated_at"
+    priority = "priority"
+    priority_desc = "-priority"
+
+
+class TaskFilter(BaseModel):
+    """Schema con los filtros y el orden del listado de tareas"""
+    is_completed: Optional[bool] = None
+    priority_min: Optional[int] = None
+    priority_max: Optional[int] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    updated_after: Optional[datetime] = None
+    updated_before: Optional[datetime] = None
+    sort: TaskSort = TaskSort.created_at
+    
+    @validator("created_after", "created_before", "updated_after", "updated_before")
+    def naive_utc(cls, value):
+        """Las fechas con zona (ej: sufijo Z) se comparan en UTC con las columnas sin zona"""
+        return to_naive_utc(value) if value is not None else value
+
+
+class TaskFileFormat(str, Enum):
+    """Formatos de archivo admitidos en la exportación e importación de tareas"""
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+class TaskBulkUpdate(TaskUpdate):
+    """Schema para actualizar una tarea dentro de una operación masiva"""
+    id: int
+
+
+class TaskBulkRequest(BaseModel):
+    """Schema de una operación masiva de creación, actualización y borrado"""
+    create: List[TaskCreate] = []
+    update: List[TaskBulkUpdate] = []
+    delete: List[int] = []
+    
+    @root_validator(skip_on_failure=True)
+    def check_items(cls, values):
+        """Limita el tamaño del lote y rechaza IDs repetidos"""
+        total = len(values["create"]) + len(values["update"]) + len(values["delete"])
+        if total > settings.TASK_BULK_MAX_ITEMS:
+            raise ValueError(
+                f"Máximo {settings.TASK_BULK_MAX_ITEMS} operaciones por petición"
+            )
+        
+        ids = [item.id for item in values["update"]] + values["delete"]
+        if len(ids) != len(set(ids)):
+            raise ValueError("Cada tarea solo puede aparecer una vez por petición")
+        return values
+
+
+class TaskBulkItemResult(BaseModel):
+    """Resultado de una operación individual dentro del lote"""
+    index: int  # Posición del elemento en la lista de entrada
+    id: Optional[int] = None
+    status: int
+    task: Optional[TaskResponse] = None
+    detail: Optional[str] = None
+
+
+class TaskBulkResponse(BaseModel):
+    """Schema de respuesta con el resultado de cada operación del lote"""
+    created: List[TaskBulkItemResult] = []
+    updated: List[TaskBulkItemResult] = []
+    deleted: List[TaskBulkItemResult] = []
+
+
+class TaskImportError(BaseModel):
+    """Error de validación de una fila importada"""
+    line: int
+    detail: str
+
+
+class TaskImportResult(BaseModel):
+    """Schema de respuesta de una importación masiva"""
+    imported: int = 0
+    failed: int = 0
+    errors: List[TaskImportError] = []  # Solo se detallan los primeros errores
@@ -6,7 +6,7 @@ from typing import Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import create_access_token, verify_password
+from app.core.security import create_access_token, verify_password_async
 from app.models.user import User
 from app.repositories.user_repo import UserRepository
 from app.schemas.user import Token
@@ -37,7 +37,7 @@ class AuthService:
         if not user:
             return None
         
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
         
         if not user.is_active:
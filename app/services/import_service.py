@@ -0,0 +1,155 @@
+"""
+Servicio de importación masiva de tareas.
+Valida las filas por lotes con TaskCreate y las carga con COPY de PostgreSQL.
+"""
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.repositories.tag_repo import TagRepository
+from app.repositories.task_repo import TaskRepository
+from app.schemas.task import TaskCreate, TaskFileFormat, TaskImportError, TaskImportResult
+
+# Errores detallados como máximo en la respuesta (el resto solo se cuenta)
+MAX_REPORTED_ERRORS = 100
+
+# Separador de nombres de etiquetas en la columna "tags" del CSV (igual que la exportación)
+CSV_TAG_SEPARATOR = "|"
+
+
+class TaskImportService:
+    """Servicio para importar grandes volúmenes de tareas"""
+
+    def __init__(self, db: AsyncSession):
+        self.task_repo = TaskRepository(db)
+        self.tag_repo = TagRepository(db)
+
+    async def import_tasks(
+        self,
+        owner_id: int,
+        chunks: AsyncIterator[bytes],
+        file_format: TaskFileFormat,
+    ) -> TaskImportResult:
+        """
+        Importa las tareas de un flujo de bytes CSV o NDJSON.
+        Las filas inválidas se omiten y se informan; cada lote válido se
+        confirma por separado, así que un fallo deja importados los anteriores.
+
+        Args:
+            owner_id: Usuario propietario de las tareas importadas
+            chunks: Contenido del archivo en trozos (ej: request.stream())
+            file_format: Formato del archivo
+        """
+        result = TaskImportResult()
+        batch: List[Tuple[Dict[str, Any], List[str]]] = []
+
+        async for line_number, record in self._records(chunks, file_format):
+            try:
+                batch.append(self._parse(record))
+            except (ValidationError, ValueError, TypeError) as exc:
+                result.failed += 1
+                if len(result.errors) < MAX_REPORTED_ERRORS:
+                    result.errors.append(TaskImportError(line=line_number, detail=str(exc)))
+                continue
+
+            if len(batch) >= settings.TASK_IMPORT_BATCH_SIZE:
+                await self._load(owner_id, batch)
+                result.imported += len(batch)
+                batch = []
+
+        if batch:
+            await self._load(owner_id, batch)
+            result.imported += len(batch)
+        return result
+
+    async def _load(self, owner_id: int, batch: List[Tuple[Dict[str, Any], List[str]]]) -> None:
+        """Resuelve los tags del lote en bloque y carga las filas con COPY"""
+        names = list(dict.fromkeys(name for _, tag_names in batch for name in tag_names))
+        tag_ids = await self.tag_repo.get_or_create_by_names(names)
+        await self.task_repo.copy_import_batch(
+            owner_id,
+            [row for row, _ in batch],
+            [list(dict.fromkeys(tag_ids[name] for name in tag_names)) for _, tag_names in batch],
+        )
+
+    @staticmethod
+    def _parse(record: Any) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Valida una fila con TaskCreate y extrae los nombres de sus etiquetas.
+        Acepta tags como lista de nombres, lista de objetos con "name"
+        (formato de la exportación) o texto separado por "|".
+        """
+        if isinstance(record, str):
+            record = json.loads(record)
+        if not isinstance(record, dict):
+            raise ValueError("Cada fila debe ser un objeto")
+
+        tags = record.pop("tags", None) or []
+        if isinstance(tags, str):
+            tags = tags.split(CSV_TAG_SEPARATOR)
+        names = [tag["name"] if isinstance(tag, dict) else tag for tag in tags]
+        names = [name.strip() for name in names if isinstance(name, str) and name.strip()]
+        if any(len(name) > 100 for name in names):
+            raise ValueError("El nombre de una etiqueta supera los 100 caracteres")
+
+        task = TaskCreate(**record)
+        return task.dict(exclude={"tag_ids"}), names
+
+    @staticmethod
+    async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+        """Decodifica el flujo en UTF-8 y lo divide en líneas sin cargarlo entero"""
+        decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        pending = ""
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield line + "\n"
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            yield pending
+
+    async def _records(
+        self, chunks: AsyncIterator[bytes], file_format: TaskFileFormat
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Genera (número de línea, registro) para cada fila del archivo.
+        En NDJSON el registro es la línea sin decodificar; en CSV, un diccionario.
+        """
+        if file_format == TaskFileFormat.ndjson:
+            line_number = 0
+            async for line in self._lines(chunks):
+                line_number += 1
+                if line.strip():
+                    yield line_number, line
+            return
+
+        # CSV: un registro puede ocupar varias líneas si tiene campos entre
+        # comillas; está completo cuando el número de comillas es par.
+        header = None
+        record_text = ""
+        line_number = start_line = 0
+        async for line in self._lines(chunks):
+            line_number += 1
+            if not record_text:
+                start_line = line_number
+            record_text += line
+            if record_text.count('"') % 2:
+                continue
+
+            values = next(csv.reader([record_text]), [])
+            record_text = ""
+            if not values:
+                continue
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            # Las celdas vacías se tratan como campos no informados
+            yield start_line, {
+                name: value for name, value in zip(header, values) if value != ""
+            }
@@ -2,15 +2,30 @@
 Servicio de tareas.
 Maneja la lógica de negocio relacionada con tareas.
 """
-from typing import List, Optional
+import csv
+import io
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.task import Task
+from app.core.config import settings
+from app.core.etag import make_etag
+from app.core.pagination import Cursor, check_cursor_value, encode_cursor, to_naive_utc
 from app.repositories.tag_repo import TagRepository
-from app.repositories.task_repo import TaskRepository
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.repositories.task_repo import EXPORT_COLUMNS, TaskRepository
+from app.schemas.task import (
+    TaskBulkItemResult,
+    TaskBulkRequest,
+    TaskBulkResponse,
+    TaskCreate,
+    TaskFileFormat,
+    TaskFilter,
+    TaskResponse,
+    TaskUpdate,
+)
 
 
 class TaskService:
@@ -20,65 +35,281 @@ class TaskService:
         self.task_repo = TaskRepository(db)
         self.tag_repo = TagRepository(db)
     
-    async def get_task_by_id(self, task_id: int, owner_id: int) -> Optional[Task]:
-        """Obtiene una tarea por su ID verificando que pertenezca al usuario"""
-        return await self.task_repo.get_by_id(task_id, owner_id)
+    async def get_task_by_id(self, task_id: int, owner_id: int) -> Optional[Row]:
+        """
+        Obtiene una tarea por su ID verificando que pertenezca al usuario,
+        como fila de solo lectura con sus tags
+        """
+        return await self.task_repo.get_row_by_id(task_id, owner_id)
     
-    async def get_user_tasks(self, owner_id: int, skip: int = 0, limit: int = 100) -> List[Task]:
-        """Obtiene todas las tareas de un usuario"""
-        return await self.task_repo.get_all_by_owner(owner_id, skip, limit)
+    async def get_task_etag(self, task_id: int, owner_id: int) -> Optional[str]:
+        """ETag de una tarea, o None si no existe o no pertenece al usuario"""
+        state = await self.task_repo.get_state(task_id, owner_id)
+        return None if state is None else make_etag(task_id, *state)
     
-    async def create_task(self, task_data: TaskCreate, owner_id: int) -> Task:
-        """Crea una nueva tarea"""
-        # Crear la tarea
-        task = Task(
-            title=task_data.title,
-            description=task_data.description,
-            priority=task_data.priority,
-            is_completed=task_data.is_completed,
-            owner_id=owner_id,
+    async def get_tasks_etag(self, owner_id: int, query: str) -> str:
+        """ETag del listado de tareas de un usuario para unos parámetros de consulta"""
+        state = await self.task_repo.get_list_state(owner_id)
+        return make_etag(owner_id, query, *state)
+    
+    async def get_user_tasks(
+        self,
+        owner_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[TaskFilter] = None,
+        after: Optional[Cursor] = None,
+    ) -> List[Row]:
+        """
+        Obtiene las tareas filtradas de un usuario (por offset o por cursor)
+        como filas de solo lectura con sus tags, en una sola consulta.
+        """
+        filters = filters or TaskFilter()
+        # El cursor solo es válido para el mismo orden con el que se generó
+        if after is not None and after.key != filters.sort.value:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El cursor no corresponde al orden solicitado"
+            )
+        if after is not None:
+            after = self._check_cursor_value(after)
+        return await self.task_repo.get_rows_by_owner(owner_id, skip, limit, filters, after)
+    
+    @staticmethod
+    def _check_cursor_value(after: Cursor) -> Cursor:
+        """Valida el tipo del valor del cursor (400 si fue manipulado)"""
+        try:
+            return check_cursor_value(after)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor de paginación inválido"
+            )
+    
+    async def search_tasks(
+        self, owner_id: int, text: str, limit: int = 20, after: Optional[Cursor] = None
+    ) -> List[Row]:
+        """
+        Busca en el título y la descripción de las tareas de un usuario,
+        ordenadas por relevancia, como filas de solo lectura con sus tags.
+        """
+        if after is not None and (after.key != "-rank" or not isinstance(after.value, (int, float))):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El cursor no corresponde a una búsqueda"
+            )
+        return await self.task_repo.search_rows(owner_id, text, limit, after)
+    
+    async def get_changes(
+        self, owner_id: int, since: Optional[Cursor], limit: int
+    ) -> Dict[str, Any]:
+        """
+        Cambios en las tareas de un usuario desde un token de sincronización:
+        tareas creadas o modificadas (con sus tags) e IDs de tareas borradas,
+        como mucho `limit` en orden de modificación.
+        
+        El token es la posición (fecha, id) del último cambio entregado. Al
+        llegar al final se retrocede TASK_SYNC_OVERLAP_SECONDS para recoger
+        transacciones que se confirmaron tarde con una fecha anterior: el
+        cliente puede recibir dos veces el mismo cambio, pero no perderlo.
+        """
+        now = datetime.utcnow()
+        if since is not None:
+            if since.key != "sync" or not isinstance(since.value, datetime):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Token de sincronización inválido"
+                )
+            since = since._replace(value=to_naive_utc(since.value))
+            # Los borrados más antiguos ya se purgaron: hace falta sincronizar de cero
+            if since.value < now - timedelta(days=settings.TASK_SYNC_TOMBSTONE_RETENTION_DAYS):
+                raise HTTPException(
+                    status_code=status.HTTP_410_GONE,
+                    detail="Token de sincronización caducado, sincroniza de nuevo sin since"
+                )
+        
+        # Un elemento de más indica si quedan cambios; la primera sincronización
+        # no necesita borrados
+        rows = await self.task_repo.get_changed_rows(owner_id, since, limit + 1)
+        deletions = await self.task_repo.get_deletions(owner_id, since, limit + 1) if since else []
+        changes = sorted(
+            [(row.updated_at, row.id, row) for row in rows]
+            + [(row.deleted_at, row.task_id, None) for row in deletions],
+            key=lambda change: change[:2],
         )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
         
-        # Asociar tags si se proporcionaron
-        if task_data.tag_ids:
-            tags = await self.tag_repo.get_by_ids(task_data.tag_ids)
-            task.tags = tags
+        if has_more:
+            next_token = encode_cursor("sync", *changes[-1][:2])
+        else:
+            next_token = encode_cursor("sync", now - timedelta(seconds=settings.TASK_SYNC_OVERLAP_SECONDS), 0)
+        return {
+            "changed": [row for _, _, row in changes if row is not None],
+            "deleted": [task_id for _, task_id, row in changes if row is None],
+            "next_token": next_token,
+            "has_more": has_more,
+        }
+    
+    async def create_task(self, task_data: TaskCreate, owner_id: int) -> TaskResponse:
+        """Crea una nueva tarea"""
+        # Solo se asocian los tags que existen
+        tags = await self.tag_repo.get_by_ids(task_data.tag_ids) if task_data.tag_ids else []
         
-        return await self.task_repo.create(task)
+        row = await self.task_repo.create(
+            {
+                "title": task_data.title,
+                "description": task_data.description,
+                "priority": task_data.priority,
+                "is_completed": task_data.is_completed,
+                "owner_id": owner_id,
+            },
+            [tag.id for tag in tags],
+        )
+        return TaskResponse(**row, tags=tags)
     
-    async def update_task(self, task_id: int, task_data: TaskUpdate, owner_id: int) -> Task:
+    async def update_task(self, task_id: int, task_data: TaskUpdate, owner_id: int) -> TaskResponse:
         """Actualiza una tarea existente"""
-        task = await self.task_repo.get_by_id(task_id, owner_id)
-        if not task:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Tarea no encontrada"
-            )
-        
         # Actualizar campos si se proporcionan
-        if task_data.title is not None:
-            task.title = task_data.title
-        if task_data.description is not None:
-            task.description = task_data.description
-        if task_data.priority is not None:
-            task.priority = task_data.priority
-        if task_data.is_completed is not None:
-            task.is_completed = task_data.is_completed
-        
-        # Actualizar tags si se proporcionaron
+        values = task_data.dict(exclude_none=True, exclude={"tag_ids"})
+        
+        if not values and task_data.tag_ids is None:
+            # Nada que modificar: se devuelve la tarea tal cual
+            task = await self.task_repo.get_by_id(task_id, owner_id)
+            if not task:
+                raise self._not_found()
+            return TaskResponse.from_orm(task)
+        
+        tags = None
         if task_data.tag_ids is not None:
-            tags = await self.tag_repo.get_by_ids(task_data.tag_ids)
-            task.tags = tags
+            tags = await self.tag_repo.get_by_ids(task_data.tag_ids) if task_data.tag_ids else []
+        
+        row = await self.task_repo.update(
+            task_id,
+            owner_id,
+            values,
+            [tag.id for tag in tags] if tags is not None else None,
+        )
+        if row is None:
+            raise self._not_found()
         
-        return await self.task_repo.update(task)
+        if tags is None:
+            tags = await self.tag_repo.get_by_task(task_id)
+        return TaskResponse(**row, tags=tags)
     
     async def delete_task(self, task_id: int, owner_id: int) -> None:
         """Elimina una tarea"""
         task = await self.task_repo.get_by_id(task_id, owner_id)
         if not task:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Tarea no encontrada"
-            )
+            raise self._not_found()
         
         await self.task_repo.delete(task)
+    
+    async def export_tasks(
+        self, owner_id: int, export_format: TaskFileFormat
+    ) -> AsyncIterator[str]:
+        """
+        Genera la exportación completa de las tareas de un usuario por trozos.
+        La memoria usada depende del tamaño de lote, no del de la cuenta.
+        """
+        if export_format == TaskFileFormat.ndjson:
+            async for lines in self.task_repo.stream_export_json(owner_id):
+                yield "\n".join(lines) + "\n"
+            return
+        
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([*EXPORT_COLUMNS, "tags"])
+        async for rows in self.task_repo.stream_export_rows(owner_id):
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        # Cuenta sin tareas: solo la cabecera
+        if buffer.tell():
+            yield buffer.getvalue()
+    
+    async def bulk_tasks(self, bulk: TaskBulkRequest, owner_id: int) -> TaskBulkResponse:
+        """
+        Aplica un lote de creaciones, actualizaciones y borrados.
+        La propiedad de las tareas se valida en una sola consulta; las que no
+        existen o son de otro usuario se informan con estado 404.
+        """
+        owned = await self.task_repo.get_owned_ids(
+            owner_id, [item.id for item in bulk.update] + bulk.delete
+        )
+        
+        # Cargar de una vez todos los tags referenciados (solo se asocian los que existen)
+        referenced = {
+            tag_id for item in [*bulk.create, *bulk.update] for tag_id in item.tag_ids or []
+        }
+        tags = {tag.id: tag for tag in await self.tag_repo.get_by_ids(list(referenced))} if referenced else {}
+        
+        def existing_tag_ids(tag_ids: List[int]) -> List[int]:
+            return [tag_id for tag_id in dict.fromkeys(tag_ids) if tag_id in tags]
+        
+        creates = [
+            {**item.dict(exclude={"tag_ids"}), "owner_id": owner_id} for item in bulk.create
+        ]
+        create_tag_ids = [existing_tag_ids(item.tag_ids or []) for item in bulk.create]
+        own_updates = [item for item in bulk.update if item.id in owned]
+        updates = [item.dict(exclude_none=True, exclude={"tag_ids"}) for item in own_updates]
+        update_tag_ids = {
+            item.id: existing_tag_ids(item.tag_ids)
+            for item in own_updates
+            if item.tag_ids is not None
+        }
+        delete_ids = [task_id for task_id in bulk.delete if task_id in owned]
+        
+        created_rows = await self.task_repo.bulk_write(
+            owner_id, creates, create_tag_ids, updates, update_tag_ids, delete_ids
+        )
+        
+        updated_ids = [item.id for item in own_updates]
+        updated_rows = {row["id"]: row for row in await self.task_repo.get_rows_by_ids(updated_ids)}
+        updated_tags = await self.tag_repo.get_by_tasks(updated_ids)
+        
+        response = TaskBulkResponse()
+        for index, (row, tag_ids) in enumerate(zip(created_rows, create_tag_ids)):
+            response.created.append(TaskBulkItemResult(
+                index=index,
+                id=row["id"],
+                status=status.HTTP_201_CREATED,
+                task=TaskResponse(**row, tags=[tags[tag_id] for tag_id in tag_ids]),
+            ))
+        for index, item in enumerate(bulk.update):
+            if item.id in owned:
+                response.updated.append(TaskBulkItemResult(
+                    index=index,
+                    id=item.id,
+                    status=status.HTTP_200_OK,
+                    task=TaskResponse(**updated_rows[item.id], tags=updated_tags[item.id]),
+                ))
+            else:
+                response.updated.append(self._bulk_not_found(index, item.id))
+        for index, task_id in enumerate(bulk.delete):
+            if task_id in owned:
+                response.deleted.append(TaskBulkItemResult(
+                    index=index, id=task_id, status=status.HTTP_204_NO_CONTENT
+                ))
+            else:
+                response.deleted.append(self._bulk_not_found(index, task_id))
+        return response
+    
+    @staticmethod
+    def _bulk_not_found(index: int, task_id: int) -> TaskBulkItemResult:
+        """Resultado de un elemento del lote que no existe o es de otro usuario"""
+        return TaskBulkItemResult(
+            index=index,
+            id=task_id,
+            status=status.HTTP_404_NOT_FOUND,
+            detail="Tarea no encontrada",
+        )
+    
+    @staticmethod
+    def _not_found() -> HTTPException:
+        """Error estándar para tareas inexistentes o de otro usuario"""
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tarea no encontrada"
+        )
@@ -7,7 +7,8 @@ from typing import Optional
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash
+from app.core.cache import invalidate_user
+from app.core.security import get_password_hash_async
 from app.models.user import User
 from app.repositories.user_repo import UserRepository
 from app.schemas.user import UserCreate, UserUpdate
@@ -49,7 +50,7 @@ class UserService:
             email=user_data.email,
             username=user_data.username,
             full_name=user_data.full_name,
-            hashed_password=get_password_hash(user_data.password),
+            hashed_password=await get_password_hash_async(user_data.password),
         )
         
         return await self.user_repo.create(user)
@@ -71,11 +72,13 @@ class UserService:
         if user_data.full_name is not None:
             user.full_name = user_data.full_name
         if user_data.password is not None:
-            user.hashed_password = get_password_hash(user_data.password)
+            user.hashed_password = await get_password_hash_async(user_data.password)
         if user_data.is_active is not None:
             user.is_active = user_data.is_active
         
-        return await self.user_repo.update(user)
+        user = await self.user_repo.update(user)
+        invalidate_user(user.id)
+        return user
     
     async def delete_user(self, user_id: int) -> None:
         """Elimina un usuario"""
@@ -87,3 +90,4 @@ class UserService:
             )
         
         await self.user_repo.delete(user)
+        invalidate_user(user_id)
@@ -3,7 +3,8 @@ Configuración de pytest para los tests.
 Define fixtures compartidas y configuración de la base de datos de prueba.
 """
 import asyncio
-from typing import AsyncGenerator, Generator
+from contextlib import contextmanager
+from typing import AsyncGenerator, Callable, ContextManager, Generator
 
 import pytest
 from httpx import AsyncClient, ASGITransport
@@ -11,9 +12,10 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
 
+from app.core.cache import token_cache, user_cache
 from app.core.config import settings
 from app.db.base import Base
-from app.db.session import get_db
+from app.db.session import QueryStats, get_db, track_queries
 from app.main import app
 
 # URL de base de datos de prueba (usar una BD separada)
@@ -40,6 +42,19 @@ TestSessionLocal = sessionmaker(
 #     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_auth_cache():
+    """
+    Vacía las cachés de autenticación entre tests.
+    Cada test recrea las tablas y los IDs de usuario se repiten.
+    """
+    token_cache.clear()
+    user_cache.clear()
+    yield
+    token_cache.clear()
+    user_cache.clear()
+
+
 @pytest.fixture(scope="function")
 async def db_session() -> AsyncGenerator[AsyncSession, None]:
     """
@@ -72,3 +87,21 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
         yield ac
     
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def query_budget() -> Callable[[int], ContextManager[QueryStats]]:
+    """
+    Fixture para fijar el máximo de sentencias SQL de un bloque.
+    Uso: with query_budget(3): await client.get(...)
+    Falla si el bloque ejecuta más sentencias de las permitidas (ej: N+1).
+    """
+    @contextmanager
+    def budget(max_queries: int):
+        with track_queries() as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"Se ejecutaron {stats.count} sentencias SQL (presupuesto: {max_queries})"
+        )
+    
+    return budget
@@ -0,0 +1,50 @@
+"""
+Tests para el control de admisión.
+"""
+import pytest
+from httpx import AsyncClient
+
+from app.core.admission import ConcurrencyLimiter, limiter
+
+
+def test_aimd_limit_adjusts_to_pool_wait():
+    """Test de que el límite AIMD crece con esperas cortas y se reduce con largas"""
+    aimd = ConcurrencyLimiter("aimd", initial_limit=10, min_limit=2, max_limit=20, pool_wait_target=0.05)
+
+    for _ in range(50):
+        assert aimd.try_acquire()
+        aimd.release(pool_wait=0.001)
+    assert aimd.limit > 10
+
+    grown = aimd.limit
+    assert aimd.try_acquire()
+    aimd.release(pool_wait=0.5)
+    assert aimd.limit == pytest.approx(grown * 0.9)
+    assert aimd.in_flight == 0
+
+
+def test_static_limit_rejects_when_full():
+    """Test de que el límite fijo rechaza al alcanzarse y no se ajusta"""
+    static = ConcurrencyLimiter("static", initial_limit=2, min_limit=1, max_limit=10, pool_wait_target=0.05)
+
+    assert static.try_acquire()
+    assert static.try_acquire()
+    assert not static.try_acquire()
+    static.release(pool_wait=5.0)
+    assert static.limit == 2
+    assert static.try_acquire()
+
+
+@pytest.mark.asyncio
+async def test_requests_rejected_when_saturated(client: AsyncClient, monkeypatch):
+    """Test de que al superar el límite se responde 503 con Retry-After"""
+    monkeypatch.setattr(limiter, "in_flight", int(limiter.limit))
+
+    response = await client.get("/api/v1/tasks/")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+    # /health sigue respondiendo para los balanceadores
+    response = await client.get("/health")
+    assert response.status_code == 200
+    assert response.json()["admission"]["in_flight"] == int(limiter.limit)
@@ -86,3 +86,27 @@ async def test_login_invalid_credentials(client: AsyncClient):
     )
     
     assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_login_wrong_password(client: AsyncClient):
+    """Test de login con contraseña incorrecta para un usuario existente"""
+    await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "test@example.com",
+            "username": "testuser",
+            "password": "testpassword123",
+            "full_name": "Test User"
+        }
+    )
+    
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={
+            "username": "testuser",
+            "password": "wrongpassword"
+        }
+    )
+    
+    assert response.status_code == 401
@@ -0,0 +1,107 @@
+"""
+Tests para la compresión de respuestas.
+"""
+import zlib
+
+import pytest
+from httpx import AsyncClient
+from starlette.responses import StreamingResponse
+
+from app.core.compression import negotiate
+from app.core.middleware import CompressionMiddleware
+
+
+async def create_user_and_login(client: AsyncClient) -> str:
+    """Helper para crear un usuario y obtener su token"""
+    await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "test@example.com",
+            "username": "testuser",
+            "password": "testpassword123",
+            "full_name": "Test User"
+        }
+    )
+    
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={
+            "username": "testuser",
+            "password": "testpassword123"
+        }
+    )
+    
+    return response.json()["access_token"]
+
+
+def test_negotiate_encoding():
+    """Test de la negociación de Accept-Encoding"""
+    available = ["zstd", "br", "gzip"]
+    assert negotiate("gzip, deflate, br", available) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", available) == "gzip"
+    assert negotiate("*", available) == "zstd"
+    assert negotiate("*, zstd;q=0", available) == "br"
+    assert negotiate("identity", available) is None
+    assert negotiate("", available) is None
+
+
+@pytest.mark.asyncio
+async def test_list_response_compressed(client: AsyncClient):
+    """Test de que el listado de tareas se comprime y se descomprime igual"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    for i in range(20):
+        await client.post(
+            "/api/v1/tasks/", json={"title": f"Tarea {i}", "description": "Descripción " * 10}, headers=headers
+        )
+    
+    plain = await client.get("/api/v1/tasks/", headers={**headers, "Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+    # La variante sin comprimir también depende de Accept-Encoding
+    assert "Accept-Encoding" in plain.headers["Vary"]
+    
+    compressed = await client.get("/api/v1/tasks/", headers={**headers, "Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert int(compressed.headers["Content-Length"]) < len(plain.content) / 4
+    assert compressed.content == plain.content
+    
+    # Por debajo del umbral no se comprime
+    response = await client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+
+@pytest.mark.asyncio
+async def test_streaming_response_flushed_per_chunk():
+    """Test de que cada fragmento de un stream se puede descomprimir al recibirlo"""
+    chunks = [b'{"n":%d}\n' % i * 100 for i in range(3)]
+    
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+    
+    app = CompressionMiddleware(
+        StreamingResponse(stream(), media_type="application/x-ndjson"), minimum_size=500
+    )
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", b"gzip")]}
+    messages = []
+    
+    async def receive():
+        return {"type": "http.disconnect"}
+    
+    async def send(message):
+        messages.append(message)
+    
+    await app(scope, receive, send)
+    
+    start, *bodies = messages
+    assert (b"content-encoding", b"gzip") in start["headers"]
+    assert not any(name == b"content-length" for name, _ in start["headers"])
+    
+    # StreamingResponse termina con un cuerpo vacío que cierra el stream gzip
+    decompressor = zlib.decompressobj(31)
+    assert [decompressor.decompress(message["body"]) for message in bodies] == chunks + [b""]
+    assert decompressor.eof
+    assert bodies[-1]["more_body"] is False
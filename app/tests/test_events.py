@@ -0,0 +1,139 @@
+"""
+Tests para el stream de cambios (LISTEN/NOTIFY y Server-Sent Events).
+"""
+import asyncio
+import json
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.cache import user_cache
+from app.db.notifications import (
+    RESYNC,
+    ChangeListener,
+    change_listener,
+    notify_changes,
+    notify_user_changed,
+)
+from app.tests.conftest import TEST_DATABASE_URL, test_engine
+
+# asyncpg no admite el prefijo de dialecto de SQLAlchemy
+TEST_DSN = TEST_DATABASE_URL.replace("+asyncpg", "")
+
+
+async def create_user_and_login(client: AsyncClient) -> str:
+    """Helper para crear un usuario y obtener su token"""
+    await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "test@example.com",
+            "username": "testuser",
+            "password": "testpassword123",
+            "full_name": "Test User"
+        }
+    )
+    
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={
+            "username": "testuser",
+            "password": "testpassword123"
+        }
+    )
+    
+    return response.json()["access_token"]
+
+
+@pytest.fixture
+async def listener():
+    """Escucha propia del test contra la base de datos de prueba"""
+    listener = ChangeListener(TEST_DSN, queue_size=2)
+    yield listener
+    await listener.close()
+
+
+async def notify(statement) -> None:
+    """Ejecuta y confirma los NOTIFY en una transacción"""
+    async with test_engine.begin() as conn:
+        await conn.execute(statement)
+
+
+@pytest.mark.asyncio
+async def test_listener_fans_out_by_owner(listener: ChangeListener):
+    """Test de reparto de eventos por usuario con una sola conexión"""
+    async with listener.subscribe(1) as first, listener.subscribe(2) as second:
+        await notify(notify_changes("task", {"updated": [5]}, 1))
+        await notify(notify_changes("tag", {"deleted": [3]}))
+    
+        assert await asyncio.wait_for(first.get(), 1) == {"type": "task", "op": "updated", "ids": [5]}
+        # Las etiquetas son compartidas: llegan a todos los suscriptores
+        assert (await asyncio.wait_for(first.get(), 1))["type"] == "tag"
+        assert (await asyncio.wait_for(second.get(), 1))["type"] == "tag"
+        assert second.empty()
+    
+        # Un NOTIFY de una transacción deshecha no se entrega
+        async with test_engine.connect() as conn:
+            await conn.execute(notify_changes("task", {"created": [6]}, 1))
+            await conn.rollback()
+        await notify(notify_changes("task", {"created": [7]}, 1))
+        assert (await asyncio.wait_for(first.get(), 1))["ids"] == [7]
+    
+    assert listener.subscribers == 0
+
+
+@pytest.mark.asyncio
+async def test_listener_slow_subscriber_resync(listener: ChangeListener):
+    """Test de que un suscriptor con la cola llena recibe RESYNC en lugar de bloquear"""
+    async with listener.subscribe(1) as queue:
+        # 1200 IDs no caben en un NOTIFY: se envían tres eventos
+        await notify(notify_changes("task", {"deleted": list(range(1200))}, 1))
+        await asyncio.sleep(0.2)
+    
+        assert queue.qsize() == 1
+        assert queue.get_nowait() == RESYNC
+
+
+@pytest.mark.asyncio
+async def test_listener_invalidates_user_cache(listener: ChangeListener):
+    """Test de que un usuario modificado en otro worker sale de la caché de este"""
+    await listener.start(persistent=True)
+    user_cache.set(42, {"id": 42, "is_active": True})
+    user_cache.set(43, {"id": 43, "is_active": True})
+    
+    await notify(notify_user_changed(42))
+    for _ in range(100):
+        if user_cache.get(42) is None:
+            break
+        await asyncio.sleep(0.01)
+    
+    assert user_cache.get(42) is None
+    assert user_cache.get(43) is not None
+
+
+@pytest.mark.asyncio
+async def test_task_events_stream(client: AsyncClient, monkeypatch):
+    """Test del stream SSE con los cambios de las tareas del usuario"""
+    monkeypatch.setattr(change_listener, "dsn", TEST_DSN)
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    user_id = (await client.get("/api/v1/users/me", headers=headers)).json()["id"]
+    
+    # La cola del test recibe los mismos eventos que la del stream
+    async with change_listener.subscribe(user_id) as queue:
+        stream = asyncio.create_task(client.get("/api/v1/tasks/events", headers=headers))
+        while change_listener.subscribers < 2:
+            await asyncio.sleep(0.01)
+    
+        task_id = (await client.post("/api/v1/tasks/", json={"title": "Tarea"}, headers=headers)).json()["id"]
+        await asyncio.wait_for(queue.get(), 1)
+        # Cerrar la escucha termina los streams después del evento
+        await change_listener.close()
+        response = await asyncio.wait_for(stream, 1)
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "no-transform" in response.headers["cache-control"]
+    assert "content-encoding" not in response.headers
+    
+    events = [frame for frame in response.text.split("\n\n") if frame.startswith("event:")]
+    assert events == [f'event: task\ndata: {json.dumps({"op": "created", "ids": [task_id]}, separators=(",", ":"))}']
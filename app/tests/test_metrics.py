@@ -0,0 +1,66 @@
+"""
+Tests para el endpoint de métricas.
+"""
+import pytest
+from httpx import AsyncClient
+
+
+async def create_user_and_login(client: AsyncClient) -> str:
+    """Helper para crear un usuario y obtener su token"""
+    await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "test@example.com",
+            "username": "testuser",
+            "password": "testpassword123",
+            "full_name": "Test User"
+        }
+    )
+
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={
+            "username": "testuser",
+            "password": "testpassword123"
+        }
+    )
+
+    return response.json()["access_token"]
+
+
+@pytest.mark.asyncio
+async def test_metrics_by_route_template(client: AsyncClient):
+    """Test de que las métricas se agrupan por plantilla de ruta e incluyen la BD"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    await client.get("/api/v1/tasks/999999", headers=headers)
+    await client.get("/ruta/inexistente")
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    body = response.text
+    assert (
+        'taskflow_http_requests_total{method="GET",route="/api/v1/tasks/{task_id}",status="404"}'
+        in body
+    )
+    assert 'route="<unmatched>",status="404"' in body
+    assert "/api/v1/tasks/999999" not in body
+    assert 'taskflow_http_request_db_queries_count{method="GET",route="/api/v1/tasks/{task_id}"}' in body
+    assert "taskflow_http_requests_in_progress" in body
+    assert "taskflow_db_pool_checked_out" in body
+    # /metrics no se mide a sí mismo
+    assert 'route="/metrics"' not in body
+
+
+@pytest.mark.asyncio
+async def test_health_reports_pool(client: AsyncClient):
+    """Test de que /health informa del estado y la ocupación del pool"""
+    response = await client.get("/health")
+    assert response.status_code == 200
+    
+    pool = response.json()["db_pool"]
+    assert set(pool) == {"size", "max", "checked_out", "checked_in", "overflow", "utilization"}
+    assert pool["max"] >= pool["size"]
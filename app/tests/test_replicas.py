@@ -0,0 +1,88 @@
+"""
+Tests para el enrutado de lecturas a réplicas.
+"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.metrics import DB_READ_SESSIONS
+from app.db.session import read_replicas, recent_writers
+from app.tests.conftest import TEST_DATABASE_URL
+
+
+async def create_user_and_login(client: AsyncClient) -> str:
+    """Helper para crear un usuario y obtener su token"""
+    await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "test@example.com",
+            "username": "testuser",
+            "password": "testpassword123",
+            "full_name": "Test User"
+        }
+    )
+    
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={
+            "username": "testuser",
+            "password": "testpassword123"
+        }
+    )
+    
+    return response.json()["access_token"]
+
+
+def read_sessions(target: str) -> float:
+    """Sesiones de lectura servidas hasta ahora por el destino indicado"""
+    return DB_READ_SESSIONS.labels(target)._value.get()
+
+
+@pytest.fixture
+async def replica(monkeypatch):
+    """Usa la base de datos de prueba como réplica de lectura"""
+    replica_engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    monkeypatch.setattr(read_replicas, "engines", [replica_engine])
+    recent_writers.clear()
+    yield replica_engine
+    recent_writers.clear()
+    await replica_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica(client: AsyncClient, replica):
+    """Test de que los endpoints de lectura usan la réplica"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    replica_before = read_sessions("replica")
+    
+    response = await client.get("/api/v1/tasks/", headers=headers)
+    assert response.status_code == 200
+    response = await client.get("/api/v1/tags/", headers=headers)
+    assert response.status_code == 200
+    
+    assert read_sessions("replica") == replica_before + 2
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_uses_primary(client: AsyncClient, replica):
+    """Test de que tras escribir las lecturas del usuario van al primario"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    response = await client.post("/api/v1/tasks/", json={"title": "Nueva"}, headers=headers)
+    assert response.status_code == 201
+    task_id = response.json()["id"]
+    
+    primary_before = read_sessions("primary")
+    response = await client.get(f"/api/v1/tasks/{task_id}", headers=headers)
+    assert response.status_code == 200
+    assert read_sessions("primary") == primary_before + 1
+    
+    # Al cerrarse la ventana se vuelve a leer de la réplica
+    recent_writers.clear()
+    replica_before = read_sessions("replica")
+    response = await client.get(f"/api/v1/tasks/{task_id}", headers=headers)
+    assert response.status_code == 200
+    assert read_sessions("replica") == replica_before + 1
@@ -0,0 +1,53 @@
+"""
+Tests para la serialización rápida de respuestas.
+"""
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.serialization import orm_response
+from app.models.tag import Tag
+from app.models.task import Task
+from app.schemas.tag import TagResponse
+from app.schemas.task import TaskResponse
+
+
+def test_orm_response_matches_response_model():
+    """Test de que el JSON rápido es idéntico byte a byte al de response_model"""
+    created = datetime(2024, 5, 17, 10, 30, 0)
+    updated = datetime(2024, 5, 17, 10, 30, 0, 123456)
+    tag = Tag(id=7, name="urgente ñ", color="#FF0000", created_at=created, updated_at=updated)
+    tasks = [
+        Task(
+            id=1,
+            title='Comillas " barra \\ y ácento \U0001F680',
+            description="línea\nnueva\ttab \x01 control  ",
+            priority=2,
+            is_completed=False,
+            owner_id=3,
+            created_at=created,
+            updated_at=updated,
+            tags=[tag],
+        ),
+        Task(
+            id=2,
+            title="Sin tags",
+            description=None,
+            priority=0,
+            is_completed=True,
+            owner_id=3,
+            created_at=updated,
+            updated_at=updated,
+            tags=[],
+        ),
+    ]
+    
+    expected = JSONResponse(jsonable_encoder([TaskResponse.from_orm(task) for task in tasks])).body
+    assert orm_response(TaskResponse, tasks).body == expected
+    
+    expected = JSONResponse(jsonable_encoder(TaskResponse.from_orm(tasks[0]))).body
+    assert orm_response(TaskResponse, tasks[0]).body == expected
+    
+    expected = JSONResponse(jsonable_encoder([TagResponse.from_orm(tag)])).body
+    assert orm_response(TagResponse, [tag]).body == expected
@@ -0,0 +1,78 @@
+"""
+Tests para el registro de consultas lentas.
+"""
+import asyncio
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.db import slow_query
+from app.db.session import track_queries
+from app.tests.conftest import test_engine
+
+
+async def create_user_and_login(client: AsyncClient) -> str:
+    """Helper para crear un usuario y obtener su token"""
+    await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "test@example.com",
+            "username": "testuser",
+            "password": "testpassword123",
+            "full_name": "Test User"
+        }
+    )
+    
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={
+            "username": "testuser",
+            "password": "testpassword123"
+        }
+    )
+    
+    return response.json()["access_token"]
+
+
+@pytest.mark.asyncio
+async def test_slow_query_log_with_plan(client: AsyncClient, monkeypatch, tmp_path):
+    """Test de que las consultas lentas se registran con ruta, parámetros ocultos y plan"""
+    token = await create_user_and_login(client)
+    log_file = tmp_path / "slow.log"
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0.001)
+    monkeypatch.setattr(settings, "SLOW_QUERY_LOG_FILE", str(log_file))
+    monkeypatch.setattr(slow_query, "_explained_at", {})
+    
+    response = await client.get(
+        "/api/v1/users/me", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+    await asyncio.gather(*slow_query.pending_explains)
+    
+    records = [json.loads(line) for line in log_file.read_text().splitlines()]
+    record = next(r for r in records if r["route"] == "GET /api/v1/users/me")
+    assert record["statement"].lstrip().startswith("SELECT")
+    assert record["parameters"] == ["int"]
+    assert "Execution Time" in record["plan"]
+    assert "test@example.com" not in log_file.read_text()
+
+
+@pytest.mark.asyncio
+async def test_failed_statement_does_not_leak_timing():
+    """Test de que una sentencia fallida no deja su inicio en la conexión"""
+    async with test_engine.connect() as conn:
+        with pytest.raises(DBAPIError):
+            await conn.execute(text("SELECT 1 / 0"))
+        await conn.rollback()
+    
+        with track_queries() as stats:
+            await conn.execute(text("SELECT pg_sleep(0.05)"))
+        info = (await conn.get_raw_connection()).info
+    
+    assert "query_start" not in info
+    assert stats.count == 1
+    assert 0.05 <= stats.duration < 1
@@ -76,6 +76,27 @@ async def test_get_tags(client: AsyncClient):
     assert len(data) == 2
 
 
+@pytest.mark.asyncio
+async def test_get_tags_query_budget(client: AsyncClient, query_budget):
+    """Test de que listar etiquetas usa el validador del ETag y una sola consulta más"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    for i in range(10):
+        await client.post("/api/v1/tags/", json={"name": f"Tag {i}"}, headers=headers)
+    
+    with query_budget(2):
+        response = await client.get("/api/v1/tags/", headers=headers)
+    assert len(response.json()) == 10
+    
+    # 304: solo el validador, sin leer las etiquetas
+    with query_budget(1):
+        response = await client.get(
+            "/api/v1/tags/", headers={**headers, "If-None-Match": response.headers["ETag"]}
+        )
+    assert response.status_code == 304
+
+
 @pytest.mark.asyncio
 async def test_create_duplicate_tag(client: AsyncClient):
     """Test de creación de etiqueta duplicada"""
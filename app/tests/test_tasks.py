@@ -1,8 +1,26 @@
 """
 Tests para los endpoints de tareas.
 """
+import csv
+import io
+import json
+from datetime import datetime, timedelta, timezone
+
 import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.pagination import encode_cursor
+from app.db.session import DBTimeouts
+from app.repositories import task_repo
+from app.repositories.task_repo import TaskRepository
+from app.repositories.user_repo import UserRepository
+from app.schemas.task import TaskFileFormat, TaskResponse
+from app.services.import_service import TaskImportService
 
 
 async def create_user_and_login(client: AsyncClient) -> str:
@@ -132,3 +150,611 @@ async def test_delete_task(client: AsyncClient):
         headers={"Authorization": f"Bearer {token}"}
     )
     assert get_response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_tasks_cursor_pagination(client: AsyncClient):
+    """Test de paginación keyset con cursor"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    for i in range(5):
+        await client.post("/api/v1/tasks/", json={"title": f"Task {i}"}, headers=headers)
+    
+    # Recorrer todas las páginas siguiendo el header X-Next-Cursor
+    titles = []
+    response = await client.get("/api/v1/tasks/?limit=2", headers=headers)
+    while True:
+        assert response.status_code == 200
+        titles.extend(task["title"] for task in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        response = await client.get(
+            f"/api/v1/tasks/?limit=2&cursor={cursor}", headers=headers
+        )
+    
+    assert titles == [f"Task {i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_get_tasks_invalid_cursor(client: AsyncClient):
+    """Test de cursor de paginación inválido"""
+    token = await create_user_and_login(client)
+    
+    response = await client.get(
+        "/api/v1/tasks/?cursor=no-es-un-cursor",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_tasks_filters_and_sort(client: AsyncClient):
+    """Test de filtros y orden en el listado de tareas"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    await client.post("/api/v1/tasks/", json={"title": "Baja", "priority": 0}, headers=headers)
+    await client.post("/api/v1/tasks/", json={"title": "Media", "priority": 1}, headers=headers)
+    await client.post("/api/v1/tasks/", json={"title": "Alta", "priority": 2}, headers=headers)
+    await client.post(
+        "/api/v1/tasks/",
+        json={"title": "Hecha", "priority": 2, "is_completed": True},
+        headers=headers
+    )
+    
+    response = await client.get(
+        "/api/v1/tasks/?is_completed=false&priority_min=1&sort=-priority",
+        headers=headers
+    )
+    
+    assert response.status_code == 200
+    assert [task["title"] for task in response.json()] == ["Alta", "Media"]
+    
+    # El cursor de un orden no sirve para otro
+    response = await client.get("/api/v1/tasks/?limit=1&sort=-priority", headers=headers)
+    cursor = response.headers["X-Next-Cursor"]
+    response = await client.get(f"/api/v1/tasks/?cursor={cursor}", headers=headers)
+    assert response.status_code == 400
+    
+    # Cursores manipulados con un valor del tipo equivocado
+    for sort, value in [("created_at", 5), ("priority", "2024-01-01T00:00:00")]:
+        cursor = encode_cursor(sort, value, 1)
+        response = await client.get(f"/api/v1/tasks/?sort={sort}&cursor={cursor}", headers=headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Cursor de paginación inválido"
+
+
+@pytest.mark.asyncio
+async def test_get_tags_invalid_cursor(client: AsyncClient):
+    """Test de que un cursor de etiquetas manipulado devuelve 400 y no un error de la base de datos"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    await client.post("/api/v1/tags/", json={"name": "Trabajo"}, headers=headers)
+    
+    cursor = encode_cursor("created_at", 5, 1)
+    response = await client.get(f"/api/v1/tags/?cursor={cursor}", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Cursor de paginación inválido"
+    
+    # Un cursor válido con zona horaria se normaliza
+    cursor = encode_cursor("created_at", datetime(2000, 1, 1, tzinfo=timezone.utc), 1)
+    response = await client.get(f"/api/v1/tags/?cursor={cursor}", headers=headers)
+    assert response.status_code == 200
+    assert [tag["name"] for tag in response.json()] == ["Trabajo"]
+
+
+@pytest.mark.asyncio
+async def test_get_tasks_filters_with_timezone(client: AsyncClient):
+    """Test de filtros por fecha con zona horaria (sufijo Z u offset)"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    await client.post("/api/v1/tasks/", json={"title": "Tarea"}, headers=headers)
+    
+    response = await client.get("/api/v1/tasks/?created_after=2024-01-01T00:00:00Z", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    
+    response = await client.get("/api/v1/tasks/?updated_before=2999-01-01T00:00:00%2B02:00", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    
+    # El offset se convierte a UTC: hace un minuto expresado en UTC+02:00
+    local = (datetime.now(timezone.utc) - timedelta(minutes=1)).astimezone(timezone(timedelta(hours=2)))
+    response = await client.get(
+        "/api/v1/tasks/", params={"created_after": local.isoformat()}, headers=headers
+    )
+    assert len(response.json()) == 1
+    
+    response = await client.get(
+        "/api/v1/tasks/", params={"created_before": local.isoformat()}, headers=headers
+    )
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_create_and_update_task_tags(client: AsyncClient):
+    """Test de creación y actualización de tarea con etiquetas"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    tag_1 = (await client.post("/api/v1/tags/", json={"name": "Tag 1"}, headers=headers)).json()
+    tag_2 = (await client.post("/api/v1/tags/", json={"name": "Tag 2"}, headers=headers)).json()
+    
+    response = await client.post(
+        "/api/v1/tasks/",
+        json={"title": "Con tags", "tag_ids": [tag_1["id"], 9999]},
+        headers=headers
+    )
+    assert response.status_code == 201
+    task = response.json()
+    assert [tag["name"] for tag in task["tags"]] == ["Tag 1"]
+    
+    # Actualizar campos sin tocar los tags los conserva
+    response = await client.put(
+        f"/api/v1/tasks/{task['id']}", json={"priority": 2}, headers=headers
+    )
+    assert response.json()["priority"] == 2
+    assert [tag["name"] for tag in response.json()["tags"]] == ["Tag 1"]
+    
+    # Reemplazar los tags
+    response = await client.put(
+        f"/api/v1/tasks/{task['id']}", json={"tag_ids": [tag_2["id"]]}, headers=headers
+    )
+    assert [tag["name"] for tag in response.json()["tags"]] == ["Tag 2"]
+    
+    response = await client.get(f"/api/v1/tasks/{task['id']}", headers=headers)
+    assert [tag["name"] for tag in response.json()["tags"]] == ["Tag 2"]
+
+
+@pytest.mark.asyncio
+async def test_task_rows_match_response_model(client: AsyncClient, db_session: AsyncSession):
+    """Test de que el listado y el detalle (filas con tags en JSON) serializan igual que TaskResponse"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    tag_ids = [
+        (await client.post("/api/v1/tags/", json={"name": f"Tag {i}"}, headers=headers)).json()["id"]
+        for i in range(2)
+    ]
+    await client.post(
+        "/api/v1/tasks/", json={"title": "Con tags", "tag_ids": tag_ids}, headers=headers
+    )
+    await client.post(
+        "/api/v1/tasks/", json={"title": "Sin tags", "description": "ñandú \"citado\""}, headers=headers
+    )
+    
+    response = await client.get("/api/v1/tasks/", headers=headers)
+    tasks = response.json()
+    assert [len(task["tags"]) for task in tasks] == [2, 0]
+    
+    orm_tasks = await TaskRepository(db_session).get_all_by_owner(tasks[0]["owner_id"])
+    expected = [TaskResponse.from_orm(task) for task in orm_tasks]
+    assert response.content == JSONResponse(jsonable_encoder(expected)).body
+    
+    response = await client.get(f"/api/v1/tasks/{tasks[0]['id']}", headers=headers)
+    assert response.content == JSONResponse(jsonable_encoder(expected[0])).body
+
+
+@pytest.mark.asyncio
+async def test_task_endpoints_query_budget(client: AsyncClient, query_budget):
+    """Test de que el número de sentencias SQL no crece con las tareas (N+1)"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    tag_ids = [
+        (await client.post("/api/v1/tags/", json={"name": f"Tag {i}"}, headers=headers)).json()["id"]
+        for i in range(3)
+    ]
+    
+    # Crear: tags existentes + INSERT ... RETURNING + asociaciones + NOTIFY
+    with query_budget(4):
+        response = await client.post(
+            "/api/v1/tasks/", json={"title": "Tarea 0", "tag_ids": tag_ids}, headers=headers
+        )
+    task_id = response.json()["id"]
+    for i in range(1, 20):
+        await client.post(
+            "/api/v1/tasks/", json={"title": f"Tarea {i}", "tag_ids": tag_ids}, headers=headers
+        )
+    
+    # Listar: validador del ETag + tareas con sus tags agregados en una sola consulta
+    with query_budget(2):
+        response = await client.get("/api/v1/tasks/", headers=headers)
+    assert len(response.json()) == 20
+    
+    with query_budget(2):
+        await client.get(f"/api/v1/tasks/{task_id}", headers=headers)
+    
+    # Actualizar: UPDATE ... RETURNING + NOTIFY + tags actuales
+    with query_budget(3):
+        await client.put(f"/api/v1/tasks/{task_id}", json={"priority": 2}, headers=headers)
+    
+    with query_budget(5):
+        await client.put(f"/api/v1/tasks/{task_id}", json={"tag_ids": tag_ids[:1]}, headers=headers)
+
+
+@pytest.mark.asyncio
+async def test_get_tasks_conditional(client: AsyncClient, query_budget):
+    """Test de ETag y 304 en el listado y el detalle de tareas"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    tag_id = (await client.post("/api/v1/tags/", json={"name": "Tag"}, headers=headers)).json()["id"]
+    task_id = (await client.post(
+        "/api/v1/tasks/", json={"title": "Tarea", "tag_ids": [tag_id]}, headers=headers
+    )).json()["id"]
+    
+    response = await client.get("/api/v1/tasks/", headers=headers)
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    
+    # Sin cambios: 304 sin cuerpo y sin leer las tareas
+    with query_budget(1):
+        response = await client.get("/api/v1/tasks/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    
+    # Otros parámetros son otra representación
+    response = await client.get("/api/v1/tasks/?limit=10", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    
+    detail = await client.get(f"/api/v1/tasks/{task_id}", headers=headers)
+    detail_etag = detail.headers["ETag"]
+    response = await client.get(f"/api/v1/tasks/{task_id}", headers={**headers, "If-None-Match": detail_etag})
+    assert response.status_code == 304
+    
+    # Editar una etiqueta cambia ambos ETag (la etiqueta va incluida en la tarea)
+    await client.put(f"/api/v1/tags/{tag_id}", json={"color": "#000000"}, headers=headers)
+    response = await client.get("/api/v1/tasks/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["tags"][0]["color"] == "#000000"
+    etag = response.headers["ETag"]
+    response = await client.get(f"/api/v1/tasks/{task_id}", headers={**headers, "If-None-Match": detail_etag})
+    assert response.status_code == 200
+    
+    # Borrar una tarea también cambia el ETag del listado
+    await client.delete(f"/api/v1/tasks/{task_id}", headers=headers)
+    response = await client.get("/api/v1/tasks/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == []
+    
+    response = await client.get(f"/api/v1/tasks/{task_id}", headers={**headers, "If-None-Match": detail_etag})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_search_tasks(client: AsyncClient, query_budget):
+    """Test de búsqueda de texto completo con relevancia, paginación y propietario"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    tasks = [
+        {"title": "Reunión con el cliente", "description": "Llevar el informe impreso"},
+        {"title": "Preparar informe trimestral", "description": "Revisar el presupuesto"},
+        {"title": "Comprar café"},
+    ]
+    ids = [
+        (await client.post("/api/v1/tasks/", json=task, headers=headers)).json()["id"]
+        for task in tasks
+    ]
+    
+    # Las tareas de otros usuarios no aparecen
+    await client.post(
+        "/api/v1/auth/register",
+        json={"email": "other@example.com", "username": "other", "password": "testpassword123"}
+    )
+    other = (await client.post(
+        "/api/v1/auth/login", data={"username": "other", "password": "testpassword123"}
+    )).json()["access_token"]
+    await client.post(
+        "/api/v1/tasks/", json={"title": "Informe ajeno"}, headers={"Authorization": f"Bearer {other}"}
+    )
+    
+    # Stemming en español y el título pesa más que la descripción
+    with query_budget(1):
+        response = await client.get("/api/v1/tasks/search?q=informes", headers=headers)
+    assert response.status_code == 200
+    assert [task["id"] for task in response.json()] == [ids[1], ids[0]]
+    assert "search_vector" not in response.json()[0]
+    
+    response = await client.get("/api/v1/tasks/search?q=informe&limit=1", headers=headers)
+    assert [task["id"] for task in response.json()] == [ids[1]]
+    cursor = response.headers["X-Next-Cursor"]
+    response = await client.get(f"/api/v1/tasks/search?q=informe&limit=1&cursor={cursor}", headers=headers)
+    assert [task["id"] for task in response.json()] == [ids[0]]
+    cursor = response.headers["X-Next-Cursor"]
+    response = await client.get(f"/api/v1/tasks/search?q=informe&limit=1&cursor={cursor}", headers=headers)
+    assert response.json() == []
+    
+    response = await client.get('/api/v1/tasks/search?q="comprar café" OR presupuesto', headers=headers)
+    assert sorted(task["id"] for task in response.json()) == [ids[1], ids[2]]
+    
+    # Un cursor del listado no sirve para la búsqueda
+    cursor = (await client.get("/api/v1/tasks/?limit=1", headers=headers)).headers["X-Next-Cursor"]
+    response = await client.get(f"/api/v1/tasks/search?q=informe&cursor={cursor}", headers=headers)
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_task_changes(client: AsyncClient, monkeypatch):
+    """Test de sincronización incremental con páginas y tareas borradas"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    ids = [
+        (await client.post("/api/v1/tasks/", json={"title": f"Tarea {i}"}, headers=headers)).json()["id"]
+        for i in range(3)
+    ]
+    
+    # Primera sincronización por páginas: todas las tareas, sin borrados
+    response = await client.get("/api/v1/tasks/changes?limit=2", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [task["id"] for task in data["changed"]] == ids[:2]
+    assert data["has_more"] is True
+    
+    response = await client.get(
+        f"/api/v1/tasks/changes?limit=2&since={data['next_token']}", headers=headers
+    )
+    data = response.json()
+    assert [task["id"] for task in data["changed"]] == ids[2:]
+    assert data["deleted"] == []
+    assert data["has_more"] is False
+    
+    # El token final retrocede el margen de solape: los cambios recientes se repiten
+    response = await client.get(f"/api/v1/tasks/changes?since={data['next_token']}", headers=headers)
+    assert [task["id"] for task in response.json()["changed"]] == ids
+    
+    # Sin solape solo llegan los cambios posteriores al token
+    monkeypatch.setattr(settings, "TASK_SYNC_OVERLAP_SECONDS", 0)
+    since = (await client.get("/api/v1/tasks/changes", headers=headers)).json()["next_token"]
+    await client.put(f"/api/v1/tasks/{ids[0]}", json={"is_completed": True}, headers=headers)
+    await client.delete(f"/api/v1/tasks/{ids[1]}", headers=headers)
+    await client.post("/api/v1/tasks/bulk", json={"delete": [ids[2]]}, headers=headers)
+    
+    response = await client.get(f"/api/v1/tasks/changes?since={since}", headers=headers)
+    data = response.json()
+    assert [task["id"] for task in data["changed"]] == [ids[0]]
+    assert data["changed"][0]["is_completed"] is True
+    assert data["deleted"] == ids[1:]
+    
+    response = await client.get(f"/api/v1/tasks/changes?since={data['next_token']}", headers=headers)
+    assert response.json()["changed"] == response.json()["deleted"] == []
+
+
+@pytest.mark.asyncio
+async def test_task_changes_tag_updates(client: AsyncClient, monkeypatch):
+    """Test de que renombrar o borrar una etiqueta reenvía sus tareas en la sincronización"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    monkeypatch.setattr(settings, "TASK_SYNC_OVERLAP_SECONDS", 0)
+    
+    tag_id = (await client.post("/api/v1/tags/", json={"name": "Trabajo"}, headers=headers)).json()["id"]
+    response = await client.post(
+        "/api/v1/tasks/", json={"title": "Con tag", "tag_ids": [tag_id]}, headers=headers
+    )
+    tagged = response.json()["id"]
+    await client.post("/api/v1/tasks/", json={"title": "Sin tag"}, headers=headers)
+    
+    since = (await client.get("/api/v1/tasks/changes", headers=headers)).json()["next_token"]
+    response = await client.put(f"/api/v1/tags/{tag_id}", json={"name": "Oficina"}, headers=headers)
+    assert response.status_code == 200
+    
+    data = (await client.get(f"/api/v1/tasks/changes?since={since}", headers=headers)).json()
+    assert [task["id"] for task in data["changed"]] == [tagged]
+    assert [tag["name"] for tag in data["changed"][0]["tags"]] == ["Oficina"]
+    
+    response = await client.delete(f"/api/v1/tags/{tag_id}", headers=headers)
+    assert response.status_code == 204
+    
+    data = (await client.get(f"/api/v1/tasks/changes?since={data['next_token']}", headers=headers)).json()
+    assert [task["id"] for task in data["changed"]] == [tagged]
+    assert data["changed"][0]["tags"] == []
+
+
+@pytest.mark.asyncio
+async def test_task_changes_invalid_token(client: AsyncClient):
+    """Test de tokens de sincronización inválidos o caducados"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    response = await client.get("/api/v1/tasks/changes?since=no-es-un-token", headers=headers)
+    assert response.status_code == 400
+    
+    # Un cursor del listado no sirve como token de sincronización
+    cursor = encode_cursor("created_at", datetime.utcnow(), 1)
+    response = await client.get(f"/api/v1/tasks/changes?since={cursor}", headers=headers)
+    assert response.status_code == 400
+    
+    expired = encode_cursor("sync", datetime.utcnow() - timedelta(days=365), 0)
+    response = await client.get(f"/api/v1/tasks/changes?since={expired}", headers=headers)
+    assert response.status_code == 410
+    
+    # Un token con zona horaria se interpreta en UTC
+    expired = encode_cursor("sync", "2020-01-01T00:00:00+00:00", 0)
+    response = await client.get(f"/api/v1/tasks/changes?since={expired}", headers=headers)
+    assert response.status_code == 410
+    
+    recent = encode_cursor("sync", datetime.now(timezone.utc) - timedelta(minutes=1), 0)
+    response = await client.get(f"/api/v1/tasks/changes?since={recent}", headers=headers)
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_update_task_not_found(client: AsyncClient):
+    """Test de actualización de una tarea inexistente"""
+    token = await create_user_and_login(client)
+    
+    response = await client.put(
+        "/api/v1/tasks/9999",
+        json={"title": "No existe"},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_bulk_tasks(client: AsyncClient):
+    """Test de creación, actualización y borrado masivo de tareas"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    tag = (await client.post("/api/v1/tags/", json={"name": "Lote"}, headers=headers)).json()
+    existing = [
+        (await client.post("/api/v1/tasks/", json={"title": f"Old {i}"}, headers=headers)).json()
+        for i in range(2)
+    ]
+    
+    response = await client.post(
+        "/api/v1/tasks/bulk",
+        json={
+            "create": [
+                {"title": "Nueva 1", "tag_ids": [tag["id"]]},
+                {"title": "Nueva 2", "priority": 2},
+            ],
+            "update": [
+                {"id": existing[0]["id"], "is_completed": True, "tag_ids": [tag["id"]]},
+                {"id": 9999, "title": "No existe"},
+            ],
+            "delete": [existing[1]["id"]],
+        },
+        headers=headers
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["task"]["title"] for item in data["created"]] == ["Nueva 1", "Nueva 2"]
+    assert data["created"][0]["task"]["tags"][0]["name"] == "Lote"
+    assert data["updated"][0]["status"] == 200
+    assert data["updated"][0]["task"]["is_completed"] is True
+    assert data["updated"][0]["task"]["tags"][0]["name"] == "Lote"
+    assert data["updated"][1]["status"] == 404
+    assert data["deleted"][0]["status"] == 204
+    
+    response = await client.get("/api/v1/tasks/", headers=headers)
+    assert sorted(task["title"] for task in response.json()) == ["Nueva 1", "Nueva 2", "Old 0"]
+
+
+@pytest.mark.asyncio
+async def test_bulk_tasks_duplicate_ids(client: AsyncClient):
+    """Test de lote con la misma tarea repetida"""
+    token = await create_user_and_login(client)
+    
+    response = await client.post(
+        "/api/v1/tasks/bulk",
+        json={"update": [{"id": 1, "title": "A"}], "delete": [1]},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_export_tasks(client: AsyncClient):
+    """Test de exportación de tareas en NDJSON y CSV"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    tag = (await client.post("/api/v1/tags/", json={"name": "Export"}, headers=headers)).json()
+    created = (await client.post(
+        "/api/v1/tasks/",
+        json={"title": "Con tag", "tag_ids": [tag["id"]]},
+        headers=headers
+    )).json()
+    await client.post("/api/v1/tasks/", json={"title": "Sin tag"}, headers=headers)
+    
+    response = await client.get("/api/v1/tasks/export", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == created
+    assert lines[1]["tags"] == []
+    
+    response = await client.get("/api/v1/tasks/export?format=csv", headers=headers)
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["title"] for row in rows] == ["Con tag", "Sin tag"]
+    assert rows[0]["tags"] == "Export"
+
+
+@pytest.mark.asyncio
+async def test_import_tasks(client: AsyncClient):
+    """Test de importación masiva de tareas en NDJSON y CSV"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    ndjson = "\n".join([
+        json.dumps({"title": "Importada 1", "priority": 2, "tags": ["Migración"]}),
+        json.dumps({"priority": 1}),
+        "no es json",
+        json.dumps({"title": "Importada 2", "tags": [{"name": "Migración"}, {"name": "Otra"}]}),
+    ])
+    response = await client.post(
+        "/api/v1/tasks/import?format=ndjson", content=ndjson.encode(), headers=headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["imported"] == 2
+    assert data["failed"] == 2
+    assert [error["line"] for error in data["errors"]] == [2, 3]
+    
+    # Un título más largo que la columna es un error de fila, no un fallo del COPY
+    ndjson = "\n".join([json.dumps({"title": "x" * 256}), json.dumps({"title": "Importada 3"})])
+    response = await client.post(
+        "/api/v1/tasks/import?format=ndjson", content=ndjson.encode(), headers=headers
+    )
+    assert response.status_code == 200
+    assert response.json()["imported"] == 1
+    assert [error["line"] for error in response.json()["errors"]] == [1]
+    
+    response = await client.post("/api/v1/tasks/", json={"title": "x" * 256}, headers=headers)
+    assert response.status_code == 422
+    
+    csv_content = 'title,description,is_completed,tags\nDesde CSV,"Varias\nlíneas",true,Otra\n'
+    response = await client.post(
+        "/api/v1/tasks/import?format=csv", content=csv_content.encode(), headers=headers
+    )
+    assert response.json()["imported"] == 1
+    
+    response = await client.get("/api/v1/tasks/", headers=headers)
+    tasks = {task["title"]: task for task in response.json()}
+    assert sorted(tasks) == ["Desde CSV", "Importada 1", "Importada 2", "Importada 3"]
+    assert sorted(tag["name"] for tag in tasks["Importada 2"]["tags"]) == ["Migración", "Otra"]
+    assert tasks["Desde CSV"]["description"] == "Varias\nlíneas"
+    assert tasks["Desde CSV"]["is_completed"] is True
+    
+    # Los IDs reservados no chocan con las tareas creadas después
+    response = await client.post("/api/v1/tasks/", json={"title": "Nueva"}, headers=headers)
+    assert response.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_import_tasks_bulk_timeout(client: AsyncClient, db_session: AsyncSession, monkeypatch):
+    """Test de que el COPY usa el timeout masivo también fuera de la ruta (import_tasks.py)"""
+    await create_user_and_login(client)
+    user = await UserRepository(db_session).get_by_username("testuser")
+    monkeypatch.setattr(task_repo, "BULK_DB_TIMEOUTS", DBTimeouts(123456, 0))
+    
+    timeouts = []
+    reserve_ids = TaskRepository._reserve_ids
+    
+    async def reserve_ids_spy(self, count):
+        timeouts.append((await self.db.execute(text("SHOW statement_timeout"))).scalar())
+        return await reserve_ids(self, count)
+    
+    monkeypatch.setattr(TaskRepository, "_reserve_ids", reserve_ids_spy)
+    
+    async def chunks():
+        yield json.dumps({"title": "Importada"}).encode()
+    
+    result = await TaskImportService(db_session).import_tasks(user.id, chunks(), TaskFileFormat.ndjson)
+    assert result.imported == 1
+    assert timeouts == ["123456ms"]
@@ -0,0 +1,78 @@
+"""
+Tests para los timeouts de base de datos por ruta.
+"""
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import db_timeouts
+from app.db.session import get_db
+from app.main import db_timeout_handler
+from app.tests.conftest import test_engine
+
+# Aplicación mínima con rutas lentas y los mismos manejadores de errores
+timeouts_app = FastAPI(exception_handlers={DBAPIError: db_timeout_handler})
+
+
+@timeouts_app.get("/slow", dependencies=[Depends(db_timeouts(statement_timeout_ms=50))])
+async def slow(db: AsyncSession = Depends(get_db)):
+    await db.execute(text("SELECT pg_sleep(2)"))
+    return {"ok": True}
+
+
+@timeouts_app.get("/locked", dependencies=[Depends(db_timeouts(lock_timeout_ms=50))])
+async def locked(db: AsyncSession = Depends(get_db)):
+    await db.execute(text("SELECT pg_advisory_xact_lock(4242)"))
+    return {"ok": True}
+
+
+@timeouts_app.get("/default")
+async def default(db: AsyncSession = Depends(get_db)):
+    await db.execute(text("SELECT pg_sleep(0.1)"))
+    return {"ok": True}
+
+
+@pytest.fixture
+async def timeouts_client(db_session: AsyncSession):
+    """Cliente de la aplicación mínima usando la sesión de prueba"""
+    async def override_get_db():
+        yield db_session
+
+    timeouts_app.dependency_overrides[get_db] = override_get_db
+    transport = ASGITransport(app=timeouts_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+    timeouts_app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_statement_timeout_returns_504(timeouts_client: AsyncClient, db_session: AsyncSession):
+    """Test de que una consulta que supera el timeout de la ruta se cancela con 504"""
+    start = time.perf_counter()
+    response = await timeouts_client.get("/slow")
+    
+    assert response.status_code == 504
+    assert time.perf_counter() - start < 1
+    
+    # El timeout es local a la transacción: la ruta sin override no se ve afectada
+    await db_session.rollback()
+    response = await timeouts_client.get("/default")
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_lock_timeout_returns_503(timeouts_client: AsyncClient):
+    """Test de que esperar un bloqueo más del límite responde 503 con Retry-After"""
+    async with test_engine.connect() as holder:
+        await holder.execute(text("SELECT pg_advisory_xact_lock(4242)"))
+    
+        response = await timeouts_client.get("/locked")
+
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+        await holder.rollback()
@@ -0,0 +1,67 @@
+"""
+Tests para los endpoints de usuarios.
+"""
+import pytest
+from httpx import AsyncClient
+
+from app.core.cache import user_cache
+
+
+async def create_user_and_login(client: AsyncClient) -> str:
+    """Helper para crear un usuario y obtener su token"""
+    await client.post(
+        "/api/v1/auth/register",
+        json={
+            "email": "test@example.com",
+            "username": "testuser",
+            "password": "testpassword123",
+            "full_name": "Test User"
+        }
+    )
+    
+    response = await client.post(
+        "/api/v1/auth/login",
+        data={
+            "username": "testuser",
+            "password": "testpassword123"
+        }
+    )
+    
+    return response.json()["access_token"]
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_uses_cache(client: AsyncClient):
+    """Test de que el usuario autenticado se sirve desde la caché"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    first = await client.get("/api/v1/users/me", headers=headers)
+    second = await client.get("/api/v1/users/me", headers=headers)
+    
+    assert first.status_code == 200
+    assert second.json() == first.json()
+    assert user_cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_update_user_invalidates_cache(client: AsyncClient):
+    """Test de que modificar el usuario invalida su entrada en caché"""
+    token = await create_user_and_login(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    
+    await client.get("/api/v1/users/me", headers=headers)
+    response = await client.put(
+        "/api/v1/users/me",
+        json={"full_name": "Nuevo Nombre"},
+        headers=headers
+    )
+    assert response.status_code == 200
+    
+    response = await client.get("/api/v1/users/me", headers=headers)
+    assert response.json()["full_name"] == "Nuevo Nombre"
+    
+    # Un usuario desactivado deja de poder autenticarse de inmediato
+    await client.put("/api/v1/users/me", json={"is_active": False}, headers=headers)
+    response = await client.get("/api/v1/users/me", headers=headers)
+    assert response.status_code == 400
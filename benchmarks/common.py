@@ -0,0 +1,60 @@
+"""
+Utilidades compartidas por los benchmarks: estadísticas y metadatos.
+"""
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+from typing import Dict, List
+
+# Límites superiores (ms) de los buckets de los histogramas de latencia
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"))
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Percentil por rango más cercano"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """Resumen estadístico de una lista de tiempos en milisegundos"""
+    return {
+        "n": len(samples_ms),
+        "mean_ms": statistics.fmean(samples_ms),
+        "median_ms": statistics.median(samples_ms),
+        "p95_ms": percentile(samples_ms, 95),
+        "p99_ms": percentile(samples_ms, 99),
+        "min_ms": min(samples_ms),
+        "max_ms": max(samples_ms),
+        "ops_per_s": 1000 / statistics.fmean(samples_ms) if sum(samples_ms) else 0.0,
+    }
+
+
+def histogram(samples_ms: List[float]) -> Dict[str, int]:
+    """Cuenta las muestras de cada bucket de LATENCY_BUCKETS_MS (no acumulativo)"""
+    counts = dict.fromkeys(LATENCY_BUCKETS_MS, 0)
+    for sample in samples_ms:
+        for bound in LATENCY_BUCKETS_MS:
+            if sample <= bound:
+                counts[bound] += 1
+                break
+    return {("+Inf" if bound == float("inf") else f"{bound:g}"): count for bound, count in counts.items()}
+
+
+def run_metadata() -> Dict[str, str]:
+    """Commit, fecha y entorno de la ejecución, para comparar resultados"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return {
+        "commit": commit,
+        "date": datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    }
@@ -0,0 +1,55 @@
+"""
+Compara dos resultados de benchmarks.suite y marca las regresiones.
+
+Sale con código 1 si algún benchmark empeora más que --threshold, para poder
+usarlo en CI.
+
+Uso:
+    python -m benchmarks.compare base.json nuevo.json
+    python -m benchmarks.compare base.json nuevo.json --metric p95_ms --threshold 15
+"""
+import argparse
+import json
+import sys
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as source:
+        return json.load(source)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("base", help="Resultados de referencia")
+    parser.add_argument("new", help="Resultados a comparar")
+    parser.add_argument("--metric", default="median_ms", help="Métrica a comparar (median_ms, p95_ms, mean_ms...)")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Empeoramiento máximo tolerado en %%")
+    args = parser.parse_args()
+
+    base, new = load(args.base), load(args.new)
+    print(f"base: {base['meta'].get('commit')}  nuevo: {new['meta'].get('commit')}  métrica: {args.metric}")
+
+    regressions = []
+    for name in sorted(set(base["results"]) | set(new["results"])):
+        before = base["results"].get(name, {}).get(args.metric)
+        after = new["results"].get(name, {}).get(args.metric)
+        if before is None or after is None:
+            print(f"{name:<50} {'solo en ' + ('base' if after is None else 'nuevo'):>30}")
+            continue
+
+        change = (after - before) / before * 100 if before else 0.0
+        mark = ""
+        if change > args.threshold:
+            mark = "  REGRESIÓN"
+            regressions.append(name)
+        elif change < -args.threshold:
+            mark = "  mejora"
+        print(f"{name:<50} {before:10.3f} -> {after:10.3f} ms ({change:+6.1f}%){mark}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regresiones por encima del {args.threshold:.0f}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
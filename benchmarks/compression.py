@@ -0,0 +1,131 @@
+"""
+Benchmark: coste de CPU frente a bytes ahorrados al comprimir páginas de tareas.
+
+Toma páginas reales del listado de tareas (GET /api/v1/tasks/) del usuario con
+más tareas de la base de datos configurada en .env, las serializa igual que la
+API y mide, para cada codificación y nivel, el tamaño comprimido y el tiempo de
+CPU por página. zstd y br solo se miden si zstandard y brotli están instalados.
+
+Uso:
+    python -m benchmarks.compression --pages 50 --page-size 100
+    python -m benchmarks.compression --levels gzip=1,6,9 br=1,4,11 --output compresion.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from app.core.compression import DEFAULT_LEVELS, ENCODERS
+from app.core.serialization import orm_response
+from app.db.session import AsyncSessionLocal, engine
+from app.models.task import Task
+from app.models.user import User  # noqa: F401 (registra el mapper de la relación owner)
+from app.repositories.task_repo import TaskRepository
+from app.schemas.task import TaskResponse
+from benchmarks.common import run_metadata
+
+# Niveles medidos por defecto (además del configurado por defecto)
+LEVELS = {"gzip": [1, 6, 9], "br": [1, 4, 6, 11], "zstd": [1, 3, 9, 19]}
+
+
+async def load_pages(pages: int, page_size: int, owner_id: Optional[int]) -> List[bytes]:
+    """Cuerpos JSON de las primeras páginas del listado de tareas de un usuario"""
+    async with AsyncSessionLocal() as session:
+        if owner_id is None:
+            owner_id = (await session.execute(
+                select(Task.owner_id).group_by(Task.owner_id).order_by(func.count().desc()).limit(1)
+            )).scalar()
+        if owner_id is None:
+            raise SystemExit("No hay tareas en la base de datos (ver seed_db.py)")
+
+        repo = TaskRepository(session)
+        bodies = []
+        for page in range(pages):
+            rows = await repo.get_rows_by_owner(owner_id, skip=page * page_size, limit=page_size)
+            if not rows:
+                break
+            bodies.append(orm_response(TaskResponse, rows).body)
+    await engine.dispose()
+    return bodies
+
+
+def measure(encoding: str, level: int, bodies: List[bytes], repeat: int) -> Dict[str, float]:
+    """Comprime cada página `repeat` veces y resume tamaño y CPU por página"""
+    cpu_ms: List[float] = []
+    compressed = 0
+    for body in bodies:
+        for _ in range(repeat):
+            start = time.process_time()
+            encoder = ENCODERS[encoding](level)
+            output = encoder.compress(body) + encoder.finish()
+            cpu_ms.append((time.process_time() - start) * 1000)
+        compressed += len(output)
+
+    original = sum(len(body) for body in bodies)
+    cpu_per_page = statistics.fmean(cpu_ms)
+    return {
+        "encoding": encoding,
+        "level": level,
+        "bytes_per_page": original / len(bodies),
+        "compressed_per_page": compressed / len(bodies),
+        "ratio": original / compressed,
+        "saved_pct": 100 * (1 - compressed / original),
+        "cpu_ms_per_page": cpu_per_page,
+        "mb_per_cpu_s": original / len(bodies) / cpu_per_page / 1000 if cpu_per_page else 0.0,
+    }
+
+
+def parse_levels(items: Optional[List[str]]) -> Dict[str, List[int]]:
+    """Convierte ["gzip=1,6", "br=4"] en {"gzip": [1, 6], "br": [4]}"""
+    if not items:
+        levels = {name: sorted(set(LEVELS[name] + [DEFAULT_LEVELS[name]])) for name in LEVELS}
+    else:
+        levels = {}
+        for item in items:
+            name, _, values = item.partition("=")
+            levels[name] = [int(value) for value in values.split(",")]
+    return {name: values for name, values in levels.items() if name in ENCODERS}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=20, help="Páginas del listado a medir")
+    parser.add_argument("--page-size", type=int, default=100, help="Tareas por página")
+    parser.add_argument("--owner-id", type=int, help="Usuario cuyas tareas se listan (por defecto el que más tiene)")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por página")
+    parser.add_argument("--levels", nargs="*", help="Niveles por codificación, ej: gzip=1,6,9 br=4")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    bodies = asyncio.run(load_pages(args.pages, args.page_size, args.owner_id))
+    if not bodies:
+        raise SystemExit("El usuario no tiene tareas")
+    print(f"{len(bodies)} páginas de hasta {args.page_size} tareas, {statistics.fmean(map(len, bodies)):.0f} bytes de media")
+
+    results = []
+    for encoding, levels in parse_levels(args.levels).items():
+        for level in levels:
+            stats = measure(encoding, level, bodies, args.repeat)
+            results.append(stats)
+            print(
+                f"{encoding:<5} nivel={level:<3} {stats['compressed_per_page']:9.0f} bytes "
+                f"ahorro={stats['saved_pct']:5.1f}% ratio={stats['ratio']:5.1f} "
+                f"cpu={stats['cpu_ms_per_page']:7.3f}ms/página {stats['mb_per_cpu_s']:7.1f}MB/s"
+            )
+
+    if args.output:
+        report = {
+            "meta": {**run_metadata(), "pages": len(bodies), "page_size": args.page_size},
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+        print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+"""
+Generador de carga HTTP con escenarios ponderados.
+
+Cada usuario virtual se registra, crea sus tareas iniciales y ejecuta en bucle
+escenarios elegidos al azar según sus pesos (login, listado, CRUD de tareas y
+de tags). Informa el throughput y la latencia de cada escenario con
+percentiles e histograma.
+
+Por defecto la aplicación corre en el mismo proceso (ASGI), así que cliente y
+servidor comparten event loop; para medir la capacidad real de un worker usa
+--url contra uvicorn (`uvicorn app.main:app --workers 1`).
+
+Con --record se guarda la secuencia ejecutada (usuario, instante, escenario) y
+con --replay se reproduce con los mismos tiempos, midiendo la latencia desde
+el instante programado.
+
+Uso:
+    python -m benchmarks.load --users 20 --duration 30
+    python -m benchmarks.load --url http://localhost:8000 --users 50 --output carga.json
+    python -m benchmarks.load --weights list_tasks=80,create_task=20 --record traza.jsonl
+    python -m benchmarks.load --replay traza.jsonl --url http://localhost:8000
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.main import app
+from benchmarks.common import histogram, percentile, run_metadata
+
+PASSWORD = "loadpassword123"
+
+DEFAULT_WEIGHTS = {
+    "login": 2,
+    "list_tasks": 40,
+    "get_task": 15,
+    "create_task": 12,
+    "update_task": 10,
+    "delete_task": 5,
+    "list_tags": 8,
+    "create_tag": 3,
+    "update_tag": 3,
+    "delete_tag": 2,
+}
+
+
+class VirtualUser:
+    """Usuario simulado con su propia cuenta, token y tareas"""
+
+    def __init__(self, client: httpx.AsyncClient, index: int, prefix: str, seed: int):
+        self.client = client
+        self.rng = random.Random(seed * 100003 + index)
+        self.username = f"{prefix}_{index}"
+        self.headers: Dict[str, str] = {}
+        self.task_ids: List[int] = []
+        self.tag_ids: List[int] = []
+        self.counter = 0
+
+    async def setup(self, initial_tasks: int) -> None:
+        """Registra la cuenta, inicia sesión y crea las tareas iniciales"""
+        response = await self._until_admitted(lambda: self.client.post(
+            "/api/v1/auth/register",
+            json={"email": f"{self.username}@example.com", "username": self.username, "password": PASSWORD},
+        ))
+        response.raise_for_status()
+        response = await self._until_admitted(self.login)
+        response.raise_for_status()
+
+        if initial_tasks:
+            response = await self._until_admitted(lambda: self.client.post(
+                "/api/v1/tasks/bulk",
+                json={"create": [self._task_payload() for _ in range(initial_tasks)]},
+                headers=self.headers,
+            ))
+            response.raise_for_status()
+            self.task_ids = [item["id"] for item in response.json()["created"]]
+
+    @staticmethod
+    async def _until_admitted(request: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """Repite la petición mientras el servidor la rechace por saturación (503)"""
+        while True:
+            response = await request()
+            if response.status_code != 503:
+                return response
+            await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+
+    async def teardown(self) -> None:
+        """Elimina los tags creados y la cuenta (sus tareas caen en cascada)"""
+        for tag_id in self.tag_ids:
+            await self._until_admitted(
+                lambda: self.client.delete(f"/api/v1/tags/{tag_id}", headers=self.headers)
+            )
+        await self._until_admitted(lambda: self.client.delete("/api/v1/users/me", headers=self.headers))
+
+    def _task_payload(self) -> dict:
+        self.counter += 1
+        return {
+            "title": f"Tarea {self.counter}",
+            "description": "Tarea generada por la prueba de carga",
+            "priority": self.rng.randint(0, 2),
+            "tag_ids": self.rng.sample(self.tag_ids, min(2, len(self.tag_ids))),
+        }
+
+    # Escenarios: cada uno es una petición y devuelve su respuesta
+
+    async def login(self) -> httpx.Response:
+        response = await self.client.post(
+            "/api/v1/auth/login", data={"username": self.username, "password": PASSWORD}
+        )
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return response
+
+    async def list_tasks(self) -> httpx.Response:
+        return await self.client.get("/api/v1/tasks/?limit=50", headers=self.headers)
+
+    async def get_task(self) -> httpx.Response:
+        if not self.task_ids:
+            return await self.create_task()
+        task_id = self.rng.choice(self.task_ids)
+        return await self.client.get(f"/api/v1/tasks/{task_id}", headers=self.headers)
+
+    async def create_task(self) -> httpx.Response:
+        response = await self.client.post("/api/v1/tasks/", json=self._task_payload(), headers=self.headers)
+        if response.status_code == 201:
+            self.task_ids.append(response.json()["id"])
+        return response
+
+    async def update_task(self) -> httpx.Response:
+        if not self.task_ids:
+            return await self.create_task()
+        task_id = self.rng.choice(self.task_ids)
+        return await self.client.put(
+            f"/api/v1/tasks/{task_id}",
+            json={"is_completed": self.rng.random() < 0.5, "priority": self.rng.randint(0, 2)},
+            headers=self.headers,
+        )
+
+    async def delete_task(self) -> httpx.Response:
+        if not self.task_ids:
+            return await self.create_task()
+        task_id = self.task_ids.pop(self.rng.randrange(len(self.task_ids)))
+        return await self.client.delete(f"/api/v1/tasks/{task_id}", headers=self.headers)
+
+    async def list_tags(self) -> httpx.Response:
+        return await self.client.get("/api/v1/tags/?limit=50", headers=self.headers)
+
+    async def create_tag(self) -> httpx.Response:
+        self.counter += 1
+        response = await self.client.post(
+            "/api/v1/tags/",
+            json={"name": f"{self.username}-tag-{self.counter}", "color": "#3B82F6"},
+            headers=self.headers,
+        )
+        if response.status_code == 201:
+            self.tag_ids.append(response.json()["id"])
+        return response
+
+    async def update_tag(self) -> httpx.Response:
+        if not self.tag_ids:
+            return await self.create_tag()
+        tag_id = self.rng.choice(self.tag_ids)
+        return await self.client.put(
+            f"/api/v1/tags/{tag_id}",
+            json={"color": self.rng.choice(["#FF0000", "#00FF00", "#0000FF"])},
+            headers=self.headers,
+        )
+
+    async def delete_tag(self) -> httpx.Response:
+        if not self.tag_ids:
+            return await self.create_tag()
+        tag_id = self.tag_ids.pop(self.rng.randrange(len(self.tag_ids)))
+        return await self.client.delete(f"/api/v1/tags/{tag_id}", headers=self.headers)
+
+
+SCENARIOS: Dict[str, Callable[[VirtualUser], Awaitable[httpx.Response]]] = {
+    name: getattr(VirtualUser, name) for name in DEFAULT_WEIGHTS
+}
+
+
+class Recorder:
+    """Acumula latencias y códigos de estado por escenario"""
+
+    def __init__(self, measure_from: float):
+        self.measure_from = measure_from
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.trace: List[dict] = []
+
+    def add(self, user: int, scenario: str, started: float, status: int, run_start: float) -> None:
+        self.trace.append({"user": user, "at": round(started - run_start, 6), "scenario": scenario})
+        if started < self.measure_from:
+            return  # Calentamiento
+        self.latencies[scenario].append((time.perf_counter() - started) * 1000)
+        self.statuses[scenario][status] += 1
+        if status == 0 or status >= 400:
+            self.errors[scenario] += 1
+
+
+async def execute(vu: VirtualUser, scenario: str) -> int:
+    """Ejecuta un escenario y devuelve el código de estado (0 si falló la conexión)"""
+    try:
+        return (await SCENARIOS[scenario](vu)).status_code
+    except httpx.HTTPError:
+        return 0
+
+
+async def closed_loop(
+    vu: VirtualUser, index: int, recorder: Recorder, weights: Dict[str, float],
+    run_start: float, deadline: float, think_time: float,
+) -> None:
+    """Cada usuario lanza un escenario tras terminar el anterior"""
+    names, values = list(weights), list(weights.values())
+    while time.perf_counter() < deadline:
+        scenario = vu.rng.choices(names, weights=values)[0]
+        started = time.perf_counter()
+        status = await execute(vu, scenario)
+        recorder.add(index, scenario, started, status, run_start)
+        if think_time:
+            await asyncio.sleep(vu.rng.expovariate(1 / think_time))
+
+
+async def replay_loop(
+    vu: VirtualUser, index: int, recorder: Recorder,
+    schedule: List[Tuple[float, str]], run_start: float,
+) -> None:
+    """Reproduce la traza grabada; la latencia se mide desde el instante programado"""
+    for at, scenario in schedule:
+        scheduled = run_start + at
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        status = await execute(vu, scenario)
+        recorder.add(index, scenario, scheduled, status, run_start)
+
+
+def load_trace(path: str) -> Dict[int, List[Tuple[float, str]]]:
+    """Lee una traza de --record agrupada por usuario"""
+    schedules: Dict[int, List[Tuple[float, str]]] = defaultdict(list)
+    with open(path, encoding="utf-8") as source:
+        for line in source:
+            if line.strip():
+                entry = json.loads(line)
+                schedules[entry["user"]].append((entry["at"], entry["scenario"]))
+    return schedules
+
+
+def parse_weights(text: Optional[str]) -> Dict[str, float]:
+    """Convierte "list_tasks=80,create_task=20" en un diccionario de pesos"""
+    if not text:
+        return dict(DEFAULT_WEIGHTS)
+    weights = {}
+    for item in text.split(","):
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Escenario desconocido: {name} (disponibles: {', '.join(SCENARIOS)})")
+        weights[name] = float(value or 1)
+    return weights
+
+
+def summarize_scenarios(recorder: Recorder, elapsed: float) -> Dict[str, dict]:
+    """Throughput, percentiles e histograma de cada escenario y del total"""
+    results = {}
+    all_latencies = [value for values in recorder.latencies.values() for value in values]
+    groups = {**recorder.latencies, "total": all_latencies}
+    for name, samples in groups.items():
+        if not samples:
+            continue
+        errors = (
+            sum(recorder.errors.values()) if name == "total" else recorder.errors.get(name, 0)
+        )
+        results[name] = {
+            "requests": len(samples),
+            "errors": errors,
+            "rps": len(samples) / elapsed,
+            "mean_ms": statistics.fmean(samples),
+            "p50_ms": percentile(samples, 50),
+            "p90_ms": percentile(samples, 90),
+            "p99_ms": percentile(samples, 99),
+            "max_ms": max(samples),
+            "histogram_ms": histogram(samples),
+        }
+        if name != "total":
+            results[name]["statuses"] = {str(code): count for code, count in recorder.statuses[name].items()}
+    return results
+
+
+def print_report(results: Dict[str, dict]) -> None:
+    print(f"{'escenario':<14}{'peticiones':>11}{'errores':>9}{'rps':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}")
+    for name, stats in results.items():
+        print(
+            f"{name:<14}{stats['requests']:>11}{stats['errors']:>9}{stats['rps']:>9.1f}"
+            f"{stats['p50_ms']:>9.1f}{stats['p90_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}"
+        )
+
+    total = results.get("total")
+    if total:
+        print("\nHistograma de latencia (total):")
+        peak = max(total["histogram_ms"].values()) or 1
+        for bound, count in total["histogram_ms"].items():
+            bar = "#" * round(40 * count / peak)
+            print(f"  <= {bound:>5} ms {count:>8} {bar}")
+
+
+async def run(args: argparse.Namespace) -> dict:
+    schedules = load_trace(args.replay) if args.replay else None
+    users = len(schedules) if schedules else args.users
+    weights = parse_weights(args.weights)
+
+    if args.url:
+        transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=users))
+        base_url = args.url
+    else:
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://load"
+
+    prefix = f"load_{uuid.uuid4().hex[:8]}"
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+        vus = [VirtualUser(client, i, prefix, args.seed) for i in range(users)]
+        print(f"Preparando {users} usuarios con {args.initial_tasks} tareas cada uno...")
+        await asyncio.gather(*(vu.setup(args.initial_tasks) for vu in vus))
+
+        run_start = time.perf_counter()
+        recorder = Recorder(measure_from=run_start + (0 if schedules else args.warmup))
+        if schedules:
+            await asyncio.gather(*(
+                replay_loop(vu, i, recorder, schedules[index], run_start)
+                for i, (vu, index) in enumerate(zip(vus, sorted(schedules)))
+            ))
+        else:
+            deadline = run_start + args.warmup + args.duration
+            await asyncio.gather(*(
+                closed_loop(vu, i, recorder, weights, run_start, deadline, args.think_time)
+                for i, vu in enumerate(vus)
+            ))
+        elapsed = time.perf_counter() - max(recorder.measure_from, run_start)
+
+        if not args.keep_data:
+            await asyncio.gather(*(vu.teardown() for vu in vus))
+
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as output:
+            for entry in sorted(recorder.trace, key=lambda entry: entry["at"]):
+                output.write(json.dumps(entry) + "\n")
+
+    results = summarize_scenarios(recorder, elapsed)
+    return {
+        "meta": {
+            **run_metadata(),
+            "target": args.url or "asgi",
+            "users": users,
+            "duration_s": elapsed,
+            "weights": None if schedules else weights,
+            "replay": args.replay,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="URL de un servidor en marcha (por defecto, ASGI en proceso)")
+    parser.add_argument("--users", type=int, default=10, help="Usuarios virtuales concurrentes")
+    parser.add_argument("--duration", type=float, default=10.0, help="Duración medida en segundos")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Segundos iniciales que no se miden")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pausa media entre escenarios (s)")
+    parser.add_argument("--weights", help="Pesos de los escenarios, ej: list_tasks=80,create_task=20")
+    parser.add_argument("--initial-tasks", type=int, default=20, help="Tareas creadas por usuario al empezar")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout por petición (s)")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de la elección de escenarios")
+    parser.add_argument("--record", help="Guarda la secuencia ejecutada en este archivo JSONL")
+    parser.add_argument("--replay", help="Reproduce una secuencia guardada con --record")
+    parser.add_argument("--keep-data", action="store_true", help="No elimina los usuarios creados")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report["results"])
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+        print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
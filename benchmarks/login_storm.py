@@ -0,0 +1,91 @@
+"""
+Benchmark: latencia de endpoints no relacionados durante una ráfaga de logins.
+
+Ejecuta la aplicación en proceso (ASGI) contra la base de datos configurada en
+.env y mide la latencia de GET /health mientras varios clientes hacen login
+en bucle. Con --mode inline se verifica Argon2 dentro del event loop (el
+comportamiento anterior) para comparar con el pool de hilos.
+
+Uso:
+    python -m benchmarks.login_storm --logins 32 --duration 10
+    python -m benchmarks.login_storm --mode inline
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import List
+
+from httpx import ASGITransport, AsyncClient
+
+from app.core.security import verify_password
+from app.main import app
+from app.services import auth_service
+from benchmarks.common import percentile
+
+
+async def _verify_inline(plain_password: str, hashed_password: str) -> bool:
+    """Verificación síncrona dentro del event loop (comportamiento anterior)"""
+    return verify_password(plain_password, hashed_password)
+
+
+async def run(logins: int, duration: float, mode: str) -> None:
+    if mode == "inline":
+        auth_service.verify_password_async = _verify_inline
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        username = f"bench_{uuid.uuid4().hex[:12]}"
+        credentials = {"username": username, "password": "benchpassword123"}
+        await client.post(
+            "/api/v1/auth/register",
+            json={**credentials, "email": f"{username}@example.com"},
+        )
+
+        deadline = time.perf_counter() + duration
+        login_count = 0
+        probe_latencies: List[float] = []
+
+        async def login_worker() -> None:
+            nonlocal login_count
+            while time.perf_counter() < deadline:
+                response = await client.post("/api/v1/auth/login", data=credentials)
+                response.raise_for_status()
+                login_count += 1
+
+        async def probe() -> None:
+            # La latencia se mide desde el instante programado, así los
+            # bloqueos del event loop cuentan aunque retrasen el envío.
+            interval = 0.01
+            scheduled = time.perf_counter()
+            while scheduled < deadline:
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                await client.get("/health")
+                probe_latencies.append((time.perf_counter() - scheduled) * 1000)
+                scheduled += interval
+
+        await asyncio.gather(probe(), *(login_worker() for _ in range(logins)))
+
+    print(f"modo={mode} logins_concurrentes={logins} duración={duration}s")
+    print(f"logins/s: {login_count / duration:.1f}")
+    print(
+        "GET /health ms: "
+        f"p50={statistics.median(probe_latencies):.2f} "
+        f"p99={percentile(probe_latencies, 99):.2f} "
+        f"max={max(probe_latencies):.2f} "
+        f"(n={len(probe_latencies)})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=16, help="Clientes haciendo login en paralelo")
+    parser.add_argument("--duration", type=float, default=5.0, help="Duración en segundos")
+    parser.add_argument("--mode", choices=["pool", "inline"], default="pool")
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.duration, args.mode))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+Micro-benchmarks de repositorios y servicios.
+
+Mide los caminos calientes de la API: get_current_user, el listado de tareas
+con TaskRepository.get_all_by_owner (ORM) y get_rows_by_owner (filas con tags
+en JSON) con distintos tamaños de página, creación y actualización de tareas
+con tags, login con Argon2, serialización de TaskResponse (Pydantic y camino
+rápido con orjson) y el listado completo a través de la aplicación ASGI (sin
+red). Se ejecuta contra la base de datos configurada en .env: crea un usuario
+propio con --tasks tareas (con COPY) y lo elimina al terminar.
+
+Los resultados se guardan en JSON para compararlos entre commits con
+benchmarks.compare.
+
+Uso:
+    python -m benchmarks.suite --tasks 50000 --output base.json
+    python -m benchmarks.suite --filter tasks.list --iterations 500
+    python -m benchmarks.suite --filter serialize api.tasks --clock cpu
+"""
+import argparse
+import asyncio
+import gc
+import json
+import random
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, NamedTuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_user
+from app.core.cache import token_cache, user_cache
+from app.core.config import settings
+from app.core.pagination import Cursor
+from app.core.security import create_access_token, get_password_hash
+from app.core.serialization import orm_response
+from app.db.session import AsyncSessionLocal, engine
+from app.main import app
+from app.models.tag import Tag
+from app.models.task import Task
+from app.models.user import User
+from app.repositories.tag_repo import TagRepository
+from app.repositories.task_repo import TaskRepository
+from app.schemas.task import TaskCreate, TaskFilter, TaskResponse, TaskUpdate
+from app.services.auth_service import AuthService
+from app.services.task_service import TaskService
+from benchmarks.common import run_metadata, summarize
+
+PASSWORD = "benchpassword123"
+
+# Una operación es una corrutina sin argumentos; se mide cada llamada
+Operation = Callable[[], Awaitable[object]]
+
+
+class Context(NamedTuple):
+    """Datos compartidos por todos los benchmarks de una ejecución"""
+    args: argparse.Namespace
+    session: AsyncSession
+    user_id: int
+    username: str
+    token: str
+    tag_ids: List[int]
+
+
+async def setup(session: AsyncSession, args: argparse.Namespace) -> Context:
+    """Crea el usuario de benchmark, sus tags y sus tareas"""
+    rng = random.Random(args.seed)
+    prefix = f"bench_{uuid.uuid4().hex[:10]}"
+    user = User(
+        email=f"{prefix}@example.com",
+        username=prefix,
+        hashed_password=get_password_hash(PASSWORD),
+        full_name="Benchmark",
+    )
+    session.add(user)
+    await session.commit()
+
+    tag_repo = TagRepository(session)
+    tag_ids = list((await tag_repo.get_or_create_by_names(
+        [f"{prefix}-tag-{i}" for i in range(args.tags)]
+    )).values())
+
+    task_repo = TaskRepository(session)
+    remaining = args.tasks
+    while remaining > 0:
+        size = min(remaining, settings.TASK_IMPORT_BATCH_SIZE)
+        rows = [
+            {
+                "title": f"Tarea {i}",
+                "description": "Descripción de la tarea de benchmark",
+                "priority": rng.randint(0, 2),
+                "is_completed": rng.random() < 0.3,
+            }
+            for i in range(size)
+        ]
+        links = [rng.sample(tag_ids, min(args.tags_per_task, len(tag_ids))) for _ in rows]
+        await task_repo.copy_import_batch(user.id, rows, links)
+        remaining -= size
+
+    # Estadísticas al día para que los planes sean los de producción
+    connection = await session.connection()
+    await connection.exec_driver_sql("ANALYZE tasks, task_tags")
+    await session.commit()
+
+    return Context(
+        args=args,
+        session=session,
+        user_id=user.id,
+        username=prefix,
+        token=create_access_token(data={"sub": str(user.id)}),
+        tag_ids=tag_ids,
+    )
+
+
+async def teardown(session: AsyncSession, ctx: Context) -> None:
+    """Elimina el usuario de benchmark (sus tareas caen en cascada) y sus tags"""
+    await session.execute(delete(User).where(User.id == ctx.user_id))
+    await session.execute(delete(Tag).where(Tag.id.in_(ctx.tag_ids)))
+    await session.commit()
+
+
+async def auth_benchmarks(ctx: Context) -> Dict[str, Operation]:
+    """get_current_user con y sin caché, y login completo con Argon2"""
+
+    async def cached():
+        return await get_current_user(token=ctx.token, db=ctx.session)
+
+    async def uncached():
+        token_cache.clear()
+        user_cache.clear()
+        return await get_current_user(token=ctx.token, db=ctx.session)
+
+    async def login():
+        return await AuthService(ctx.session).login(ctx.username, PASSWORD)
+
+    return {
+        "auth.get_current_user.cached": cached,
+        "auth.get_current_user.uncached": uncached,
+        "auth.login": login,
+    }
+
+
+async def list_benchmarks(ctx: Context) -> Dict[str, Operation]:
+    """Listado de tareas por offset y por cursor con distintos tamaños de página"""
+    repo = TaskRepository(ctx.session)
+    operations: Dict[str, Operation] = {}
+
+    def page(limit: int, **kwargs) -> Operation:
+        async def operation():
+            return await repo.get_all_by_owner(ctx.user_id, limit=limit, **kwargs)
+        return operation
+
+    def rows_page(limit: int) -> Operation:
+        async def operation():
+            return await repo.get_rows_by_owner(ctx.user_id, limit=limit)
+        return operation
+
+    for limit in ctx.args.page_sizes:
+        operations[f"tasks.list.first_page.limit={limit}"] = page(limit)
+        # Misma página como filas con los tags en JSON (una sola consulta, sin ORM)
+        operations[f"tasks.list_rows.first_page.limit={limit}"] = rows_page(limit)
+
+    # Página profunda: la misma posición por OFFSET y por cursor keyset
+    middle = ctx.args.tasks // 2
+    result = await ctx.session.execute(
+        select(Task.created_at, Task.id)
+        .where(Task.owner_id == ctx.user_id)
+        .order_by(Task.created_at, Task.id)
+        .offset(max(middle - 1, 0))
+        .limit(1)
+    )
+    row = result.first()
+    if row is not None:
+        limit = max(ctx.args.page_sizes)
+        operations[f"tasks.list.deep_offset.limit={limit}"] = page(limit, skip=middle)
+        operations[f"tasks.list.deep_cursor.limit={limit}"] = page(
+            limit, after=Cursor("created_at", row.created_at, row.id)
+        )
+
+    operations["tasks.list.open_by_priority.limit=50"] = page(
+        50, filters=TaskFilter(is_completed=False, sort="-priority")
+    )
+    return operations
+
+
+async def write_benchmarks(ctx: Context) -> Dict[str, Operation]:
+    """Creación y actualización de tareas con tags a través del servicio"""
+    service = TaskService(ctx.session)
+    tag_ids = ctx.tag_ids[:3]
+    task = await service.create_task(TaskCreate(title="Objetivo de update"), ctx.user_id)
+    counter = 0
+
+    async def create():
+        return await service.create_task(
+            TaskCreate(title="Nueva tarea", priority=1, tag_ids=tag_ids), ctx.user_id
+        )
+
+    async def update():
+        nonlocal counter
+        counter += 1
+        return await service.update_task(
+            task.id,
+            TaskUpdate(title=f"Actualizada {counter}", tag_ids=tag_ids[counter % 2:]),
+            ctx.user_id,
+        )
+
+    return {
+        "tasks.create_with_tags": create,
+        "tasks.update_with_tags": update,
+    }
+
+
+async def serialization_benchmarks(ctx: Context) -> Dict[str, Operation]:
+    """Serialización de una página de TaskResponse como lo hace FastAPI"""
+    repo = TaskRepository(ctx.session)
+    tasks = await repo.get_all_by_owner(ctx.user_id, limit=100)
+
+    async def serialize():
+        return JSONResponse(jsonable_encoder([TaskResponse.from_orm(task) for task in tasks])).body
+
+    async def serialize_fast():
+        return orm_response(TaskResponse, tasks).body
+
+    return {
+        f"schemas.task_response.serialize.n={len(tasks)}": serialize,
+        f"schemas.task_response.serialize_fast.n={len(tasks)}": serialize_fast,
+    }
+
+
+async def api_benchmarks(ctx: Context) -> Dict[str, Operation]:
+    """Petición completa al listado de tareas a través de la aplicación ASGI"""
+    client = AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")
+    headers = {"Authorization": f"Bearer {ctx.token}"}
+
+    def get(url: str) -> Operation:
+        async def operation():
+            response = await client.get(url, headers=headers)
+            response.raise_for_status()
+            return response
+        return operation
+
+    return {
+        f"api.tasks.list.limit={limit}": get(f"/api/v1/tasks/?limit={limit}")
+        for limit in ctx.args.page_sizes
+    }
+
+
+GROUPS = [auth_benchmarks, list_benchmarks, write_benchmarks, serialization_benchmarks, api_benchmarks]
+
+# Límite de iteraciones de las operaciones lentas a propósito
+MAX_ITERATIONS = {"auth.login": 20}
+
+
+async def measure(ctx: Context, operation: Operation, iterations: int, warmup: int) -> List[float]:
+    """Ejecuta la operación y devuelve la duración de cada iteración en ms"""
+    samples: List[float] = []
+    clock = time.process_time if ctx.args.clock == "cpu" else time.perf_counter
+    gc.collect()
+    for i in range(warmup + iterations):
+        start = clock()
+        await operation()
+        elapsed = (clock() - start) * 1000
+        # Sin identity map entre iteraciones: cada una carga los objetos de cero
+        ctx.session.expunge_all()
+        if i >= warmup:
+            samples.append(elapsed)
+    return samples
+
+
+async def run(args: argparse.Namespace) -> dict:
+    results: Dict[str, dict] = {}
+    async with AsyncSessionLocal() as session:
+        print(f"Preparando datos: {args.tasks} tareas, {args.tags} tags...")
+        ctx = await setup(session, args)
+        try:
+            for group in GROUPS:
+                operations = await group(ctx)
+                for name, operation in operations.items():
+                    if args.filter and not any(f in name for f in args.filter):
+                        continue
+                    iterations = min(args.iterations, MAX_ITERATIONS.get(name, args.iterations))
+                    warmup = min(args.warmup, iterations)
+                    results[name] = summarize(await measure(ctx, operation, iterations, warmup))
+                    stats = results[name]
+                    print(
+                        f"{name:<50} median={stats['median_ms']:8.3f}ms "
+                        f"p95={stats['p95_ms']:8.3f}ms n={stats['n']}"
+                    )
+        finally:
+            await session.rollback()
+            await teardown(session, ctx)
+    await engine.dispose()
+
+    return {
+        "meta": {
+            **run_metadata(),
+            "tasks": args.tasks,
+            "tags": args.tags,
+            "tags_per_task": args.tags_per_task,
+            "iterations": args.iterations,
+            "clock": args.clock,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=10000, help="Tareas del usuario de benchmark")
+    parser.add_argument("--tags", type=int, default=20, help="Tags creados para el benchmark")
+    parser.add_argument("--tags-per-task", type=int, default=2, help="Tags asociados a cada tarea")
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 50, 100], help="Tamaños de página")
+    parser.add_argument("--iterations", type=int, default=200, help="Iteraciones medidas por benchmark")
+    parser.add_argument("--warmup", type=int, default=10, help="Iteraciones de calentamiento")
+    parser.add_argument("--filter", nargs="*", help="Solo los benchmarks cuyo nombre contenga alguno de estos textos")
+    parser.add_argument(
+        "--clock", choices=["wall", "cpu"], default="wall",
+        help="Tiempo medido: real (wall) o CPU del proceso (cpu, excluye la espera a la base de datos)",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Semilla de los datos generados")
+    parser.add_argument("--output", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+        print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Script para importar tareas masivamente desde un archivo CSV o NDJSON.
+Usa el mismo servicio que el endpoint POST /api/v1/tasks/import.
+
+Uso:
+    python import_tasks.py --username demo tareas.ndjson
+    python import_tasks.py --username demo --format csv tareas.csv
+"""
+import argparse
+import asyncio
+from typing import AsyncIterator
+
+from app.db.session import AsyncSessionLocal, engine
+from app.repositories.user_repo import UserRepository
+from app.schemas.task import TaskFileFormat
+from app.services.import_service import TaskImportService
+
+CHUNK_SIZE = 1024 * 1024
+
+
+async def read_chunks(path: str) -> AsyncIterator[bytes]:
+    """Lee el archivo por trozos para no cargarlo entero en memoria"""
+    with open(path, "rb") as file:
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
+
+
+async def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Importa tareas masivamente")
+    parser.add_argument("path", help="Archivo a importar")
+    parser.add_argument("--username", required=True, help="Usuario propietario de las tareas")
+    parser.add_argument(
+        "--format",
+        choices=[file_format.value for file_format in TaskFileFormat],
+        help="Formato del archivo (por defecto, según la extensión)",
+    )
+    args = parser.parse_args()
+    file_format = TaskFileFormat(
+        args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    )
+
+    try:
+        async with AsyncSessionLocal() as session:
+            user = await UserRepository(session).get_by_username(args.username)
+            if user is None:
+                raise SystemExit(f"❌ No existe el usuario {args.username}")
+
+            print(f"🚀 Importando {args.path} ({file_format.value}) para {args.username}...")
+            result = await TaskImportService(session).import_tasks(
+                user.id, read_chunks(args.path), file_format
+            )
+    finally:
+        # Cierra las conexiones del pool antes de que termine el event loop
+        await engine.dispose()
+
+    print(f"✅ {result.imported} tareas importadas")
+    if result.failed:
+        print(f"⚠️  {result.failed} filas con errores:")
+        for error in result.errors:
+            print(f"   - línea {error.line}: {error.detail}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+"""Keyset pagination indexes
+
+Revision ID: 3b9e1c7d52a4
+Revises: 924f2890fd7b
+Create Date: 2026-10-18 10:00:12.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e1c7d52a4'
+down_revision: Union[str, None] = '924f2890fd7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY evita bloquear escrituras en tablas grandes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_owner_id_created_at_id', 'tasks',
+            ['owner_id', 'created_at', 'id'], unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_tags_created_at_id', 'tags',
+            ['created_at', 'id'], unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tags_created_at_id', table_name='tags', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_owner_id_created_at_id', table_name='tasks', postgresql_concurrently=True)
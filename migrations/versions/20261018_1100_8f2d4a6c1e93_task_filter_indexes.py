@@ -0,0 +1,52 @@
+"""Task filter indexes
+
+Revision ID: 8f2d4a6c1e93
+Revises: 3b9e1c7d52a4
+Create Date: 2026-10-18 11:00:41.207719
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f2d4a6c1e93'
+down_revision: Union[str, None] = '3b9e1c7d52a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY evita bloquear escrituras en tablas grandes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_owner_id_updated_at_id', 'tasks',
+            ['owner_id', 'updated_at', 'id'], unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_tasks_owner_id_priority_id', 'tasks',
+            ['owner_id', 'priority', 'id'], unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_tasks_owner_id_is_completed_created_at_id', 'tasks',
+            ['owner_id', 'is_completed', 'created_at', 'id'], unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_tasks_owner_id_open_priority_id', 'tasks',
+            ['owner_id', 'priority', 'id'], unique=False,
+            postgresql_where=sa.text('is_completed = false'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_owner_id_open_priority_id', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_owner_id_is_completed_created_at_id', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_owner_id_priority_id', table_name='tasks', postgresql_concurrently=True)
+        op.drop_index('ix_tasks_owner_id_updated_at_id', table_name='tasks', postgresql_concurrently=True)
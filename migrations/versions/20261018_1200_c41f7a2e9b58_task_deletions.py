@@ -0,0 +1,38 @@
+"""Task deletions log for incremental sync
+
+Revision ID: c41f7a2e9b58
+Revises: 8f2d4a6c1e93
+Create Date: 2026-10-18 12:00:12.584310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f7a2e9b58'
+down_revision: Union[str, None] = '8f2d4a6c1e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'task_deletions',
+        sa.Column('task_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('task_id'),
+    )
+    op.create_index(
+        'ix_task_deletions_owner_id_deleted_at_task_id', 'task_deletions',
+        ['owner_id', 'deleted_at', 'task_id'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_deletions_owner_id_deleted_at_task_id', table_name='task_deletions')
+    op.drop_table('task_deletions')
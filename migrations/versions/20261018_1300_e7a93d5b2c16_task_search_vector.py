@@ -0,0 +1,50 @@
+"""Task full-text search vector
+
+Revision ID: e7a93d5b2c16
+Revises: c41f7a2e9b58
+Create Date: 2026-10-18 13:00:27.931042
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a93d5b2c16'
+down_revision: Union[str, None] = 'c41f7a2e9b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Una columna generada STORED reescribe la tabla con bloqueo exclusivo:
+    # en tablas grandes conviene aplicarla en una ventana de mantenimiento
+    op.add_column(
+        'tasks',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('spanish'::regconfig, title), 'A') || "
+                "setweight(to_tsvector('spanish'::regconfig, coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    # CONCURRENTLY evita bloquear escrituras en tablas grandes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tasks_search_vector', 'tasks', ['search_vector'], unique=False,
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tasks_search_vector', table_name='tasks', postgresql_concurrently=True)
+    op.drop_column('tasks', 'search_vector')
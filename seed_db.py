@@ -1,17 +1,72 @@
 """
-Script para poblar la base de datos con datos de ejemplo.
-Útil para desarrollo y testing.
+Script para poblar la base de datos con datos sintéticos.
+Genera volúmenes realistas (usuarios, tareas con distribución sesgada, tags)
+de forma determinista y los carga con COPY, útil para desarrollo, benchmarks
+y revisión de planes de consulta.
+
+Uso:
+    python seed_db.py                                  # Datos de ejemplo pequeños
+    python seed_db.py --users 10000 --tasks-per-user 1000 --truncate
+    python seed_db.py --users 500 --skew 1.1 --seed 7 --completion-ratio 0.6
+
+Siempre se crean los usuarios admin (admin123) y demo (demo123). El resto de
+usuarios son userN con contraseña "password123". Si ya existen, el script
+termina sin cambios salvo que se use --truncate.
 """
+import argparse
 import asyncio
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Iterator, List, Sequence, Tuple
+
+import asyncpg
 
+from app.core.config import settings
 from app.core.security import get_password_hash
 from app.db.base import Base
 from app.db.session import engine
-from app.models.tag import Tag
-from app.models.task import Task
-from app.models.user import User
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import sessionmaker
+
+# Vocabulario para generar títulos y descripciones
+WORDS = (
+    "revisar preparar enviar llamar actualizar documentar migrar corregir diseñar "
+    "probar desplegar planificar reunión cliente informe presupuesto factura "
+    "servidor base datos api tarea proyecto equipo sprint release ticket error "
+    "mejora rendimiento seguridad backup correo propuesta contrato entrega "
+    "semana mañana urgente pendiente revisión código pruebas métricas panel "
+    "usuario cuenta pago pedido inventario soporte campaña agenda notas"
+).split()
+
+TAG_COLORS = ["#FF0000", "#FFA500", "#00FF00", "#0000FF", "#FF00FF", "#3B82F6"]
+
+SYNTHETIC_PASSWORD = "password123"
+
+# Usuarios que se crean siempre: si ya existen, la base de datos ya está poblada
+FIXED_USERNAMES = ["admin", "demo"]
+
+
+def parse_args() -> argparse.Namespace:
+    """Parámetros del generador"""
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos para TaskFlow")
+    parser.add_argument("--users", type=int, default=2, help="Usuarios sintéticos además de admin y demo")
+    parser.add_argument("--tasks-per-user", type=float, default=5, help="Media de tareas por usuario")
+    parser.add_argument(
+        "--skew", type=float, default=1.5,
+        help="Exponente de Pareto para el reparto de tareas (menor = más sesgado; <= 1 = uniforme)",
+    )
+    parser.add_argument("--max-tasks-per-user", type=int, default=None, help="Tope de tareas por usuario")
+    parser.add_argument("--tags", type=int, default=5, help="Número de etiquetas")
+    parser.add_argument("--max-tags-per-task", type=int, default=2, help="Máximo de etiquetas por tarea")
+    parser.add_argument("--completion-ratio", type=float, default=0.3, help="Fracción de tareas completadas")
+    parser.add_argument("--title-words", type=int, default=6, help="Máximo de palabras por título")
+    parser.add_argument("--description-words", type=int, default=20, help="Media de palabras por descripción (0 = sin descripción)")
+    parser.add_argument("--days", type=int, default=365, help="Antigüedad máxima de las tareas en días")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla para resultados reproducibles")
+    parser.add_argument("--batch-size", type=int, default=50000, help="Filas por COPY")
+    parser.add_argument("--truncate", action="store_true", help="Vacía las tablas antes de generar")
+    parser.add_argument("--create-tables", action="store_true", help="Crea las tablas (si no usas Alembic)")
+    return parser.parse_args()
 
 
 async def create_tables():
@@ -21,156 +76,215 @@ async def create_tables():
     print("✅ Tablas creadas exitosamente")
 
 
-async def seed_data():
-    """Inserta datos de ejemplo en la base de datos"""
-    AsyncSessionLocal = sessionmaker(
-        engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
+def tasks_per_user(rng: random.Random, args: argparse.Namespace) -> int:
+    """
+    Número de tareas de un usuario. Con skew > 1 sigue una distribución de
+    Pareto con media --tasks-per-user (pocos usuarios concentran muchas tareas).
+    """
+    if args.skew <= 1:
+        count = rng.random() * 2 * args.tasks_per_user
+    else:
+        scale = args.tasks_per_user * (args.skew - 1) / args.skew
+        count = scale * rng.paretovariate(args.skew)
+    if args.max_tasks_per_user is not None:
+        count = min(count, args.max_tasks_per_user)
+    return int(count)
+
+
+def text(rng: random.Random, words: int) -> str:
+    """Texto aleatorio con el número de palabras indicado"""
+    return " ".join(rng.choices(WORDS, k=words))
+
+
+def batched(items: Iterator, size: int) -> Iterator[List]:
+    """Agrupa un iterador en listas de `size` elementos"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def reserve_ids(conn: asyncpg.Connection, table: str, count: int) -> List[int]:
+    """Reserva `count` IDs de la secuencia de la tabla"""
+    rows = await conn.fetch(
+        "SELECT nextval(pg_get_serial_sequence($1, 'id')) FROM generate_series(1, $2)",
+        table, count,
     )
-    
-    async with AsyncSessionLocal() as session:
-        # Crear usuarios de ejemplo
-        admin_user = User(
-            email="admin@taskflow.com",
-            username="admin",
-            hashed_password=get_password_hash("admin123"),
-            full_name="Administrador",
-            is_superuser=True,
+    return [row[0] for row in rows]
+
+
+async def seed_users(conn: asyncpg.Connection, args: argparse.Namespace, now: datetime) -> List[int]:
+    """Crea admin, demo y los usuarios sintéticos; devuelve sus IDs"""
+    # Un único hash para todos los usuarios sintéticos: Argon2 es lento a propósito
+    synthetic_hash = get_password_hash(SYNTHETIC_PASSWORD)
+    users = [
+        ("admin@taskflow.com", "admin", get_password_hash("admin123"), "Administrador", True),
+        ("demo@taskflow.com", "demo", get_password_hash("demo123"), "Usuario Demo", False),
+    ]
+    users += [
+        (f"user{i}@example.com", f"user{i}", synthetic_hash, f"Usuario {i}", False)
+        for i in range(1, args.users + 1)
+    ]
+
+    user_ids: List[int] = []
+    for batch in batched(iter(users), args.batch_size):
+        ids = await reserve_ids(conn, "users", len(batch))
+        await conn.copy_records_to_table(
+            "users",
+            records=[
+                (user_id, email, username, hashed, full_name, True, is_superuser, now, now)
+                for user_id, (email, username, hashed, full_name, is_superuser) in zip(ids, batch)
+            ],
+            columns=[
+                "id", "email", "username", "hashed_password", "full_name",
+                "is_active", "is_superuser", "created_at", "updated_at",
+            ],
         )
-        
-        demo_user = User(
-            email="demo@taskflow.com",
-            username="demo",
-            hashed_password=get_password_hash("demo123"),
-            full_name="Usuario Demo",
+        user_ids.extend(ids)
+    return user_ids
+
+
+async def seed_tags(conn: asyncpg.Connection, args: argparse.Namespace, now: datetime) -> List[int]:
+    """Crea las etiquetas; devuelve sus IDs"""
+    if args.tags <= 0:
+        return []
+    ids = await reserve_ids(conn, "tags", args.tags)
+    await conn.copy_records_to_table(
+        "tags",
+        records=[
+            (tag_id, f"tag-{i}", TAG_COLORS[i % len(TAG_COLORS)], now, now)
+            for i, tag_id in enumerate(ids)
+        ],
+        columns=["id", "name", "color", "created_at", "updated_at"],
+    )
+    return ids
+
+
+def generate_tasks(
+    rng: random.Random,
+    args: argparse.Namespace,
+    user_ids: Sequence[int],
+    now: datetime,
+) -> Iterator[Tuple]:
+    """Genera las filas de tareas (sin ID) de todos los usuarios"""
+    max_age = args.days * 86400
+    for owner_id in user_ids:
+        for _ in range(tasks_per_user(rng, args)):
+            created_at = now - timedelta(seconds=rng.random() * max_age)
+            updated_at = created_at + timedelta(seconds=rng.random() * (now - created_at).total_seconds())
+            description = None
+            if args.description_words > 0:
+                words = max(1, int(rng.lognormvariate(math.log(args.description_words), 0.5)))
+                description = text(rng, words)
+            yield (
+                text(rng, rng.randint(2, max(2, args.title_words)))[:255],
+                description,
+                rng.choices((0, 1, 2), weights=(5, 3, 2))[0],
+                rng.random() < args.completion_ratio,
+                owner_id,
+                created_at,
+                updated_at,
+            )
+
+
+async def seed_tasks(
+    conn: asyncpg.Connection,
+    rng: random.Random,
+    args: argparse.Namespace,
+    user_ids: Sequence[int],
+    tag_ids: Sequence[int],
+    now: datetime,
+) -> Tuple[int, int]:
+    """Carga tareas y asociaciones con COPY por lotes; devuelve los totales"""
+    # Popularidad de tags tipo Zipf: unas pocas etiquetas se usan mucho más
+    tag_weights = [1 / (rank + 1) for rank in range(len(tag_ids))]
+    task_count = link_count = 0
+
+    for batch in batched(generate_tasks(rng, args, user_ids, now), args.batch_size):
+        ids = await reserve_ids(conn, "tasks", len(batch))
+        links = []
+        for task_id in ids:
+            fan_out = rng.randint(0, args.max_tags_per_task) if tag_ids else 0
+            chosen = set(rng.choices(tag_ids, weights=tag_weights, k=fan_out)) if fan_out else ()
+            links.extend((task_id, tag_id) for tag_id in chosen)
+
+        async with conn.transaction():
+            await conn.copy_records_to_table(
+                "tasks",
+                records=[(task_id, *row) for task_id, row in zip(ids, batch)],
+                columns=[
+                    "id", "title", "description", "priority", "is_completed",
+                    "owner_id", "created_at", "updated_at",
+                ],
+            )
+            if links:
+                await conn.copy_records_to_table(
+                    "task_tags", records=links, columns=["task_id", "tag_id"]
+                )
+        task_count += len(batch)
+        link_count += len(links)
+        print(f"   ... {task_count} tareas", end="\r", flush=True)
+    print()
+    return task_count, link_count
+
+
+async def seed_data(args: argparse.Namespace):
+    """Genera e inserta los datos sintéticos"""
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    conn = await asyncpg.connect(settings.sync_database_url)
+    try:
+        if args.truncate:
+            await conn.execute("TRUNCATE task_tags, tasks, tags, users RESTART IDENTITY CASCADE")
+            print("🧹 Tablas vaciadas")
+        elif await conn.fetchval(
+            "SELECT EXISTS (SELECT 1 FROM users WHERE username = ANY($1))", FIXED_USERNAMES
+        ):
+            # Los usuarios fijos (y los sintéticos) chocarían con los únicos a mitad de carga
+            raise SystemExit("❌ La base de datos ya tiene datos de ejemplo; usa --truncate para regenerarlos")
+
+        async with conn.transaction():
+            user_ids = await seed_users(conn, args, now)
+            tag_ids = await seed_tags(conn, args, now)
+        print(f"✅ {len(user_ids)} usuarios y {len(tag_ids)} etiquetas creados")
+
+        start = time.perf_counter()
+        task_count, link_count = await seed_tasks(conn, rng, args, user_ids, tag_ids, now)
+        elapsed = time.perf_counter() - start
+        print(
+            f"✅ {task_count} tareas y {link_count} asociaciones creadas "
+            f"en {elapsed:.1f}s ({task_count / max(elapsed, 1e-9):.0f} tareas/s)"
         )
-        
-        session.add(admin_user)
-        session.add(demo_user)
-        await session.flush()
-        
-        print("✅ Usuarios creados:")
-        print(f"   - admin@taskflow.com (password: admin123)")
-        print(f"   - demo@taskflow.com (password: demo123)")
-        
-        # Crear etiquetas de ejemplo
-        tags = [
-            Tag(name="Urgente", color="#FF0000"),
-            Tag(name="Importante", color="#FFA500"),
-            Tag(name="Personal", color="#00FF00"),
-            Tag(name="Trabajo", color="#0000FF"),
-            Tag(name="Ideas", color="#FF00FF"),
-        ]
-        
-        for tag in tags:
-            session.add(tag)
-        
-        await session.flush()
-        print(f"✅ {len(tags)} etiquetas creadas")
-        
-        # Crear tareas de ejemplo para el usuario admin
-        tasks = [
-            Task(
-                title="Configurar el proyecto",
-                description="Instalar dependencias y configurar el entorno de desarrollo",
-                priority=2,
-                is_completed=True,
-                owner_id=admin_user.id,
-            ),
-            Task(
-                title="Implementar autenticación",
-                description="Crear endpoints de login y registro con JWT",
-                priority=2,
-                is_completed=True,
-                owner_id=admin_user.id,
-            ),
-            Task(
-                title="Crear API de tareas",
-                description="Implementar CRUD completo para tareas",
-                priority=1,
-                is_completed=False,
-                owner_id=admin_user.id,
-            ),
-            Task(
-                title="Escribir tests",
-                description="Crear tests unitarios y de integración",
-                priority=1,
-                is_completed=False,
-                owner_id=admin_user.id,
-            ),
-            Task(
-                title="Documentar la API",
-                description="Completar la documentación en Swagger",
-                priority=0,
-                is_completed=False,
-                owner_id=admin_user.id,
-            ),
-        ]
-        
-        # Asignar etiquetas a las tareas
-        tasks[0].tags = [tags[0], tags[3]]  # Urgente, Trabajo
-        tasks[1].tags = [tags[0], tags[3]]  # Urgente, Trabajo
-        tasks[2].tags = [tags[1], tags[3]]  # Importante, Trabajo
-        tasks[3].tags = [tags[1]]           # Importante
-        tasks[4].tags = [tags[3]]           # Trabajo
-        
-        for task in tasks:
-            session.add(task)
-        
-        # Crear tareas para el usuario demo
-        demo_tasks = [
-            Task(
-                title="Aprender FastAPI",
-                description="Completar el tutorial oficial de FastAPI",
-                priority=1,
-                is_completed=False,
-                owner_id=demo_user.id,
-            ),
-            Task(
-                title="Estudiar SQLAlchemy async",
-                description="Leer la documentación de SQLAlchemy 2.0",
-                priority=1,
-                is_completed=False,
-                owner_id=demo_user.id,
-            ),
-            Task(
-                title="Hacer ejercicio",
-                description="30 minutos de cardio",
-                priority=0,
-                is_completed=False,
-                owner_id=demo_user.id,
-            ),
-        ]
-        
-        demo_tasks[0].tags = [tags[1], tags[3]]  # Importante, Trabajo
-        demo_tasks[1].tags = [tags[3]]           # Trabajo
-        demo_tasks[2].tags = [tags[2]]           # Personal
-        
-        for task in demo_tasks:
-            session.add(task)
-        
-        await session.commit()
-        print(f"✅ {len(tasks) + len(demo_tasks)} tareas creadas")
+
+        # Estadísticas actualizadas para que los planes de consulta sean realistas
+        await conn.execute("ANALYZE users, tags, tasks, task_tags")
+    finally:
+        await conn.close()
 
 
 async def main():
     """Función principal"""
+    args = parse_args()
     print("🚀 Iniciando población de base de datos...")
     print()
-    
-    # Crear tablas (opcional, si no usas Alembic)
-    # await create_tables()
-    
-    # Insertar datos de ejemplo
-    await seed_data()
-    
+
+    if args.create_tables:
+        await create_tables()
+
+    await seed_data(args)
+
     print()
     print("✨ ¡Base de datos poblada exitosamente!")
     print()
     print("Puedes iniciar sesión con:")
     print("  - Usuario: admin / Contraseña: admin123")
     print("  - Usuario: demo / Contraseña: demo123")
+    if args.users:
+        print(f"  - Usuarios: user1..user{args.users} / Contraseña: {SYNTHETIC_PASSWORD}")
 
 
 if __name__ == "__main__":